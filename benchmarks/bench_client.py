@@ -0,0 +1,262 @@
+"""
+Benchmarks of the client-side hot paths of the SDK
+
+Every benchmark runs against an in-process ``FakeNeverBounce`` server (or no
+server at all), so the numbers measure the client, not the network::
+
+    python benchmarks/bench_client.py                     # run all
+    python benchmarks/bench_client.py -k create --rows 1000000
+    python benchmarks/bench_client.py --save baseline.json
+    python benchmarks/bench_client.py --compare baseline.json
+
+With ``--compare``, the run fails if any benchmark is more than
+``--tolerance`` (20% by default) worse than in the saved run, so that
+regressions in client overhead are caught before release.
+"""
+from __future__ import print_function
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import neverbounce_sdk  # noqa: E402
+from neverbounce_sdk.bulk import _InputStream  # noqa: E402
+from neverbounce_sdk.fakeserver import FakeNeverBounce  # noqa: E402
+
+BENCHMARKS = []
+
+
+def benchmark(unit, higher_is_better):
+    """Registers a benchmark function, which returns ``(name, value)``
+    pairs measured in ``unit``"""
+    def register(func):
+        func.unit = unit
+        func.higher_is_better = higher_is_better
+        BENCHMARKS.append(func)
+        return func
+    return register
+
+
+def best_of(repeat, func):
+    """Returns the shortest of ``repeat`` timings of ``func()``"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def emails(count):
+    return [{'email': 'user{}@example.com'.format(i), 'id': str(i)}
+            for i in range(count)]
+
+
+class CannedSession(object):
+    """A session answering every request with the same response, without
+    any I/O"""
+
+    def __init__(self, body):
+        self.body = body
+
+    def request(self, method, url, **kwargs):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.headers['Content-Type'] = 'application/json'
+        resp._content = self.body
+        resp.url = url
+        return resp
+
+    def close(self):
+        pass
+
+
+@benchmark('us/call', higher_is_better=False)
+def request_overhead(args, server):
+    """Per-call cost of _request (_make_request and _check_response) on
+    small and page-sized bodies, with no network"""
+    small = json.dumps({'status': 'success', 'result': 'valid',
+                        'flags': ['has_dns'], 'execution_time': 10})
+    page = json.dumps({
+        'status': 'success', 'total_results': 1000, 'total_pages': 1,
+        'query': {'job_id': 1, 'page': 1, 'items_per_page': 1000},
+        'results': [{'data': row, 'verification': {
+            'result': 'valid', 'flags': ['has_dns', 'has_dns_mx'],
+            'suggested_correction': ''}} for row in emails(1000)]})
+
+    for name, body, calls in (('small', small, 20000),
+                              ('page_1000', page, 200)):
+        calls = max(1, calls // args.scale)
+        client = neverbounce_sdk.client(
+            api_key='key', session=CannedSession(body.encode('utf-8')))
+        url = client._url('account', 'info')
+
+        def run():
+            for _ in range(calls):
+                client._request('GET', url)
+
+        yield name, best_of(args.repeat, run) / calls * 1e6
+
+
+@benchmark('us/call', higher_is_better=False)
+def round_trip(args, server):
+    """Per-call time of single_check against the fake server over a kept
+    alive connection"""
+    client = neverbounce_sdk.client(api_key='key', api_root=server.url)
+    calls = max(1, 2000 // args.scale)
+
+    def run():
+        for i in range(calls):
+            client.single_check('user{}@example.com'.format(i))
+
+    yield 'single_check', best_of(args.repeat, run) / calls * 1e6
+
+
+@benchmark('results/s', higher_is_better=True)
+def result_pagination(args, server):
+    """Throughput of iterating the results of a job with ResultIter"""
+    client = neverbounce_sdk.client(api_key='key', api_root=server.url)
+    rows = max(1000, 50000 // args.scale)
+    job_id = client.jobs_create(emails(rows), auto_parse=True,
+                                auto_start=True)['job_id']
+    for prefetch in (0, 4):
+        def run():
+            count = 0
+            for _ in client.jobs_results(job_id, items_per_page=1000,
+                                         prefetch=prefetch):
+                count += 1
+            assert count == rows
+
+        yield 'prefetch_{}'.format(prefetch), rows / best_of(args.repeat,
+                                                             run)
+
+
+@benchmark('MB/s', higher_is_better=True)
+def download(args, server):
+    """Throughput of jobs_download and jobs_download_rows"""
+    client = neverbounce_sdk.client(api_key='key', api_root=server.url)
+    server.fake.job_size = max(1000, 200000 // args.scale)
+    job_id = client.jobs_create('https://example.com/list.csv',
+                                from_url=True, auto_parse=True,
+                                auto_start=True)['job_id']
+    buffer = io.BytesIO()
+    client.jobs_download(job_id, buffer)
+    size = len(buffer.getvalue())
+
+    def to_file():
+        client.jobs_download(job_id, io.BytesIO())
+
+    def to_rows():
+        for _ in client.jobs_download_rows(job_id):
+            pass
+
+    yield 'jobs_download', size / best_of(args.repeat, to_file) / 1e6
+    yield 'jobs_download_rows', size / best_of(args.repeat, to_rows) / 1e6
+
+
+@benchmark('rows/s', higher_is_better=True)
+def create(args, server):
+    """Throughput of encoding jobs_create bodies, and of whole uploads to
+    the fake server"""
+    data = dict(auto_parse=0, auto_start=0, run_sample=0,
+                input_location='supplied')
+    for rows in args.rows:
+        source = emails(rows)
+
+        def encode():
+            for _ in _InputStream(data, source):
+                pass
+
+        yield 'encode_{}'.format(rows), rows / best_of(args.repeat, encode)
+
+    client = neverbounce_sdk.client(api_key='key', api_root=server.url)
+    for rows in args.rows:
+        if rows > args.max_upload_rows:
+            continue
+        source = emails(rows)
+
+        def upload():
+            client.jobs_create(source)
+
+        yield 'upload_{}'.format(rows), rows / best_of(args.repeat, upload)
+
+
+def compare(results, baseline, tolerance):
+    """Returns the names of the benchmarks that regressed against
+    ``baseline`` by more than ``tolerance``"""
+    regressed = []
+    for name, result in sorted(results.items()):
+        before = baseline.get(name)
+        if before is None or not before['value']:
+            continue
+        ratio = result['value'] / before['value']
+        if not result['higher_is_better']:
+            ratio = 1 / ratio if ratio else float('inf')
+        marker = ''
+        if ratio < 1 - tolerance:
+            regressed.append(name)
+            marker = '  REGRESSED'
+        print('{:<45} {:>7.1%} of baseline{}'.format(name, ratio, marker))
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='select', default=None,
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--rows', default='10000,100000,1000000',
+                        help='input sizes of the jobs_create benchmarks')
+    parser.add_argument('--max-upload-rows', type=int, default=100000,
+                        help='the largest input uploaded to the server')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timings per benchmark; the best is kept')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='divide the work of each benchmark by this, '
+                             'for quick runs')
+    parser.add_argument('--save', metavar='FILE',
+                        help='write the results to FILE as JSON')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare with results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+    args.rows = [int(rows) for rows in args.rows.split(',')]
+
+    fake = FakeNeverBounce(credits=10 ** 12)
+    server = fake.serve(port=0, background=True)
+    server.fake = fake
+    results = {}
+    try:
+        for func in BENCHMARKS:
+            if args.select and args.select not in func.__name__:
+                continue
+            for name, value in func(args, server):
+                name = '{}.{}'.format(func.__name__, name)
+                results[name] = dict(value=value, unit=func.unit,
+                                     higher_is_better=func.higher_is_better)
+                print('{:<45} {:>14,.1f} {}'.format(name, value, func.unit))
+                sys.stdout.flush()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    if args.save:
+        with open(args.save, 'w') as fd:
+            json.dump(results, fd, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fd:
+            baseline = json.load(fd)
+        print()
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,17 +4,34 @@ __email__ = 'support@neverbounce.com'
 __version__ = '4.3.0'
 
 from .auth import *         # noqa: F403
+from .cache import *        # noqa: F403
+from .credits import *      # noqa: F403
 from .exceptions import *   # noqa: F403
+from .instrumentation import *  # noqa: F403
+from .prefilter import *    # noqa: F403
+from .ratelimit import *    # noqa: F403
+from .results import *      # noqa: F403
+from .retry import *        # noqa: F403
+from .transport import *    # noqa: F403
 from .utils import *        # noqa: F403
 
 from .account import AccountMixin
 from .bulk import JobRunnerMixin
 from .core import APICore
 from .poe import POEMixin
+from .sharding import ShardingMixin
 from .single import SingleMixin
 
 __all__ = (auth.__all__ +           # noqa: F405
+           cache.__all__ +          # noqa: F405
+           credits.__all__ +        # noqa: F405
            exceptions.__all__ +     # noqa: F405
+           instrumentation.__all__ +  # noqa: F405
+           prefilter.__all__ +      # noqa: F405
+           ratelimit.__all__ +      # noqa: F405
+           results.__all__ +        # noqa: F405
+           retry.__all__ +          # noqa: F405
+           transport.__all__ +      # noqa: F405
            utils.__all__ +          # noqa: F405
            ['NeverBounceAPIClient', 'client'])
 
@@ -22,6 +39,7 @@ __all__ = (auth.__all__ +           # noqa: F405
 class NeverBounceAPIClient(AccountMixin,
                            SingleMixin,
                            JobRunnerMixin,
+                           ShardingMixin,
                            POEMixin,
                            APICore):
     pass
@@ -1,7 +1,6 @@
 """
 API support for endpoints located at API_ROOT/account
 """
-from .utils import urlforversion
 
 
 class AccountMixin(object):
@@ -16,7 +15,5 @@ class AccountMixin(object):
         See also:
             https://developers.neverbounce.com/v4.0/reference#account-info
         """
-        endpoint = urlforversion(self.api_version, 'account', 'info')
-        resp = self._make_request('GET', endpoint)
-        self._check_response(resp)
-        return resp.json()
+        endpoint = self._url('account', 'info')
+        return self._request('GET', endpoint)
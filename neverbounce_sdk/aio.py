@@ -0,0 +1,856 @@
+"""
+Asyncio support for the NeverBounce API
+
+The asynchronous client exposes the same methods as ``NeverBounceAPIClient``,
+but every method that talks to the API is a coroutine.  It requires Python
+3.5+ and the optional ``httpx`` dependency::
+
+    pip install neverbounce_sdk[async]
+"""
+import asyncio
+import codecs
+import copy
+import csv
+import functools
+import inspect
+import json
+import os
+import re
+from collections import OrderedDict, deque
+from itertools import islice
+
+from . import __version__ as VERSION, API_VERSION
+from .account import AccountMixin
+from .auth import StaticTokenAuth
+from .bulk import (JobRunnerMixin, ResultIter, DOWNLOAD_CHUNK_SIZE,
+                   _DOWNLOAD_ERRORS, _IncompleteDownload, _InputStream,
+                   _JobPoller, _RowMaker, _expected_size,
+                   _finish_resumable, _job_timeout, _load_checkpoint,
+                   _page_sink, _start_resumable, _transfer_stats)
+from .callbacks import MAX_BODY_SIZE
+from .core import APICore, _sent
+from .exceptions import GeneralException
+from .poe import POEMixin
+from .results import ResultTable
+from .retry import RetryPolicy
+from .single import SingleMixin, SingleCheckResult, _Reorderer
+from .utils import API_ROOT, _clock
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+__all__ = ['ASGICallbackApp', 'AsyncNeverBounceAPIClient', 'AsyncResultIter',
+           'async_client']
+
+
+async def _async_chunks(body):
+    for chunk in body:
+        yield chunk
+
+
+class _Flight(object):
+    """A call in flight and the number of tasks awaiting it"""
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight(object):
+    """Asynchronous counterpart of ``SingleFlight``: while a coroutine call
+    for a given key is in flight, other tasks asking for the same key await
+    it and receive deep copies of its result.
+
+    The call runs as a task of its own, so a caller that is cancelled (for
+    instance by a timeout) stops waiting without cancelling the call for the
+    others.  The call is cancelled only once nobody is waiting for it.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def _finished(self, key, flight, task):
+        if self._calls.get(key) is flight:
+            del self._calls[key]
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Returns ``await fn(*args, **kwargs)``, or the outcome of the call
+        already in flight for ``key``"""
+        flight = self._calls.get(key)
+        leader = flight is None
+        if leader:
+            flight = self._calls[key] = _Flight(
+                asyncio.ensure_future(fn(*args, **kwargs)))
+            flight.task.add_done_callback(
+                functools.partial(self._finished, key, flight))
+
+        flight.waiters += 1
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # every caller was cancelled
+                flight.task.cancel()
+        return result if leader else copy.deepcopy(result)
+
+
+class AsyncAPICore(APICore):
+    """
+    Core helpers for interacting with the NeverBounce API from an asyncio
+    event loop.  Requests are sent through a single ``httpx.AsyncClient``
+    whose connection pool is shared by every in-flight call.
+
+    Args:
+        pool_size (int): The maximum number of simultaneous connections kept
+            by the connection pool.  Ignored if a ``session`` is supplied.
+        max_retries (int): The number of times to retry failed connections
+            (not failed requests).  Ignored if a ``session`` is supplied.
+    """
+
+    def __init__(self,
+                 api_key=None,
+                 session=None,
+                 timeout=30,
+                 api_version=API_VERSION,
+                 pool_size=100,
+                 max_retries=0,
+                 rate_limiter=None,
+                 retry_policy=None,
+                 cache=None,
+                 coalesce=True,
+                 api_root=API_ROOT,
+                 hooks=None,
+                 credit_budget=None):
+        if httpx is None:
+            raise ImportError('The asyncio client requires httpx; install '
+                              'it with `pip install neverbounce_sdk[async]`')
+        super(AsyncAPICore, self).__init__(api_key=api_key,
+                                           session=session,
+                                           timeout=timeout,
+                                           api_version=api_version,
+                                           pool_size=pool_size,
+                                           max_retries=max_retries,
+                                           rate_limiter=rate_limiter,
+                                           retry_policy=retry_policy,
+                                           cache=cache,
+                                           coalesce=coalesce,
+                                           api_root=api_root,
+                                           hooks=hooks,
+                                           credit_budget=credit_budget)
+        self._inflight = AsyncSingleFlight()
+
+    def _get_session(self):
+        """Returns the underlying ``httpx.AsyncClient``, creating it on first
+        use"""
+        if self.session is None:
+            limits = httpx.Limits(max_connections=self.pool_size,
+                                  max_keepalive_connections=self.pool_size)
+            transport = httpx.AsyncHTTPTransport(limits=limits,
+                                                 retries=self.max_retries)
+            # request timeouts are set per call from self.timeout
+            self.session = httpx.AsyncClient(transport=transport,
+                                             timeout=None)
+        return self.session
+
+    async def _make_request(self, method, url, params=None, headers=None,
+                            auth=None, stream=False, **kwargs):
+        """
+        Sends a request through the shared ``httpx.AsyncClient``.  The API key
+        is attached as the ``key`` query parameter, as ``StaticTokenAuth``
+        does for the synchronous client.
+        """
+        headers = dict(headers or {})
+        user_agent = 'NeverBounceAPI-Python/{}'.format(VERSION)
+        headers.update({'User-Agent': user_agent})
+
+        params = dict(params or {})
+        auth = auth or self.api_key
+        if isinstance(auth, StaticTokenAuth):
+            params.update(auth.api_key_d)
+
+        if self.timeout:
+            kwargs['timeout'] = self.timeout
+
+        if self.rate_limiter is not None:
+            wait = self.rate_limiter.reserve()
+            if wait:
+                await asyncio.sleep(wait)
+
+        if isinstance(kwargs.get('data'), _InputStream):
+            # streamed bodies are given to httpx as content
+            kwargs['content'] = _async_chunks(kwargs.pop('data'))
+
+        session = self._get_session()
+        request = session.build_request(method, url, params=params,
+                                        headers=headers, **kwargs)
+        return await session.send(request, stream=stream)
+
+    def _reserve_credits(self, credits):
+        # the budget is refreshed when the request is sent, since this may
+        # not wait for account_info, and never blocks the event loop
+        budget = self.credit_budget
+        if budget is None:
+            return None
+        return budget.reserve(credits, block=False)
+
+    async def _charged_request(self, reservation, method, url, *args,
+                               **kwargs):
+        budget = self.credit_budget
+        try:
+            if budget.refresh_due():
+                budget.update(await self.account_info())
+            body = await self._request(method, url, *args, **kwargs)
+        except BaseException:
+            reservation.release()
+            raise
+        reservation.commit()
+        budget.update(body)
+        return body
+
+    async def _request(self, method, url, *args, **kwargs):
+        credits = kwargs.pop('credits', 0)
+        reservation = kwargs.pop('reservation', None)
+        if self.credit_budget is not None:
+            if credits:
+                reservation = self._reserve_credits(credits)
+            if reservation is not None:
+                return await self._charged_request(reservation, method, url,
+                                                   *args, **kwargs)
+
+        idempotent = kwargs.pop('idempotent', True)
+        policy = self._retry_policy_for(url)
+        attempt = 1
+        while True:
+            resp = None
+            started = _clock()
+            try:
+                resp = await self._make_request(method, url, *args, **kwargs)
+                body = self._check_response(resp)
+            except Exception as exc:
+                if self.hooks:
+                    self._emit(method, url, attempt, started, resp,
+                               error=exc, bytes_sent=_sent(kwargs))
+                if policy is None:
+                    raise
+                delay = policy.next_delay(attempt, exc, idempotent, resp)
+                if delay is None:
+                    raise
+            else:
+                if self.hooks:
+                    self._emit(method, url, attempt, started, resp, body,
+                               bytes_sent=_sent(kwargs))
+                return body
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self):
+        """Closes the connection pool"""
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+    def __enter__(self):
+        raise TypeError('use `async with` with the asyncio client')
+
+    def __exit__(self, *args):
+        pass  # pragma: no cover
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class AsyncResultIter(ResultIter):
+    """
+    Asynchronous counterpart of ``ResultIter``, for use with ``async for``.
+    The first page is fetched on the first iteration; with ``prefetch``, the
+    following pages are fetched by background tasks.
+    """
+
+    def __init__(self, method, *args, **kwargs):
+        self.prefetch = kwargs.pop('prefetch', 0)
+        resume_from = kwargs.pop('resume_from', None)
+        self._method = method
+        self._first_call = (args, kwargs)
+        self._resume_offset = 0
+        if resume_from is not None:
+            query, self._resume_offset = _load_checkpoint(resume_from)
+            self._first_call = ((), query)
+        self._pending = deque()
+        self.data = None
+
+    def _schedule(self):
+        while (len(self._pending) < self.prefetch and
+               self._last_requested < self.total_pages):
+            self._last_requested += 1
+            query = self._page_query(self._last_requested)
+            self._pending.append(asyncio.ensure_future(self._method(**query)))
+
+    async def get_next_page(self):
+        if self.data is None:
+            args, kwargs = self._first_call
+            self.data = await self._method(*args, **kwargs)
+            self._update()
+            self._skip(self._resume_offset)
+            self._last_requested = self.page
+        else:
+            if self._pending:
+                self.data = await self._pending.popleft()
+            else:
+                self.data = await self._method(**self._next_query())
+            self._update()
+        self._schedule()
+
+    def close(self):
+        """Cancels the pages being prefetched"""
+        while self._pending:
+            self._pending.pop().cancel()
+
+    def __iter__(self):
+        raise TypeError('use `async for` to iterate an AsyncResultIter')
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.data is None:
+            await self.get_next_page()
+        rval = self._next_result()
+        if rval is self.page_end:
+            if self.page >= self.total_pages:
+                self.close()
+                raise StopAsyncIteration
+            await self.get_next_page()
+            rval = self._next_result()
+            if rval is self.page_end:
+                raise StopAsyncIteration
+        return rval
+
+
+class AsyncSingleMixin(SingleMixin):
+    """
+    Overrides the ``SingleMixin`` methods that do more than a single
+    request/response round trip
+    """
+
+    async def single_check(self, email,
+                           address_info=False,
+                           credits_info=False,
+                           historical_data=True,
+                           timeout=30):
+        """Asynchronous version of ``SingleMixin.single_check``.  Cache lookups
+        are synchronous."""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(email, address_info, historical_data)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        endpoint, params = self._single_check_params(
+            email, address_info, credits_info, historical_data, timeout)
+        if self.coalesce:
+            flight_key = (email.strip().lower(), bool(address_info),
+                          bool(credits_info), bool(historical_data), timeout)
+            result = await self._inflight.do(flight_key, self._request,
+                                             'GET', endpoint, params=params,
+                                             credits=1)
+        else:
+            result = await self._request('GET', endpoint, params=params,
+                                         credits=1)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, result)
+        return result
+
+    async def single_check_many(self, emails, concurrency=100, ordered=False,
+                                **kwargs):
+        """Asynchronous version of ``SingleMixin.single_check_many``; an
+        asynchronous generator keeping up to ``concurrency`` checks in flight
+        on the event loop"""
+        reorderer = _Reorderer() if ordered else None
+
+        async def check(index, email):
+            try:
+                result = await self.single_check(email, **kwargs)
+            except Exception as exc:
+                return SingleCheckResult(index, email, None, exc)
+            return SingleCheckResult(index, email, result, None)
+
+        emails = enumerate(emails)
+        pending = set(asyncio.ensure_future(check(index, email))
+                      for index, email in islice(emails, concurrency))
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                ready = [task.result() for task in done]
+                if reorderer is not None:
+                    ready = [outcome for result in ready
+                             for outcome in reorderer.push(result)]
+                # results held back for ordering count against the limit,
+                # so that a slow check can't make the buffer grow unbounded
+                room = concurrency - len(pending) - len(reorderer or ())
+                for index, email in islice(emails, max(0, room)):
+                    pending.add(asyncio.ensure_future(check(index, email)))
+                for outcome in ready:
+                    yield outcome
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+# a line of CSV text, with its line ending
+_csv_line = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)')
+
+
+class _CSVParser(object):
+    """Parses CSV text that is fed to it in arbitrary pieces"""
+
+    def __init__(self):
+        self._pending = ''
+        self._record = []
+        self._quotes = 0
+
+    def feed(self, text):
+        """Returns the rows completed by ``text``"""
+        text = self._pending + text
+        rows = []
+        end = 0
+        for match in _csv_line.finditer(text):
+            end = match.end()
+            line = match.group()
+            self._record.append(line)
+            # a line ending outside of quotes, i.e. after an even number of
+            # quote characters, ends the record
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                rows.extend(csv.reader(self._record))
+                self._record = []
+        self._pending = text[end:]
+        return rows
+
+    def close(self):
+        """Returns the last row, if the text did not end with a newline"""
+        if self._pending:
+            self._record.append(self._pending)
+            self._pending = ''
+        rows = list(csv.reader(self._record))
+        self._record = []
+        return rows
+
+
+async def _download_rows(resp, make_row, chunk_size, done=None):
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    parser = _CSVParser()
+    received = 0
+    error = None
+    try:
+        async for chunk in resp.aiter_bytes(chunk_size=chunk_size):
+            received += len(chunk)
+            for row in parser.feed(decoder.decode(chunk)):
+                record = make_row(row)
+                if record is not None:
+                    yield record
+        for row in parser.feed(decoder.decode(b'', True)) + parser.close():
+            record = make_row(row)
+            if record is not None:
+                yield record
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        await resp.aclose()
+        if done is not None:
+            done(error, received)
+
+
+class AsyncJobRunnerMixin(JobRunnerMixin):
+    """
+    Overrides the ``JobRunnerMixin`` methods that do more than a single
+    request/response round trip
+    """
+
+    def jobs_search(self, **kwargs):
+        """Asynchronous version of ``JobRunnerMixin.jobs_search``; returns an
+        ``AsyncResultIter``"""
+        return AsyncResultIter(self.raw_search, **kwargs)
+
+    def jobs_results(self, job_id, **kwargs):
+        """Asynchronous version of ``JobRunnerMixin.jobs_results``; returns an
+        ``AsyncResultIter``"""
+        self._check_resume_job(job_id, kwargs.get('resume_from'))
+        return AsyncResultIter(self.raw_results, job_id, **kwargs)
+
+    async def jobs_results_parallel(self, job_id, sink, workers=4,
+                                    items_per_page=1000, ordered=False,
+                                    **extra_query):
+        """Asynchronous version of ``JobRunnerMixin.jobs_results_parallel``;
+        up to ``workers`` pages are requested at once.  The results of
+        ``sink`` are awaited if they are awaitable, so it may also be a
+        coroutine function or an ``asyncio.Queue``."""
+        deliver = _page_sink(sink)
+
+        async def fetch(page):
+            return page, await self.raw_results(job_id, page=page,
+                                                items_per_page=items_per_page,
+                                                **extra_query)
+
+        async def hand_over(page, results):
+            rval = deliver(page, results)
+            if inspect.isawaitable(rval):
+                await rval
+
+        _, data = await fetch(1)
+        total_pages = int(data['total_pages'])
+        total_results = int(data['total_results'])
+        await hand_over(1, data['results'])
+
+        window = 2 * workers
+        pages = iter(range(2, total_pages + 1))
+        next_page = 2       # the next page to deliver, when ordered
+        held = {}
+        pending = set()
+        try:
+            while True:
+                for page in pages:
+                    pending.add(asyncio.ensure_future(fetch(page)))
+                    if len(pending) >= workers or (
+                            ordered and page - next_page >= window):
+                        break
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    page, data = task.result()
+                    if not ordered:
+                        await hand_over(page, data['results'])
+                        continue
+                    held[page] = data['results']
+                    while next_page in held:
+                        await hand_over(next_page, held.pop(next_page))
+                        next_page += 1
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return dict(job_id=job_id,
+                    total_pages=total_pages,
+                    total_results=total_results)
+
+    async def jobs_results_table(self, job_id, items_per_page=1000,
+                                 **kwargs):
+        """Asynchronous version of ``JobRunnerMixin.jobs_results_table``"""
+        results = self.jobs_results(job_id, items_per_page=items_per_page,
+                                    **kwargs)
+        table = ResultTable()
+        try:
+            async for result in results:
+                table.append(result)
+        finally:
+            results.close()
+        return table
+
+    async def jobs_download(self, job_id, fd,
+                            segmentation=('valids', 'invalids',
+                                          'catchalls', 'unknowns'),
+                            appends=(),
+                            yes_no_representation='int',
+                            line_feed_type='unix',
+                            chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """Asynchronous version of ``JobRunnerMixin.jobs_download``.  Writes
+        to ``fd`` are synchronous."""
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+
+        endpoint = self._url('jobs', 'download')
+        started = _clock()
+        resp = None
+        written = 0
+        try:
+            resp = await self._make_request('POST', endpoint, json=data,
+                                            stream=True)
+            try:
+                # returns json if there's an error, octet-stream if all is
+                # good
+                if resp.headers.get('Content-Type') == 'application/json':
+                    await resp.aread()
+                    self._check_response(resp)
+
+                async for chunk in resp.aiter_bytes(chunk_size=chunk_size):
+                    fd.write(chunk)
+                    written += len(chunk)
+            finally:
+                await resp.aclose()
+        except Exception as exc:
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=exc)
+            raise
+        if self.hooks:
+            self._emit('POST', endpoint, 1, started, resp,
+                       bytes_received=written)
+        return _transfer_stats(written, started)
+
+    async def jobs_download_resumable(self, job_id, path,
+                                      segmentation=('valids', 'invalids',
+                                                    'catchalls', 'unknowns'),
+                                      appends=(),
+                                      yes_no_representation='int',
+                                      line_feed_type='unix',
+                                      chunk_size=DOWNLOAD_CHUNK_SIZE,
+                                      expected_sha256=None,
+                                      retry_policy=None):
+        """Asynchronous version of ``JobRunnerMixin.jobs_download_resumable``.
+        Writes to the file are synchronous."""
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+        if retry_policy is None:
+            retry_policy = RetryPolicy(
+                max_attempts=5,
+                retry_on=_DOWNLOAD_ERRORS + (httpx.TransportError,))
+
+        progress_path = _start_resumable(
+            path, dict(job_id=job_id, request=data))
+
+        endpoint = self._url('jobs', 'download')
+        resumed_from = os.path.getsize(path)
+        started = _clock()
+        written = 0
+        attempt = 0
+        total = None
+        while True:
+            attempt += 1
+            offset = os.path.getsize(path)
+            # ranges only make sense over the unencoded body
+            headers = {'Accept-Encoding': 'identity'}
+            if offset:
+                headers['Range'] = 'bytes={}-'.format(offset)
+            resp = None
+            attempt_started = _clock()
+            received = 0
+            try:
+                resp = await self._make_request('POST', endpoint, json=data,
+                                                headers=headers, stream=True)
+                if resp.headers.get('Content-Type') == 'application/json':
+                    await resp.aread()
+                    self._check_response(resp)
+                if resp.status_code != 416:
+                    resp.raise_for_status()
+
+                start, total = _expected_size(resp, offset)
+                if resp.status_code == 416:
+                    # nothing left to send
+                    if self.hooks:
+                        self._emit('POST', endpoint, attempt,
+                                   attempt_started, resp, bytes_received=0)
+                    break
+                if start > offset:
+                    raise GeneralException('Unable to resume the download: '
+                                           'the server sent bytes from {} '
+                                           'onward but {} were expected.'
+                                           .format(start, offset))
+                skip = offset - start
+                with open(path, 'ab') as fd:
+                    # written as received, since a rechunked stream would
+                    # lose what it holds back when the connection drops
+                    async for chunk in resp.aiter_bytes():
+                        if skip:
+                            if len(chunk) <= skip:
+                                skip -= len(chunk)
+                                continue
+                            chunk, skip = chunk[skip:], 0
+                        fd.write(chunk)
+                        received += len(chunk)
+                        written += len(chunk)
+                if total is not None and os.path.getsize(path) < total:
+                    raise _IncompleteDownload()
+                if self.hooks:
+                    self._emit('POST', endpoint, attempt, attempt_started,
+                               resp, bytes_received=received)
+                break
+            except Exception as exc:
+                if self.hooks:
+                    self._emit('POST', endpoint, attempt, attempt_started,
+                               resp, error=exc, bytes_received=received)
+                delay = retry_policy.next_delay(attempt, exc, True, resp)
+                if delay is None:
+                    raise
+            finally:
+                if resp is not None:
+                    await resp.aclose()
+            await asyncio.sleep(delay)
+
+        size, sha256 = _finish_resumable(path, progress_path, job_id, total,
+                                         expected_sha256, chunk_size)
+
+        stats = _transfer_stats(written, started)
+        stats.update(bytes=size,
+                     resumed_from=resumed_from,
+                     attempts=attempt,
+                     sha256=sha256)
+        return stats
+
+    async def jobs_download_rows(self, job_id,
+                                 segmentation=('valids', 'invalids',
+                                               'catchalls', 'unknowns'),
+                                 appends=(),
+                                 yes_no_representation='int',
+                                 line_feed_type='unix',
+                                 fieldnames=None,
+                                 chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """Asynchronous version of ``JobRunnerMixin.jobs_download_rows``;
+        returns an asynchronous iterator of rows"""
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+
+        endpoint = self._url('jobs', 'download')
+        started = _clock()
+        resp = None
+        try:
+            resp = await self._make_request('POST', endpoint, json=data,
+                                            stream=True)
+            if resp.headers.get('Content-Type') == 'application/json':
+                try:
+                    await resp.aread()
+                    self._check_response(resp)
+                finally:
+                    await resp.aclose()
+        except Exception as exc:
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=exc)
+            raise
+
+        def done(error, received):
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=error,
+                           bytes_received=received)
+
+        make_row = _RowMaker(fieldnames, set(appends),
+                             data['binary_operators_type'])
+        return _download_rows(resp, make_row, chunk_size, done)
+
+    async def wait_for_job(self, job_id, timeout=None, progress=None,
+                           min_interval=1, max_interval=60):
+        """Asynchronous version of ``JobRunnerMixin.wait_for_job``"""
+        deadline = None if timeout is None else _clock() + timeout
+        poller = _JobPoller(min_interval, max_interval)
+        while True:
+            status = await self.jobs_status(job_id)
+            if progress is not None:
+                progress(job_id, status)
+            delay = poller.update(status, _clock())
+            if delay is None:
+                return status
+            if deadline is not None:
+                remaining = deadline - _clock()
+                if remaining <= 0:
+                    raise _job_timeout([job_id], timeout)
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+
+    async def wait_for_jobs(self, job_ids, timeout=None, progress=None,
+                            min_interval=1, max_interval=60):
+        """Asynchronous version of ``JobRunnerMixin.wait_for_jobs``; returns
+        an asynchronous iterator of the jobs' last status objects.  Every job
+        is waited for by a task on the running event loop, so there is no
+        ``workers`` argument."""
+        job_ids = list(OrderedDict.fromkeys(job_ids))
+        tasks = [asyncio.ensure_future(self.wait_for_job(
+                     job_id, None, progress, min_interval, max_interval))
+                 for job_id in job_ids]
+        try:
+            for finished in asyncio.as_completed(tasks, timeout=timeout):
+                try:
+                    status = await finished
+                except asyncio.TimeoutError:
+                    running = [job_id for job_id, task in zip(job_ids, tasks)
+                               if not task.done()]
+                    raise _job_timeout(running, timeout)
+                yield status
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class ASGICallbackApp(object):
+    """
+    ASGI application delivering the callbacks of bulk jobs to a
+    ``CallbackReceiver``, whose handlers are called on the event loop::
+
+        receiver = CallbackReceiver(headers={'X-Token': 'secret'})
+        app = ASGICallbackApp(receiver)     # serve with any ASGI server
+
+        event = await asyncio.wrap_future(receiver.future(job_id))
+    """
+
+    def __init__(self, receiver):
+        self.receiver = receiver
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                kind = message['type'].rsplit('.', 1)[-1]
+                await send({'type': 'lifespan.{}.complete'.format(kind)})
+                if kind == 'shutdown':
+                    return
+        if scope['type'] != 'http':
+            return
+
+        chunks = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            chunk = message.get('body', b'')
+            size += len(chunk)
+            if size <= MAX_BODY_SIZE:
+                chunks.append(chunk)
+            more_body = message.get('more_body', False)
+
+        headers = dict((name.decode('latin-1').lower(),
+                        value.decode('latin-1'))
+                       for name, value in scope.get('headers', ()))
+        if size > MAX_BODY_SIZE:
+            status = 413
+        else:
+            try:
+                status = self.receiver.handle(scope['method'], scope['path'],
+                                              headers, b''.join(chunks))
+            except Exception:
+                status = 500
+
+        payload = json.dumps({'status': 'success' if status == 200 else
+                              'error'}).encode('utf-8')
+        await send({'type': 'http.response.start',
+                    'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length',
+                                 str(len(payload)).encode('ascii'))]})
+        await send({'type': 'http.response.body', 'body': payload})
+
+
+class AsyncNeverBounceAPIClient(AccountMixin,
+                                AsyncSingleMixin,
+                                AsyncJobRunnerMixin,
+                                POEMixin,
+                                AsyncAPICore):
+    pass
+
+
+def async_client(*args, **kwargs):
+    """ Factory function (alias) for AsyncNeverBounceAPIClient objects """
+    return AsyncNeverBounceAPIClient(*args, **kwargs)
@@ -1,4 +1,32 @@
-from .utils import urlforversion
+import base64
+import csv
+import hashlib
+import heapq
+import io
+import json
+import os
+import re
+import socket
+import sys
+import time
+from collections import OrderedDict, deque, namedtuple
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from urllib3.exceptions import (HTTPError as _URLLib3Error, IncompleteRead,
+                                ProtocolError)
+
+# Python 2 COMPAT
+try:
+    from http.client import HTTPException
+except ImportError:  # pragma: no cover
+    from httplib import HTTPException
+
+from .exceptions import GeneralException, JobTimeout, ThrottleTriggered
+from .results import ResultTable
+from .retry import RetryPolicy
+from .utils import _clock, _string_types
 
 __all__ = ['JobRunnerMixin']
 
@@ -32,6 +60,36 @@ _appends_options = {
     'email_status'
 }
 
+# the default size of the chunks a download is read and written in
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# the size of the pieces a streamed jobs_create body is sent in
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# lists longer than this are streamed by jobs_create rather than encoded at
+# once; shorter ones are sent with a Content-Length
+_STREAM_MIN_ROWS = 10000
+
+# appended columns holding yes/no values, and how each binary_operators_type
+# writes (yes, no)
+_boolean_appends = {
+    'bad_syntax',
+    'free_email_host',
+    'role_account',
+    'has_dns_info',
+    'has_mail_server',
+    'mail_server_reachable'
+}
+
+_binary_values = {
+    'BIN_1_0': ('1', '0'),
+    'BIN_Y_N': ('Y', 'N'),
+    'BIN_y_n': ('y', 'n'),
+    'BIN_yes_no': ('yes', 'no'),
+    'BIN_Yes_No': ('Yes', 'No'),
+    'BIN_true_false': ('true', 'false')
+}
+
 _job_status = {
     'under_review',
     'queued',
@@ -44,23 +102,69 @@ _job_status = {
     'uploading'
 }
 
+# the job statuses after which a job will not change
+_finished_job_status = {'complete', 'failed'}
+
+
+def _dump_checkpoint(query, offset):
+    state = dict(v=1, query=query, offset=offset)
+    data = json.dumps(state, sort_keys=True, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def _load_checkpoint(token):
+    """Returns the query and offset saved by ``ResultIter.checkpoint``"""
+    try:
+        data = base64.urlsafe_b64decode(token.encode('ascii'))
+        state = json.loads(data.decode('utf-8'))
+        if state['v'] != 1:
+            raise ValueError
+        return state['query'], int(state['offset'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        raise ValueError('{!r} is not a valid ResultIter checkpoint'.format(
+            token))
+
 
 class ResultIter(object):
-    """Utility class for iterating through a paginated API. """
+    """Utility class for iterating through a paginated API.
+
+    With ``prefetch`` set to a positive number, up to that many of the
+    following pages are fetched in the background while the current page is
+    consumed; results are still yielded in order.  Call ``close`` to stop
+    prefetching if iteration is abandoned early.
+
+    The position of the iterator can be saved with ``checkpoint``, and a new
+    iterator started from it by passing the checkpoint as ``resume_from``; it
+    will begin with the first result not yet yielded at the time of the
+    checkpoint.
+    """
     page_end = object()
 
     def __init__(self, method, *args, **kwargs):
+        self.prefetch = kwargs.pop('prefetch', 0)
+        resume_from = kwargs.pop('resume_from', None)
         self._method = method
-        self.data = method(*args, **kwargs)
-        self._update()
+        self._executor = None
+        self._pending = deque()
+        if resume_from is None:
+            self.data = method(*args, **kwargs)
+            self._update()
+        else:
+            query, offset = _load_checkpoint(resume_from)
+            self.data = method(**query)
+            self._update()
+            self._skip(offset)
+        self._last_requested = self.page
+        self._schedule()
 
     def _update(self):
         self._results = iter(self.data['results'])
+        self.offset = 0
         self.page = int(self.data['query']['page'])
         self.total_pages = int(self.data['total_pages'])
         self.total_results = int(self.data['total_results'])
 
-    def get_next_page(self):
+    def _page_query(self, page):
         query = {}
         for key, val in self.data['query'].items():
             if key in _job_status or key in ('page', 'items_per_page'):
@@ -68,17 +172,72 @@ class ResultIter(object):
             else:
                 query[key] = val
 
-        query['page'] += 1
-        self.data = self._method(**query)
+        query['page'] = page
+        return query
+
+    def _next_query(self):
+        return self._page_query(self.page + 1)
+
+    def _next_result(self):
+        rval = next(self._results, self.page_end)
+        if rval is not self.page_end:
+            self.offset += 1
+        return rval
+
+    def _skip(self, count):
+        for _ in range(count):
+            if self._next_result() is self.page_end:
+                break
+
+    def checkpoint(self):
+        """Returns a short string recording the position of the iterator: the
+        query, the current page and the number of results already yielded
+        from it.  Pass it as ``resume_from`` to ``jobs_results`` or
+        ``jobs_search`` to continue from this point, e.g. after a crash."""
+        return _dump_checkpoint(self._page_query(self.page), self.offset)
+
+    def _schedule(self):
+        """Starts fetching the following pages, up to ``prefetch`` of them"""
+        if not self.prefetch:
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.prefetch)
+        while (len(self._pending) < self.prefetch and
+               self._last_requested < self.total_pages):
+            self._last_requested += 1
+            query = self._page_query(self._last_requested)
+            self._pending.append(
+                self._executor.submit(self._method, **query))
+
+    def get_next_page(self):
+        if self._pending:
+            self.data = self._pending.popleft().result()
+        else:
+            self.data = self._method(**self._next_query())
         self._update()
+        self._schedule()
+
+    def close(self):
+        """Stops prefetching pages"""
+        while self._pending:
+            self._pending.pop().cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def __next__(self):
         # traverse pages
-        rval = next(self._results, self.page_end)
+        rval = self._next_result()
         if rval is self.page_end:
+            if self.prefetch and self.page >= self.total_pages:
+                # the last page is known; don't ask for the one after it
+                self.close()
+                raise StopIteration
             self.get_next_page()
-            # if this raises StopIteration, then we're done
-            return next(self._results)
+            rval = self._next_result()
+            if rval is self.page_end:
+                # we're done
+                raise StopIteration
         return rval
 
     # Python 2 COMPAT
@@ -88,6 +247,457 @@ class ResultIter(object):
         return self
 
 
+def _csv_input(lines):
+    """Yields the rows of a CSV file as ``jobs_create`` input: ``dict``
+    objects keyed on the header if the first row has an ``email`` column,
+    lists otherwise"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    if 'email' not in (name.strip().lower() for name in header):
+        yield header
+        header = None
+    for row in reader:
+        if not row:
+            continue
+        yield row if header is None else dict(zip(header, row))
+
+
+def _input_rows(source, start=None):
+    """Yields the rows of ``jobs_create`` input given as an iterable, a CSV
+    file or the path of one; a file is read from offset ``start``, if
+    given"""
+    if isinstance(source, _string_types):
+        with io.open(source, encoding='utf-8-sig', newline='') as fd:
+            for row in _csv_input(fd):
+                yield row
+    elif hasattr(source, 'read'):
+        if start is not None:
+            source.seek(start)
+        if isinstance(source, (io.RawIOBase, io.BufferedIOBase)):
+            text = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+            try:
+                for row in _csv_input(text):
+                    yield row
+            finally:
+                # leave the caller's file open
+                text.detach()
+        else:
+            for row in _csv_input(source):
+                yield row
+    else:
+        for row in source:
+            yield row
+
+
+class _InputStream(object):
+    """The body of a ``jobs_create`` request whose ``input`` is read from
+    ``source`` (an iterable, a CSV file or the path of one) and encoded a
+    few rows at a time, so that the input is never held in memory in full.
+
+    Iterating over the body starts over, as retrying the request requires;
+    a source that can't be read again, like a generator, raises
+    ``GeneralException`` instead.
+    """
+
+    def __init__(self, data, source, reservation=None):
+        self.data = data
+        self.source = source
+        self.reservation = reservation
+        self._start = None
+        self._sent = False
+        # the bytes of the body sent by the latest request
+        self.bytes_sent = 0
+        if hasattr(source, 'read'):
+            try:
+                self._start = source.tell()
+            except (AttributeError, IOError, OSError):
+                pass
+
+    @property
+    def replayable(self):
+        if isinstance(self.source, (str, list, tuple)):
+            return True
+        return hasattr(self.source, 'read') and self._start is not None
+
+    def _rows(self):
+        return _input_rows(self.source, self._start)
+
+    def __iter__(self):
+        if self._sent and not self.replayable:
+            raise GeneralException('The jobs_create input was an iterator '
+                                   'that was already read, so the request '
+                                   'can not be sent again.')
+        self._sent = True
+        self.bytes_sent = 0
+        reservation = self.reservation
+        if reservation is not None:
+            # nothing was spent on an earlier, failed attempt
+            reservation.release()
+
+        # the other fields follow the input, e.g. '{"input": [...], "a": 1}'
+        tail = '], ' + json.dumps(self.data)[1:]
+        pieces = ['{"input": [']
+        size = 0
+        rows = 0
+        separator = ''
+        for row in self._rows():
+            piece = separator + json.dumps(row)
+            separator = ', '
+            pieces.append(piece)
+            size += len(piece)
+            rows += 1
+            if size >= UPLOAD_CHUNK_SIZE:
+                if reservation is not None:
+                    reservation.add(rows)
+                chunk = ''.join(pieces).encode('utf-8')
+                self.bytes_sent += len(chunk)
+                yield chunk
+                pieces = []
+                size = 0
+                rows = 0
+        if reservation is not None:
+            reservation.add(rows)
+        pieces.append(tail)
+        chunk = ''.join(pieces).encode('utf-8')
+        self.bytes_sent += len(chunk)
+        yield chunk
+
+
+def _page_sink(sink):
+    """Adapts the ``sink`` given to ``jobs_results_parallel`` to a function
+    taking a page number and that page's results"""
+    if hasattr(sink, 'put'):
+        return lambda page, results: sink.put((page, results))
+    if hasattr(sink, 'write'):
+        # Python 2 COMPAT: the builtin file type is not an io class
+        binary = (isinstance(sink, (io.RawIOBase, io.BufferedIOBase)) or
+                  'b' in getattr(sink, 'mode', ''))
+
+        def write(page, results):
+            lines = ''.join(json.dumps(result) + '\n' for result in results)
+            sink.write(lines.encode('utf-8') if binary else lines)
+        return write
+    if callable(sink):
+        return sink
+    raise TypeError('sink must be callable, a queue or a file, not '
+                    '{!r}'.format(sink))
+
+
+def _body_stream(resp):
+    """Returns the stream the body of ``resp`` is read from, if it can be
+    read straight into a buffer: that is, if the body has no content
+    encoding for urllib3 to decode.  Returns ``None`` otherwise."""
+    fp = getattr(getattr(resp, 'raw', None), '_fp', None)
+    encoding = resp.headers.get('Content-Encoding', 'identity')
+    if not hasattr(fp, 'readinto') or encoding.lower() != 'identity':
+        return None
+    return fp
+
+
+def _write_download(resp, fd, chunk_size, skip=0):
+    """Copies the body of the streaming response ``resp`` into ``fd``,
+    leaving out its first ``skip`` bytes; returns the number of bytes
+    written"""
+    written = 0
+    stream = _body_stream(resp)
+    if stream is not None and isinstance(fd, (io.BufferedIOBase,
+                                              io.RawIOBase)):
+        # fast path: read from the connection into a single reused buffer
+        # and write views of it.  urllib3's own readinto reads a new bytes
+        # object and copies it, which is no better than iter_content.
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
+        received = 0
+        try:
+            while skip:
+                count = stream.readinto(view[:min(skip, chunk_size)])
+                if not count:
+                    break
+                skip -= count
+                received += count
+            # unless the body ended before the bytes to skip
+            while not skip:
+                count = stream.readinto(buf)
+                if not count:
+                    break
+                fd.write(view[:count])
+                written += count
+            received += written
+        except (HTTPException, socket.error) as exc:
+            # report a broken connection as urllib3 does for iter_content
+            raise ProtocolError('Connection broken: {!r}'.format(exc), exc)
+        # the connection reports a body cut short as its end, so its length
+        # is checked here, as urllib3 would
+        length = resp.headers.get('Content-Length', '')
+        if length.isdigit() and received < int(length):
+            exc = IncompleteRead(received, int(length) - received)
+            raise ProtocolError('Connection broken: {!r}'.format(exc), exc)
+        # the body was read in full, so the connection may be reused
+        if getattr(stream, 'isclosed', lambda: False)():
+            resp.raw.release_conn()
+        return written
+
+    for chunk in resp.iter_content(chunk_size=chunk_size):
+        if skip:
+            if len(chunk) <= skip:
+                skip -= len(chunk)
+                continue
+            chunk, skip = chunk[skip:], 0
+        fd.write(chunk)
+        written += len(chunk)
+    return written
+
+
+class _IncompleteDownload(Exception):
+    """The download stream ended before the expected number of bytes"""
+
+
+# errors after which a resumable download picks up where it left off
+_DOWNLOAD_ERRORS = (ThrottleTriggered,
+                    requests.ConnectionError,
+                    requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError,
+                    _URLLib3Error,
+                    _IncompleteDownload)
+
+_content_range = re.compile(r'bytes (\d+)-\d+/(\d+|\*)')
+_unsatisfied_range = re.compile(r'bytes \*/(\d+)')
+
+
+def _expected_size(resp, offset):
+    """Returns the offset at which ``resp``'s body starts and the full size
+    of the download (``None`` if unknown)"""
+    if resp.status_code == 416:
+        # nothing is left to send past ``offset``
+        match = _unsatisfied_range.match(resp.headers.get('Content-Range', ''))
+        return offset, None if match is None else int(match.group(1))
+    if resp.status_code == 206:
+        match = _content_range.match(resp.headers.get('Content-Range', ''))
+        if match is None:
+            raise GeneralException('Unable to resume the download: '
+                                   'the Content-Range of the response is '
+                                   'missing or malformed.')
+        start, total = match.groups()
+        return int(start), None if total == '*' else int(total)
+
+    # the server ignored the Range header and is sending everything
+    length = resp.headers.get('Content-Length')
+    if length is None or resp.headers.get('Content-Encoding'):
+        return 0, None
+    return 0, int(length)
+
+
+def _file_sha256(path, chunk_size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _start_resumable(path, progress):
+    """Prepares ``path`` for a resumable download described by ``progress``
+    and returns the path of its progress record.  A partial file is kept
+    only if its progress record matches."""
+    progress_path = path + '.progress'
+    try:
+        with open(progress_path) as fd:
+            resumable = json.load(fd) == progress
+    except (IOError, ValueError):
+        resumable = False
+    if not resumable or not os.path.exists(path):
+        # start from scratch; a file without a progress record may be
+        # complete, or from some other download
+        open(path, 'wb').close()
+        with open(progress_path, 'w') as fd:
+            json.dump(progress, fd)
+    return progress_path
+
+
+def _finish_resumable(path, progress_path, job_id, total, expected_sha256,
+                      chunk_size):
+    """Checks the size and digest of a finished resumable download and
+    removes its progress record; returns the size and SHA-256 digest.  A
+    download failing the checks is deleted, so that the next attempt starts
+    over instead of resuming from a corrupt file."""
+    size = os.path.getsize(path)
+    sha256 = _file_sha256(path, chunk_size)
+    error = None
+    if total is not None and size != total:
+        error = ('The download of job {} is {} bytes, but the server '
+                 'reported {}.'.format(job_id, size, total))
+    elif expected_sha256 is not None and sha256 != expected_sha256.lower():
+        error = ('The download of job {} has SHA-256 {}, but {} was '
+                 'expected.'.format(job_id, sha256, expected_sha256))
+    if error is not None:
+        os.remove(path)
+    os.remove(progress_path)
+    if error is not None:
+        raise GeneralException(error)
+    return size, sha256
+
+
+def _transfer_stats(written, started):
+    elapsed = _clock() - started
+    return dict(bytes=written,
+                seconds=elapsed,
+                bytes_per_second=written / elapsed if elapsed > 0 else None)
+
+
+class _JobPoller(object):
+    """Decides when to check the status of a job being waited for next.
+    While the job is queued or parsing, the interval doubles after each
+    check; once it is running, the job's remaining time is estimated from
+    how fast ``percent_complete`` has been rising and the next check made
+    halfway there, so that checks become more frequent as the job nears
+    completion.  Intervals are kept between ``min_interval`` and
+    ``max_interval`` seconds."""
+
+    def __init__(self, min_interval, max_interval):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.eta = None
+        self._progress = None   # (time, percent) of the last change seen
+
+    def update(self, status, now):
+        """Records the status of the job at time ``now``; returns the delay
+        until the next check, or ``None`` if the job is finished"""
+        if status.get('job_status') in _finished_job_status:
+            return None
+
+        percent = float(status.get('percent_complete') or 0)
+        running = status.get('job_status') == 'running'
+        self.eta = None
+        if (running and self._progress is not None and
+                percent > self._progress[1]):
+            started, previous = self._progress
+            rate = (percent - previous) / max(now - started, 1e-6)
+            self.eta = (100 - percent) / rate
+            delay = self.eta / 2
+        else:
+            delay = self.interval * 2
+
+        if not running:
+            # time spent queued says nothing about the rate of progress
+            self._progress = None
+        elif self._progress is None or percent != self._progress[1]:
+            self._progress = (now, percent)
+
+        self.interval = min(max(delay, self.min_interval), self.max_interval)
+        return self.interval
+
+
+def _job_timeout(job_ids, timeout):
+    return JobTimeout('Timed out after {} seconds waiting for job(s) {} to '
+                      'finish'.format(timeout,
+                                      ', '.join(str(j) for j in job_ids)))
+
+
+class _CountingReader(io.RawIOBase):
+    """Reads from the raw file ``raw``, counting the bytes read"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        count = self.raw.readinto(buf)
+        self.count += count or 0
+        return count
+
+
+def _csv_rows(stream):
+    """Parses the buffered binary ``stream`` as CSV, yielding each row as a
+    list of strings"""
+    # Python 2 COMPAT
+    if sys.version_info[0] < 3:
+        for row in csv.reader(stream):
+            yield [cell.decode('utf-8-sig') for cell in row]
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        for row in csv.reader(text):
+            yield row
+
+
+class _RowMaker(object):
+    """Turns the parsed CSV rows of a download into ``namedtuple`` records,
+    taking the field names from the first row unless ``fieldnames`` is
+    given, and converting the values of appended yes/no and integer
+    columns"""
+
+    def __init__(self, fieldnames, appends, binary_operators_type):
+        yes, no = _binary_values[binary_operators_type]
+        self._booleans = {yes: True, no: False}
+        self._appends = appends
+        self.fieldnames = None
+        if fieldnames is not None:
+            self._set_fieldnames(fieldnames)
+
+    def _set_fieldnames(self, fieldnames):
+        self.fieldnames = fieldnames
+        self._record = namedtuple('DownloadRow', fieldnames, rename=True)
+        self._converters = []
+        for index, name in enumerate(fieldnames):
+            if name not in self._appends:
+                continue
+            if name in _boolean_appends:
+                self._converters.append((index, self._to_bool))
+            elif name == 'email_status_int':
+                self._converters.append((index, self._to_int))
+
+    def _to_bool(self, value):
+        return self._booleans.get(value, value)
+
+    @staticmethod
+    def _to_int(value):
+        return int(value) if value.isdigit() else value
+
+    def __call__(self, row):
+        """Returns the record for ``row``, or ``None`` if it is the header
+        or blank"""
+        # blank lines, such as the second half of a "spooled" \n\r
+        if not row:
+            return None
+        if self.fieldnames is None:
+            self._set_fieldnames(row)
+            return None
+        width = len(self.fieldnames)
+        if len(row) != width:
+            row = (row + [''] * width)[:width]
+        for index, convert in self._converters:
+            row[index] = convert(row[index])
+        return self._record._make(row)
+
+
+def _download_rows(resp, make_row, chunk_size, done=None):
+    """Yields the records of the rows of the streaming response ``resp``,
+    then closes it and calls ``done(error, bytes_received)``, if given"""
+    raw = resp.raw
+    raw.decode_content = True
+    # keep the stream open for the buffered reader after the body is read
+    raw.auto_close = False
+    body = _CountingReader(raw)
+    error = None
+    try:
+        for row in _csv_rows(io.BufferedReader(body, chunk_size)):
+            record = make_row(row)
+            if record is not None:
+                yield record
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        resp.close()
+        if done is not None:
+            done(error, body.count)
+
+
 class JobRunnerMixin(object):
     """
     Mixin class that exposes methods of interacting with the NeverBounce
@@ -116,10 +726,8 @@ class JobRunnerMixin(object):
 
         data.update(extra_query)
 
-        endpoint = urlforversion(self.api_version, 'jobs', 'search')
-        resp = self._make_request('GET', endpoint, params=data)
-        self._check_response(resp)
-        return resp.json()
+        endpoint = self._url('jobs', 'search')
+        return self._request('GET', endpoint, params=data)
 
     def raw_results(self, job_id, page=1, items_per_page=10, **extra_query):
         """Direct interface to the jobs/results endpoint. See the documentation
@@ -130,10 +738,8 @@ class JobRunnerMixin(object):
 
         data.update(extra_query)
 
-        endpoint = urlforversion(self.api_version, 'jobs', 'results')
-        resp = self._make_request('GET', endpoint, params=data)
-        self._check_response(resp)
-        return resp.json()
+        endpoint = self._url('jobs', 'results')
+        return self._request('GET', endpoint, params=data)
 
     def jobs_search(self, **kwargs):
         """
@@ -176,8 +782,18 @@ class JobRunnerMixin(object):
             items_per_page (int):
                 How many items to include per page of results.
 
+            prefetch (int):
+                How many of the following pages to fetch in the background
+                while the current one is consumed.  Default is ``0`` (fetch
+                each page when it is reached).
+
+            resume_from (str):
+                A checkpoint taken from an earlier iterator with
+                ``ResultIter.checkpoint``; iteration continues from where it
+                was taken, and the other search arguments are ignored.
+
         Returns:
-            An instance of ``_result_iter``
+            An instance of ``ResultIter``
 
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-search
@@ -197,14 +813,142 @@ class JobRunnerMixin(object):
             job_id (int):
                 The numeric id of the job to get results for.
 
+        Keyword Arguments:
+            prefetch (int):
+                How many of the following pages to fetch in the background
+                while the current one is consumed, so that large result sets
+                are not fetched one round trip at a time.  Default is ``0``
+                (fetch each page when it is reached).
+
+            resume_from (str):
+                A checkpoint taken from an earlier iterator over this job's
+                results with ``ResultIter.checkpoint``; iteration continues
+                from where it was taken.
+
         Returns:
-            An instance of ``_result_iter``
+            An instance of ``ResultIter``
 
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-results
         """
+        self._check_resume_job(job_id, kwargs.get('resume_from'))
         return ResultIter(self.raw_results, job_id, **kwargs)
 
+    def jobs_results_table(self, job_id, items_per_page=1000, **kwargs):
+        """
+        Fetches all results of job ``job_id`` into a ``ResultTable``, which
+        stores them in a fraction of the memory of the API's dicts.
+
+        Arguments:
+            job_id (int):
+                The numeric id of the job to get results for.
+
+            items_per_page (int):
+                The number of results fetched per request.  Default is
+                ``1000``.
+
+        Any other keyword arguments, such as ``prefetch``, are passed to
+        ``jobs_results``.
+
+        Returns:
+            A ``ResultTable``
+        """
+        results = self.jobs_results(job_id, items_per_page=items_per_page,
+                                    **kwargs)
+        try:
+            return ResultTable(results)
+        finally:
+            results.close()
+
+    @staticmethod
+    def _check_resume_job(job_id, resume_from):
+        """Makes sure a results checkpoint belongs to job ``job_id``"""
+        if resume_from is None:
+            return
+        query, _ = _load_checkpoint(resume_from)
+        if str(query.get('job_id')) != str(job_id):
+            msg = ('the checkpoint is for the results of job {}, not '
+                   '{}'.format(query.get('job_id'), job_id))
+            raise ValueError(msg)
+
+    def jobs_results_parallel(self, job_id, sink, workers=4,
+                              items_per_page=1000, ordered=False,
+                              **extra_query):
+        """
+        Fetches every page of the results of job ``job_id`` using a pool of
+        ``workers`` threads, and hands each page to ``sink`` as it arrives.
+        Only a bounded number of pages are fetched ahead of those delivered,
+        so memory use does not grow with the size of the job.
+
+        Arguments:
+            job_id (int):
+                The numeric id of the job to get results for.
+
+            sink (callable, queue or file):
+                Where to deliver results.  A callable is called as
+                ``sink(page, results)``; an object with a ``put`` method (such
+                as a ``queue.Queue``) receives ``(page, results)`` tuples; a
+                file receives each result as a line of JSON.  ``results`` is
+                the list of result objects on the page.
+
+            workers (int):
+                The number of pages fetched at once.  Default is ``4``.
+
+            items_per_page (int):
+                How many results to fetch per request.  Default is ``1000``.
+
+            ordered (bool):
+                If ``True``, deliver pages in page order, holding back pages
+                that arrive early.  Default is ``False`` (deliver pages as
+                they arrive).
+
+            **extra_query:
+                Passed on to ``raw_results``.
+
+        Returns:
+            A ``dict`` with keys ``job_id``, ``total_pages`` and
+            ``total_results``.
+        """
+        deliver = _page_sink(sink)
+
+        def fetch(page):
+            return page, self.raw_results(job_id, page=page,
+                                          items_per_page=items_per_page,
+                                          **extra_query)
+
+        _, data = fetch(1)
+        total_pages = int(data['total_pages'])
+        deliver(1, data['results'])
+
+        window = 2 * workers
+        pages = iter(range(2, total_pages + 1))
+        next_page = 2       # the next page to deliver, when ordered
+        held = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            while True:
+                for page in pages:
+                    pending.add(executor.submit(fetch, page))
+                    if len(pending) >= window or (
+                            ordered and page - next_page >= window):
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page, data = future.result()
+                    if not ordered:
+                        deliver(page, data['results'])
+                        continue
+                    held[page] = data['results']
+                    while next_page in held:
+                        deliver(next_page, held.pop(next_page))
+                        next_page += 1
+
+        return dict(job_id=job_id,
+                    total_pages=total_pages,
+                    total_results=int(data['total_results']))
+
     def jobs_create(self, input, from_url=False, filename=None,
                     auto_parse=False, auto_start=False, as_sample=False,
                     historical_data=True, allow_manual_review=None,
@@ -213,11 +957,20 @@ class JobRunnerMixin(object):
         Creates a bulk job.
 
         Arguments:
-            input (str or list):
-                The input may be either a string URL to a remote location from
-                which to read input objects, or a list of mappings denoting
-                emails.  Each mapping should contain an ``email`` key and may
-                contain arbitrary other keys as metadata.
+            input (str, list, iterable or file):
+                The input may be a string URL to a remote location from
+                which to read input objects (see ``from_url``), or the emails
+                to verify: a list or any other iterable of mappings, each
+                with an ``email`` key and arbitrary other keys as metadata
+                (or of lists, with the email first), or a CSV file given as
+                an open file or a path.  If the first row of the CSV file
+                has an ``email`` column, it is taken as the header.
+
+                Iterables, files and lists of over 10,000 items are read
+                and sent a few rows at a time, in a chunked request body, so
+                that memory use does not grow with the size of the input.  A
+                one-shot iterable such as a generator can't be re-read, so
+                the request is then not retried.
 
             from_url (bool):
                 If ``True``, consider ``input`` a remote URL. Default is
@@ -262,10 +1015,9 @@ class JobRunnerMixin(object):
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-create
         """
-        endpoint = urlforversion(self.api_version, 'jobs', 'create')
+        endpoint = self._url('jobs', 'create')
 
-        data = dict(input=input,
-                    auto_parse=int(auto_parse),
+        data = dict(auto_parse=int(auto_parse),
                     auto_start=int(auto_start),
                     run_sample=int(as_sample))
 
@@ -286,10 +1038,28 @@ class JobRunnerMixin(object):
         if callback_headers is not None:
             data['callback_headers'] = callback_headers
 
-        resp = self._make_request('POST', endpoint, json=data)
-        self._check_response(resp)
-
-        return resp.json()
+        # a job started at once spends a credit per row; the rows of a
+        # remote list can't be counted ahead
+        reservation = None
+        if auto_parse and auto_start and not as_sample and not from_url:
+            reservation = self._reserve_credits(
+                len(input) if isinstance(input, (list, tuple)) else 0)
+
+        # a repeated create would make a duplicate job
+        if from_url or (isinstance(input, (list, tuple)) and
+                        len(input) <= _STREAM_MIN_ROWS):
+            data['input'] = input
+            return self._request('POST', endpoint, json=data,
+                                 idempotent=False, reservation=reservation)
+        if isinstance(input, (list, tuple)):
+            body = _InputStream(data, input)
+        else:
+            # streamed rows are reserved as they are sent
+            body = _InputStream(data, input, reservation)
+        return self._request('POST', endpoint,
+                             data=body,
+                             headers={'Content-Type': 'application/json'},
+                             idempotent=False, reservation=reservation)
 
     def jobs_parse(self, job_id, auto_start=False):
         """
@@ -311,11 +1081,9 @@ class JobRunnerMixin(object):
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-parse
         """
-        endpoint = urlforversion(self.api_version, 'jobs', 'parse')
+        endpoint = self._url('jobs', 'parse')
         data = dict(job_id=job_id, auto_start=int(auto_start))
-        resp = self._make_request('POST', endpoint, json=data)
-        self._check_response(resp)
-        return resp.json()
+        return self._request('POST', endpoint, json=data)
 
     def jobs_start(self, job_id, run_sample=False, allow_manual_review=None):
         """
@@ -342,15 +1110,13 @@ class JobRunnerMixin(object):
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-start
         """
-        endpoint = urlforversion(self.api_version, 'jobs', 'start')
+        endpoint = self._url('jobs', 'start')
         data = dict(job_id=job_id, run_sample=int(run_sample))
 
         if allow_manual_review is not None:
             data['allow_manual_review'] = int(allow_manual_review)
 
-        resp = self._make_request('POST', endpoint, json=data)
-        self._check_response(resp)
-        return resp.json()
+        return self._request('POST', endpoint, json=data)
 
     def jobs_status(self, job_id):
         """
@@ -367,20 +1133,199 @@ class JobRunnerMixin(object):
         See also:
             https://developers.neverbounce.com/v4.0/reference#jobs-status
         """
-        endpoint = urlforversion(self.api_version, 'jobs', 'status')
-        resp = self._make_request('GET', endpoint, params=dict(job_id=job_id))
-        self._check_response(resp)
-        return resp.json()
+        endpoint = self._url('jobs', 'status')
+        return self._request('GET', endpoint, params=dict(job_id=job_id))
+
+    def wait_for_job(self, job_id, timeout=None, progress=None,
+                     min_interval=1, max_interval=60):
+        """
+        Waits for job ``job_id`` to finish, checking its status with
+        ``jobs_status`` at adaptive intervals: they grow while the job is
+        queued, and once it is running are based on the time it is estimated
+        to take to complete from the progress it has been making.
+
+        Arguments:
+            job_id (int): the job's numeric id
+
+            timeout (float):
+                The number of seconds to wait at most, or ``None`` to wait
+                for as long as the job takes.  Default is ``None``.
+
+            progress (callable):
+                If given, called as ``progress(job_id, status)`` with each
+                status object received.  Default is ``None``.
+
+            min_interval (float):
+                The shortest time between two checks, in seconds.  Default
+                is ``1``.
+
+            max_interval (float):
+                The longest time between two checks, in seconds.  Default
+                is ``60``.
+
+        Returns:
+            The last status object of the job, whose ``job_status`` is
+            ``'complete'`` or ``'failed'``.
+
+        Raises:
+            JobTimeout: if the job did not finish within ``timeout``
+                seconds.
+        """
+        deadline = None if timeout is None else _clock() + timeout
+        poller = _JobPoller(min_interval, max_interval)
+        while True:
+            status = self.jobs_status(job_id)
+            if progress is not None:
+                progress(job_id, status)
+            delay = poller.update(status, _clock())
+            if delay is None:
+                return status
+            if deadline is not None:
+                remaining = deadline - _clock()
+                if remaining <= 0:
+                    raise _job_timeout([job_id], timeout)
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def wait_for_jobs(self, job_ids, timeout=None, progress=None, workers=4,
+                      min_interval=1, max_interval=60):
+        """
+        Waits for many jobs at once, yielding the status object of each as
+        it finishes.  Each job is checked at the adaptive intervals used by
+        ``wait_for_job``, and the checks that are due are made by a pool of
+        ``workers`` threads, so that any number of jobs may be waited for
+        with a few threads.
+
+        Arguments:
+            job_ids (iterable): the numeric ids of the jobs
+
+            workers (int):
+                The number of status checks made at once.  Default is
+                ``4``.
+
+        The other arguments are those of ``wait_for_job``; ``timeout``
+        applies to all the jobs together.
+
+        Returns:
+            A generator of the last status objects of the jobs, in the order
+            they finish.  ``JobTimeout`` is raised from it once ``timeout``
+            seconds have passed with jobs still running.
+        """
+        job_ids = list(OrderedDict.fromkeys(job_ids))
+        return self._wait_for_jobs(job_ids, timeout, progress, workers,
+                                   min_interval, max_interval)
+
+    def _wait_for_jobs(self, job_ids, timeout, progress, workers,
+                       min_interval, max_interval):
+        """The generator returned by ``wait_for_jobs``"""
+        deadline = None if timeout is None else _clock() + timeout
+        pollers = dict((job_id, _JobPoller(min_interval, max_interval))
+                       for job_id in job_ids)
+        # (time of the next check, tie breaker, job id)
+        sequence = count()
+        due = [(0, next(sequence), job_id) for job_id in job_ids]
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            while due or pending:
+                now = _clock()
+                while due and due[0][0] <= now:
+                    _, _, job_id = heapq.heappop(due)
+                    future = executor.submit(self.jobs_status, job_id)
+                    pending[future] = job_id
+                if deadline is not None and now >= deadline:
+                    raise _job_timeout(pollers, timeout)
+
+                wait_time = due[0][0] - now if due else None
+                if deadline is not None:
+                    wait_time = min(wait_time or deadline - now,
+                                    deadline - now)
+                if not pending:
+                    time.sleep(wait_time)
+                    continue
+
+                done, _ = wait(pending, timeout=wait_time,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = pending.pop(future)
+                    status = future.result()
+                    if progress is not None:
+                        progress(job_id, status)
+                    delay = pollers[job_id].update(status, _clock())
+                    if delay is None:
+                        del pollers[job_id]
+                        yield status
+                    else:
+                        heapq.heappush(due, (_clock() + delay,
+                                             next(sequence), job_id))
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _download_params(self, job_id, segmentation, appends,
+                         yes_no_representation, line_feed_type):
+        """Validates the options of ``jobs_download`` and builds the request
+        body for the jobs/download endpoint"""
+        data = dict(job_id=job_id)
+
+        def add_opts(opts, allowable):
+            # does a small bit of bookeeping to make sure we're returning
+            # useful errors if an option is given with a typo
+            for opt in opts:
+                if opt not in allowable:
+                    msg = ('{} is not a recognized option for the download'
+                           'endpoint'.format(opt))
+                    raise ValueError(msg)
+                data[opt] = 1
+
+        add_opts(segmentation, _segmentation_options)
+        add_opts(appends, _appends_options)
+
+        def set_setting(arg, argname, map_):
+            # confer note on add_opts; these are just conveniences
+            if arg in map_.values():
+                data[argname] = arg
+            else:
+                try:
+                    data[argname] = map_[arg]
+                except KeyError:
+                    msg = '{} is not a recognizable value for {}'.format(
+                        arg, argname
+                    )
+                    raise ValueError(msg)
+
+        set_setting(yes_no_representation, 'binary_operators_type', {
+            'int': 'BIN_1_0',
+            'upper': 'BIN_Y_N',
+            'lower': 'BIN_y_n',
+            'lowercase': 'BIN_yes_no',
+            'capitalcase': 'BIN_Yes_No',
+            'bool': 'BIN_true_false'
+        })
+
+        set_setting(line_feed_type, 'line_feed_type', {
+            'unix': 'LINEFEED_0A',         # \n
+            'windows': 'LINEFEED_0D0A',    # \r\n
+            'appleII': 'LINEFEED_0D',      # \r
+            'spooled': 'LINEFEED_0A'       # \n\r
+        })
+
+        return data
 
     def jobs_download(self, job_id, fd,
                       segmentation=('valids', 'invalids',
                                     'catchalls', 'unknowns'),
                       appends=(),
                       yes_no_representation='int',
-                      line_feed_type='unix'):
+                      line_feed_type='unix',
+                      chunk_size=DOWNLOAD_CHUNK_SIZE):
         r"""
         Download the full results of job ``job_id`` as a CSV file into the
-        file-like object given by ``fd``.
+        file-like object given by ``fd``.  If ``fd`` is a binary file or
+        stream (such as a file opened with mode ``'wb'``) and the response
+        is not compressed, the download is read from the connection into a
+        single reused buffer and written from there.
 
         Arguments:
 
@@ -465,67 +1410,248 @@ class JobRunnerMixin(object):
                    spooled     LINEFEED_0A     \n\r
                    =========== =============== ==========
 
+            chunk_size (int):
+                The number of bytes read from the network and written to
+                ``fd`` at a time.  Default is ``DOWNLOAD_CHUNK_SIZE`` (256
+                KiB).
+
         Returns:
-            ``None``
+            A ``dict`` with keys ``bytes`` (the number of bytes written),
+            ``seconds`` and ``bytes_per_second``
 
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-download
         """
-        data = dict(job_id=job_id)
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+
+        endpoint = self._url('jobs', 'download')
+        started = _clock()
+        resp = None
+        try:
+            # the return val is (possibly) streaming; remember to set stream
+            resp = self._make_request('POST', endpoint, json=data,
+                                      stream=True)
+
+            # returns json if there's an error, octet-stream if all is good
+            if resp.headers['Content-Type'] == 'application/json':
+                self._check_response(resp)
+
+            # write the streaming csv file to fd
+            try:
+                written = _write_download(resp, fd, chunk_size)
+            finally:
+                resp.close()
+        except Exception as exc:
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=exc)
+            raise
+        if self.hooks:
+            self._emit('POST', endpoint, 1, started, resp,
+                       bytes_received=written)
+        return _transfer_stats(written, started)
+
+    def jobs_download_rows(self, job_id,
+                           segmentation=('valids', 'invalids',
+                                         'catchalls', 'unknowns'),
+                           appends=(),
+                           yes_no_representation='int',
+                           line_feed_type='unix',
+                           fieldnames=None,
+                           chunk_size=DOWNLOAD_CHUNK_SIZE):
+        """
+        Downloads the full results of job ``job_id`` and parses the CSV as
+        it streams in, so that rows can be processed in a single pass and in
+        constant memory, without saving the file first.
 
-        def add_opts(opts, allowable):
-            # does a small bit of bookeeping to make sure we're returning
-            # useful errors if an option is given with a typo
-            for opt in opts:
-                if opt not in allowable:
-                    msg = ('{} is not a recognized option for the download'
-                           'endpoint'.format(opt))
-                    raise ValueError(msg)
-                data[opt] = 1
+        Each row is a ``namedtuple`` whose fields are named after the columns
+        (invalid identifiers are renamed to ``_<index>``, see
+        ``collections.namedtuple``).  The values of appended yes/no columns
+        (``bad_syntax``, ``role_account``, ...) are converted to ``bool``,
+        and ``email_status_int`` to ``int``; everything else is a string.
 
-        add_opts(segmentation, _segmentation_options)
-        add_opts(appends, _appends_options)
+        Arguments:
+            job_id (int):
+                the integer ID of the job to download
 
-        def set_setting(arg, argname, map_):
-            # confer note on add_opts; these are just conveniences
-            if arg in map_.values():
-                data[argname] = arg
-            else:
+            segmentation, appends, yes_no_representation, line_feed_type:
+                see ``jobs_download``
+
+            fieldnames (list[str]):
+                The names of the columns.  Default is to read them from the
+                first row of the download.  When given, every row is treated
+                as data.
+
+            chunk_size (int):
+                The number of bytes read from the network at a time.  Default
+                is ``DOWNLOAD_CHUNK_SIZE`` (256 KiB).
+
+        Returns:
+            An iterator of rows.  The download is made when this method is
+            called, and its connection released when the iterator is
+            exhausted or closed.
+
+        See Also:
+            https://developers.neverbounce.com/v4.0/reference#jobs-download
+        """
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+
+        endpoint = self._url('jobs', 'download')
+        started = _clock()
+        resp = None
+        try:
+            resp = self._make_request('POST', endpoint, json=data,
+                                      stream=True)
+            if resp.headers['Content-Type'] == 'application/json':
                 try:
-                    data[argname] = map_[arg]
-                except KeyError:
-                    msg = '{} is not a recognizable value for {}'.format(
-                        arg, argname
-                    )
-                    raise ValueError(msg)
+                    self._check_response(resp)
+                finally:
+                    resp.close()
+        except Exception as exc:
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=exc)
+            raise
+
+        def done(error, received):
+            if self.hooks:
+                self._emit('POST', endpoint, 1, started, resp, error=error,
+                           bytes_received=received)
+
+        make_row = _RowMaker(fieldnames, set(appends),
+                             data['binary_operators_type'])
+        return _download_rows(resp, make_row, chunk_size, done)
+
+    def jobs_download_resumable(self, job_id, path,
+                                segmentation=('valids', 'invalids',
+                                              'catchalls', 'unknowns'),
+                                appends=(),
+                                yes_no_representation='int',
+                                line_feed_type='unix',
+                                chunk_size=DOWNLOAD_CHUNK_SIZE,
+                                expected_sha256=None,
+                                retry_policy=None):
+        """
+        Downloads the full results of job ``job_id`` as a CSV file at
+        ``path``, picking up where an interrupted download left off.
 
-        set_setting(yes_no_representation, 'binary_operators_type', {
-            'int': 'BIN_1_0',
-            'upper': 'BIN_Y_N',
-            'lower': 'BIN_y_n',
-            'lowercase': 'BIN_yes_no',
-            'capitalcase': 'BIN_Yes_No',
-            'bool': 'BIN_true_false'
-        })
+        While the download is incomplete, its request options are recorded
+        in a ``<path>.progress`` file next to it.  If the download fails
+        with a network error (or is cut short), it is resumed from the last
+        byte written, using an HTTP Range request where the server allows it
+        and otherwise skipping the bytes already written.  The same happens
+        when this method is called again after a crash, as long as the
+        options are the same; if they differ, the download starts over.
 
-        set_setting(line_feed_type, 'line_feed_type', {
-            'unix': 'LINEFEED_0A',         # \n
-            'windows': 'LINEFEED_0D0A',    # \r\n
-            'appleII': 'LINEFEED_0D',      # \r
-            'spooled': 'LINEFEED_0A'       # \n\r
-        })
+        When the download completes, its size is checked against the size
+        given by the server and the SHA-256 digest of the file is computed.
+
+        Arguments:
+            job_id (int):
+                the integer ID of the job to download
+
+            path (str):
+                the file to download to
+
+            segmentation, appends, yes_no_representation, line_feed_type:
+                see ``jobs_download``
 
-        endpoint = urlforversion(self.api_version, 'jobs', 'download')
-        # the return val is (possibly) streaming; remember to set stream
-        resp = self._make_request('POST', endpoint, json=data, stream=True)
+            chunk_size (int):
+                see ``jobs_download``
 
-        # returns json if there's an error, octet-stream if all is good
-        if resp.headers['Content-Type'] == 'application/json':
-            self._check_response(resp)
+            expected_sha256 (str):
+                If given, the hex SHA-256 digest the finished file must have.
 
-        # write the streaming csv file to fd
-        for chunk in resp.iter_content(chunk_size=128):
-            fd.write(chunk)
+            retry_policy (RetryPolicy):
+                How to retry interrupted transfers.  Default is up to 5
+                attempts with exponential backoff.
+
+        Returns:
+            A ``dict`` with keys ``bytes`` (the size of the file), ``seconds``,
+            ``bytes_per_second`` (of this call's transfers), ``resumed_from``
+            (the size of the partial file found at the start), ``attempts``
+            and ``sha256``.
+
+        Raises:
+            GeneralException: if the finished file does not have the expected
+                size or digest.  The file and its progress record are then
+                deleted, so that the next call starts over.
+        """
+        data = self._download_params(job_id, segmentation, appends,
+                                     yes_no_representation, line_feed_type)
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_attempts=5,
+                                       retry_on=_DOWNLOAD_ERRORS)
+
+        progress_path = _start_resumable(
+            path, dict(job_id=job_id, request=data))
+
+        endpoint = self._url('jobs', 'download')
+        resumed_from = os.path.getsize(path)
+        started = _clock()
+        written = 0
+        attempt = 0
+        total = None
+        while True:
+            attempt += 1
+            offset = os.path.getsize(path)
+            # ranges only make sense over the unencoded body
+            headers = {'Accept-Encoding': 'identity'}
+            if offset:
+                headers['Range'] = 'bytes={}-'.format(offset)
+            resp = None
+            attempt_started = _clock()
+            try:
+                resp = self._make_request('POST', endpoint, json=data,
+                                          headers=headers, stream=True)
+                if resp.headers.get('Content-Type') == 'application/json':
+                    self._check_response(resp)
+                if resp.status_code != 416:
+                    resp.raise_for_status()
+
+                start, total = _expected_size(resp, offset)
+                if resp.status_code == 416:
+                    # nothing left to send
+                    if self.hooks:
+                        self._emit('POST', endpoint, attempt,
+                                   attempt_started, resp, bytes_received=0)
+                    break
+                if start > offset:
+                    raise GeneralException('Unable to resume the download: '
+                                           'the server sent bytes from {} '
+                                           'onward but {} were expected.'
+                                           .format(start, offset))
+                with open(path, 'ab') as fd:
+                    received = _write_download(resp, fd, chunk_size,
+                                               skip=offset - start)
+                written += received
+                if total is not None and os.path.getsize(path) < total:
+                    raise _IncompleteDownload()
+                if self.hooks:
+                    self._emit('POST', endpoint, attempt, attempt_started,
+                               resp, bytes_received=received)
+                break
+            except Exception as exc:
+                if self.hooks:
+                    self._emit('POST', endpoint, attempt, attempt_started,
+                               resp, error=exc)
+                delay = retry_policy.next_delay(attempt, exc, True, resp)
+                if delay is None:
+                    raise
+            finally:
+                if resp is not None:
+                    resp.close()
+            time.sleep(delay)
+
+        size, sha256 = _finish_resumable(path, progress_path, job_id, total,
+                                         expected_sha256, chunk_size)
+
+        stats = _transfer_stats(written, started)
+        stats.update(bytes=size,
+                     resumed_from=resumed_from,
+                     attempts=attempt,
+                     sha256=sha256)
+        return stats
 
     def jobs_delete(self, job_id):
         """
@@ -540,7 +1666,5 @@ class JobRunnerMixin(object):
         See Also:
             https://developers.neverbounce.com/v4.0/reference#jobs-delete
         """
-        endpoint = urlforversion(self.api_version, 'jobs', 'delete')
-        resp = self._make_request('GET', endpoint, params=dict(job_id=job_id))
-        self._check_response(resp)
-        return resp.json()
+        endpoint = self._url('jobs', 'delete')
+        return self._request('GET', endpoint, params=dict(job_id=job_id))
@@ -0,0 +1,207 @@
+"""
+Caching of single verification results
+"""
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = ['ResultCache', 'MemoryCache', 'SQLiteCache', 'DEFAULT_TTLS']
+
+_DAY = 24 * 60 * 60
+
+# how long, in seconds, each kind of verification result stays fresh; results
+# not listed here are never cached
+DEFAULT_TTLS = {
+    'valid': 30 * _DAY,
+    'invalid': 30 * _DAY,
+    'disposable': 30 * _DAY,
+    'catchall': 7 * _DAY,
+    'unknown': 60 * 60,
+}
+
+# these fields describe the call rather than the address, so they are not
+# stored with the result
+_UNCACHED_FIELDS = ('credits_info',)
+
+
+class ResultCache(object):
+    """Base class for ``single_check`` result caches.
+
+    Results are keyed on the normalized email address together with the
+    ``address_info`` and ``historical_data`` flags, and expire after the time
+    given for their ``result`` in ``ttls``.  Cached results do not include
+    ``credits_info``, which would be stale.
+
+    Subclasses implement ``_get``, ``_set`` and ``clear``.
+
+    Args:
+        ttls (dict): Maps results (``'valid'``, ``'unknown'``, ...) to their
+            time to live in seconds.  Default is ``DEFAULT_TTLS``.
+    """
+
+    def __init__(self, ttls=None):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(email, address_info=False, historical_data=True):
+        """Returns the cache key for a ``single_check`` call"""
+        return '{}|{:d}|{:d}'.format(email.strip().lower(),
+                                     bool(address_info),
+                                     bool(historical_data))
+
+    def ttl_for(self, result):
+        """Returns the time to live of an API response, or ``0`` if it should
+        not be cached"""
+        return self.ttls.get(result.get('result'), 0)
+
+    def get(self, key):
+        """Returns the cached result for ``key``, or ``None``"""
+        value = self._get(key, time.time())
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, result):
+        """Caches the API response ``result`` under ``key``"""
+        ttl = self.ttl_for(result)
+        if ttl <= 0:
+            return
+        # copied, so that changes to ``result`` by the caller don't leak
+        # into the cache
+        value = dict((k, copy.deepcopy(v)) for k, v in result.items()
+                     if k not in _UNCACHED_FIELDS)
+        self._set(key, value, time.time() + ttl)
+
+    def _get(self, key, now):
+        raise NotImplementedError
+
+    def _set(self, key, value, expires):
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes every entry from the cache"""
+        raise NotImplementedError
+
+
+class MemoryCache(ResultCache):
+    """An in-process, thread-safe cache holding at most ``maxsize`` results
+    and evicting the least recently used first.
+
+    Args:
+        maxsize (int): The maximum number of cached results.  Default is
+            ``100000``.
+        ttls (dict): See ``ResultCache``.
+    """
+
+    def __init__(self, maxsize=100000, ttls=None):
+        super(MemoryCache, self).__init__(ttls)
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key, now):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= now:
+                return None
+            # re-insert to mark as most recently used
+            self._entries[key] = entry
+        return copy.deepcopy(value)
+
+    def _set(self, key, value, expires):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (expires, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(ResultCache):
+    """A cache stored in a local SQLite database, so that results survive
+    restarts and may be shared by processes on the same machine.
+
+    Args:
+        path (str): The database file; created if it does not exist.
+        maxsize (int): If given, the maximum number of cached results; the
+            least recently used are evicted first.  Default is ``None``.
+        ttls (dict): See ``ResultCache``.
+    """
+
+    def __init__(self, path, maxsize=None, ttls=None):
+        super(SQLiteCache, self).__init__(ttls)
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            self._db.execute('CREATE TABLE IF NOT EXISTS single_check ('
+                             'key TEXT PRIMARY KEY, '
+                             'expires REAL NOT NULL, '
+                             'used REAL NOT NULL, '
+                             'value TEXT NOT NULL)')
+            self._db.execute('CREATE INDEX IF NOT EXISTS single_check_used '
+                             'ON single_check (used)')
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute(
+                'SELECT COUNT(*) FROM single_check').fetchone()[0]
+
+    def _get(self, key, now):
+        with self._lock, self._db:
+            row = self._db.execute(
+                'SELECT expires, value FROM single_check WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                self._db.execute('DELETE FROM single_check WHERE key = ?',
+                                 (key,))
+                return None
+            if self.maxsize is not None:
+                self._db.execute(
+                    'UPDATE single_check SET used = ? WHERE key = ?',
+                    (now, key))
+        return json.loads(row[1])
+
+    def _set(self, key, value, expires):
+        with self._lock, self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO single_check VALUES (?, ?, ?, ?)',
+                (key, expires, time.time(), json.dumps(value)))
+            if self.maxsize is not None:
+                self._db.execute(
+                    'DELETE FROM single_check WHERE key IN ('
+                    'SELECT key FROM single_check ORDER BY used DESC '
+                    'LIMIT -1 OFFSET ?)', (self.maxsize,))
+
+    def purge(self):
+        """Deletes expired results from the database"""
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM single_check WHERE expires <= ?',
+                             (time.time(),))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute('DELETE FROM single_check')
+
+    def close(self):
+        """Closes the database connection"""
+        self._db.close()
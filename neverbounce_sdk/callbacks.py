@@ -0,0 +1,265 @@
+"""
+Receiver for the callbacks sent to the ``callback_url`` of bulk jobs
+
+A ``CallbackReceiver`` is a WSGI application; mount it in an existing web
+application, or run it on its own with ``serve`` or from the command line::
+
+    python -m neverbounce_sdk.callbacks --port 8000 --header X-Token=secret
+
+The asyncio client module provides an ASGI adapter, ``ASGICallbackApp``.
+"""
+import argparse
+import hmac
+import json
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from .bulk import _finished_job_status
+
+# Python 2 COMPAT
+try:
+    from socketserver import ThreadingMixIn
+except ImportError:  # pragma: no cover
+    from SocketServer import ThreadingMixIn
+
+__all__ = ['CallbackReceiver', 'JobEvent']
+
+# the largest callback body accepted
+MAX_BODY_SIZE = 1024 * 1024
+
+_STATUS_LINES = {
+    200: '200 OK',
+    400: '400 Bad Request',
+    401: '401 Unauthorized',
+    404: '404 Not Found',
+    405: '405 Method Not Allowed',
+    413: '413 Payload Too Large',
+    500: '500 Internal Server Error'
+}
+
+
+class JobEvent(namedtuple('JobEvent', ['job_id', 'event', 'data'])):
+    """A callback received for a bulk job.  ``job_id`` is the job's id as a
+    string, ``event`` the name of the event (or the job's status if the
+    callback names none) and ``data`` the decoded body of the callback."""
+    __slots__ = ()
+
+    @property
+    def finished(self):
+        """``True`` if the event reports that the job completed or failed"""
+        return (self.data.get('job_status') in _finished_job_status or
+                self.event in _finished_job_status or
+                self.event.endswith(('.complete', '.completed', '.failed')))
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class CallbackReceiver(object):
+    """
+    Receives the callbacks of bulk jobs and dispatches them to handlers and
+    futures registered by job id.
+
+    Pass the same ``headers`` to the receiver and as the ``callback_headers``
+    of ``jobs_create``: callbacks that don't carry all of them are rejected,
+    so that only the API can report on your jobs.
+
+    Args:
+        headers (dict): Headers every callback must carry, with their
+            values.  Default is ``None`` (accept any callback).
+        path (str): If given, only callbacks to this path are accepted.
+            Default is ``None``.
+    """
+
+    def __init__(self, headers=None, path=None):
+        self.headers = dict(headers or {})
+        self.path = path
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._futures = {}
+        self._finished = {}
+
+    def on(self, handler, job_id=None):
+        """Calls ``handler(event)`` with every ``JobEvent`` received for job
+        ``job_id``, or for any job if ``job_id`` is ``None``; returns
+        ``handler``"""
+        with self._lock:
+            self._handlers.setdefault(self._key(job_id), []).append(handler)
+        return handler
+
+    def remove(self, handler, job_id=None):
+        """Stops calling a handler registered with ``on``"""
+        with self._lock:
+            self._handlers.get(self._key(job_id), []).remove(handler)
+
+    def future(self, job_id):
+        """Returns a ``concurrent.futures.Future`` resolved with the
+        ``JobEvent`` reporting that job ``job_id`` completed or failed.  In
+        asyncio code, await it through ``asyncio.wrap_future``."""
+        key = self._key(job_id)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                future = self._futures[key] = Future()
+                if key in self._finished:
+                    future.set_result(self._finished[key])
+        return future
+
+    @staticmethod
+    def _key(job_id):
+        return None if job_id is None else str(job_id)
+
+    def check_headers(self, headers):
+        """Returns ``True`` if ``headers`` (a mapping of lowercased header
+        names to values) carries every configured header"""
+        for name, expected in self.headers.items():
+            value = headers.get(name.lower())
+            if value is None or not hmac.compare_digest(
+                    value.encode('utf-8'), str(expected).encode('utf-8')):
+                return False
+        return True
+
+    @staticmethod
+    def parse(body):
+        """Decodes the body of a callback into a ``JobEvent``; raises
+        ``ValueError`` if it is not a callback for a job"""
+        data = json.loads(body.decode('utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError('the callback body is not a JSON object')
+        job_id = data.get('job_id', data.get('id'))
+        if job_id is None:
+            raise ValueError('the callback names no job')
+        event = data.get('event') or data.get('job_status') or ''
+        return JobEvent(str(job_id), event, data)
+
+    def dispatch(self, event):
+        """Resolves the future of ``event``'s job if the event finishes it,
+        then calls the handlers registered for the job and for all jobs"""
+        with self._lock:
+            if event.finished:
+                self._finished[event.job_id] = event
+                future = self._futures.get(event.job_id)
+                if future is not None and not future.done():
+                    future.set_result(event)
+            handlers = (self._handlers.get(event.job_id, []) +
+                        self._handlers.get(None, []))
+        for handler in handlers:
+            handler(event)
+
+    def handle(self, method, path, headers, body):
+        """Handles a callback request; returns its HTTP status code.  Used
+        by the WSGI and ASGI applications, ``headers`` is a mapping of
+        lowercased header names to values."""
+        if self.path is not None and path != self.path:
+            return 404
+        if method != 'POST':
+            return 405
+        if not self.check_headers(headers):
+            return 401
+        if len(body) > MAX_BODY_SIZE:
+            return 413
+        try:
+            event = self.parse(body)
+        except ValueError:
+            return 400
+        self.dispatch(event)
+        return 200
+
+    def __call__(self, environ, start_response):
+        """The WSGI application"""
+        headers = dict((key[5:].replace('_', '-').lower(), value)
+                       for key, value in environ.items()
+                       if key.startswith('HTTP_'))
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+        if length > MAX_BODY_SIZE:
+            status = 413
+        else:
+            body = environ['wsgi.input'].read(length) if length else b''
+            try:
+                status = self.handle(environ['REQUEST_METHOD'],
+                                     environ.get('PATH_INFO') or '/',
+                                     headers, body)
+            except Exception:
+                status = 500
+
+        payload = json.dumps({'status': 'success' if status == 200 else
+                              'error'}).encode('utf-8')
+        start_response(_STATUS_LINES[status],
+                       [('Content-Type', 'application/json'),
+                        ('Content-Length', str(len(payload)))])
+        return [payload]
+
+    def serve(self, host='127.0.0.1', port=8000, background=False):
+        """
+        Runs the receiver in its own HTTP server, one thread per request.
+
+        Args:
+            background (bool): If ``True``, run the server on a daemon thread
+                and return it at once; call its ``shutdown`` method to stop
+                it.  Otherwise serve until interrupted.  Default is
+                ``False``.
+
+        Returns:
+            The ``WSGIServer``; its ``server_port`` is the port it listens
+            on, useful when ``port`` is ``0``.
+        """
+        server = make_server(host, port, self,
+                             server_class=_ThreadingWSGIServer,
+                             handler_class=_QuietHandler)
+        if not background:
+            try:
+                server.serve_forever()
+            finally:
+                server.server_close()
+            return server
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
+
+
+def main(argv=None):
+    """Runs a receiver printing every callback as a line of JSON"""
+    parser = argparse.ArgumentParser(
+        prog='python -m neverbounce_sdk.callbacks',
+        description='Receive NeverBounce job callbacks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--path', default=None,
+                        help='only accept callbacks to this path')
+    parser.add_argument('--header', action='append', default=[],
+                        metavar='NAME=VALUE',
+                        help='require this header on every callback')
+    args = parser.parse_args(argv)
+
+    try:
+        headers = dict(header.split('=', 1) for header in args.header)
+    except ValueError:
+        parser.error('headers are given as NAME=VALUE')
+    receiver = CallbackReceiver(headers=headers, path=args.path)
+
+    def show(event):
+        sys.stdout.write(json.dumps(event.data) + '\n')
+        sys.stdout.flush()
+
+    receiver.on(show)
+    try:
+        receiver.serve(args.host, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,27 +1,121 @@
 """
 Core API support methods
 """
-import requests
+import threading
+import time
+import warnings
 
 from . import __version__ as VERSION, API_VERSION
 from .auth import StaticTokenAuth
 from .exceptions import _status_to_exception, GeneralException
+from .instrumentation import RequestEvent
+from .singleflight import SingleFlight
+from .transport import RequestsTransport
+from .utils import API_ROOT, _clock, json_loads, urlforroot
+
+
+def _body_size(message):
+    """Returns the size of the body of the request or response ``message``
+    if it is known without reading a streamed body"""
+    headers = getattr(message, 'headers', None)
+    if headers is None:
+        return None
+    if getattr(message, 'body', b'') is None:
+        # a prepared request without a body
+        return 0
+    length = headers.get('Content-Length')
+    if length is not None:
+        return int(length)
+    content = getattr(message, '_content', None)
+    if isinstance(content, bytes):
+        return len(content)
+    return None
+
+
+def _sent(kwargs):
+    """Returns the size of the streamed request body among ``kwargs``, if
+    it has been sent"""
+    return getattr(kwargs.get('data'), 'bytes_sent', None)
 
 
 class APICore(object):
     """
     Core helpers for authenticating and interacting with the Neverbounce API
+
+    Unless a ``session`` is given, requests are sent through a pooled
+    transport owned by the client: a ``RequestsTransport`` (that is, a
+    ``requests.Session``) unless another ``transport`` is given.  It is
+    created on first use, kept alive between calls and may be shared by many
+    threads; call ``close`` to release its connections.
+
+    Args:
+        pool_size (int): The maximum number of connections kept alive by the
+            client's connection pool; should be at least the number of
+            threads making requests at once.  Default is ``10``.
+        max_retries (int): The number of times to retry failed connections
+            (not failed requests).  Default is ``0``.
+        rate_limiter (RateLimiter): If given, every request waits for a token
+            from this limiter before being sent.  Default is ``None``.
+        retry_policy (RetryPolicy or dict): How to retry failed requests.  May
+            be a ``RetryPolicy`` applied to every endpoint, or a ``dict``
+            mapping endpoint paths (e.g. ``'jobs/create'``) to policies, in
+            which the ``'*'`` key (if any) gives the policy for all other
+            endpoints.  Default is ``None`` (no retries).
+        cache (ResultCache): If given, ``single_check`` results are cached
+            here and reused while fresh.  Default is ``None``.
+        coalesce (bool): If ``True``, concurrent ``single_check`` calls for
+            the same email and options share a single API request.  Default
+            is ``True``.
+        api_root (str): The base URL of the API, e.g. that of a local fake
+            server (see ``neverbounce_sdk.fakeserver``).  Default is
+            ``API_ROOT``.
+        transport: The transport to send requests through instead of a
+            ``RequestsTransport``, e.g. an ``HTTPXTransport`` to multiplex
+            them over HTTP/2 (see ``neverbounce_sdk.transport``).  The
+            ``pool_size`` and ``max_retries`` arguments do not apply to it.
+            Default is ``None``.
+        hooks (list): Callables given a ``RequestEvent`` after every attempt
+            at a request, e.g. a ``MetricsCollector`` (see
+            ``neverbounce_sdk.instrumentation``).  Exceptions they raise are
+            turned into warnings.  Default is ``None``.
+        credit_budget (CreditBudget): If given, calls that spend credits
+            reserve them from this budget first, and are refused with
+            ``CreditBudgetExceeded`` if it would be overrun (see
+            ``neverbounce_sdk.credits``).  Default is ``None``.
     """
 
     def __init__(self,
                  api_key=None,
                  session=None,
                  timeout=30,
-                 api_version=API_VERSION):
+                 api_version=API_VERSION,
+                 pool_size=10,
+                 max_retries=0,
+                 rate_limiter=None,
+                 retry_policy=None,
+                 cache=None,
+                 coalesce=True,
+                 api_root=API_ROOT,
+                 transport=None,
+                 hooks=None,
+                 credit_budget=None):
+        self.api_root = api_root
+        self.transport = transport
+        self.hooks = list(hooks or ())
+        self.credit_budget = credit_budget
         self.api_version = api_version
         self.api_key = api_key
         self.session = session
         self.timeout = timeout
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self.coalesce = coalesce
+        self._inflight = SingleFlight()
+        self._pool = None
+        self._pool_lock = threading.Lock()
 
     @property
     def api_key(self):
@@ -30,7 +124,7 @@ class APICore(object):
         ``self.session.auth``.
         """
         if self.session and not self._api_key:
-            return self.session.api_key
+            return getattr(self.session, 'api_key', None)
         return self._api_key
 
     @api_key.setter
@@ -49,7 +143,7 @@ class APICore(object):
     @property
     def timeout(self):
         if self.session and not self._timeout:
-            return self.session.timeout
+            return getattr(self.session, 'timeout', None)
         return self._timeout
 
     @timeout.setter
@@ -63,10 +157,35 @@ class APICore(object):
     def timeout(self):
         self._timeout = None
 
+    def _build_session(self):
+        """Returns the client's ``transport`` if it has one, else a new
+        ``RequestsTransport`` configured with the client's connection pool
+        settings"""
+        if self.transport is not None:
+            return self.transport
+        return RequestsTransport(pool_size=self.pool_size,
+                                 max_retries=self.max_retries)
+
+    def _get_pool(self):
+        """Returns the client's long-lived pooled session, creating it on
+        first use"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._build_session()
+        return self._pool
+
+    def close(self):
+        """Closes the client's pooled session, if it has been created"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+
     def _make_request(self, method, url, *args, **kwargs):
         """
         Looks for an underlying Session and uses that if available, else
-        defaults to the main requests interface
+        defaults to the client's pooled session
         """
         # no try/except; any errors that occur down here need to propogate
         # prefer an ``auth`` from invoker, and remember self.auth falls back to
@@ -81,17 +200,137 @@ class APICore(object):
 
         if not kwargs.get('auth'):
             kwargs.update({'auth': self.api_key})
+
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
         if self.session:
             return self.session.request(method, url, *args, **kwargs)
-        return requests.request(method, url, *args, **kwargs)
+        return self._get_pool().request(method, url, *args, **kwargs)
+
+    def _url(self, *parts):
+        """Returns the url of an endpoint of the client's API"""
+        return urlforroot(self.api_root, self.api_version, *parts)
+
+    def _endpoint(self, url):
+        """Returns the path of the endpoint at ``url``, e.g.
+        ``'jobs/create'``"""
+        return url.split('/{}/'.format(self.api_version), 1)[-1]
+
+    def _retry_policy_for(self, url):
+        """Returns the ``RetryPolicy`` for the endpoint at ``url``, if any"""
+        policy = self.retry_policy
+        if isinstance(policy, dict):
+            policy = policy.get(self._endpoint(url), policy.get('*'))
+        return policy
+
+    def _emit(self, method, url, attempt, started, resp=None, body=None,
+              error=None, bytes_sent=None, bytes_received=None):
+        """Passes the ``RequestEvent`` of an attempt at a request that
+        started at ``started`` (by ``_clock``) to the client's hooks"""
+        duration = _clock() - started
+        execution_time = getattr(error, 'execution_time', None)
+        if isinstance(body, dict):
+            execution_time = body.get('execution_time')
+        status_code = getattr(resp, 'status_code', None)
+        if status_code is None:
+            status_code = getattr(getattr(error, 'response', None),
+                                  'status_code', None)
+        if bytes_sent is None:
+            bytes_sent = _body_size(getattr(resp, 'request', None))
+        if bytes_received is None:
+            bytes_received = _body_size(resp)
+        event = RequestEvent(self._endpoint(url), method, status_code,
+                             time.time() - duration, duration,
+                             execution_time, bytes_sent, bytes_received,
+                             attempt, error)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as exc:
+                warnings.warn('The request hook {!r} failed: {!r}'.format(
+                    hook, exc), RuntimeWarning)
+
+    def _reserve_credits(self, credits):
+        """Returns a reservation of ``credits`` from the client's credit
+        budget, refreshing the budget first if it is due; returns ``None`` if
+        the client has no budget"""
+        budget = self.credit_budget
+        if budget is None:
+            return None
+        if budget.refresh_due():
+            budget.update(self.account_info())
+        return budget.reserve(credits, refresh=self.account_info)
+
+    def _charged_request(self, reservation, method, url, *args, **kwargs):
+        """Performs a request spending the credits of ``reservation``"""
+        try:
+            body = self._request(method, url, *args, **kwargs)
+        except BaseException:
+            reservation.release()
+            raise
+        reservation.commit()
+        self.credit_budget.update(body)
+        return body
+
+    def _request(self, method, url, *args, **kwargs):
+        """
+        Performs a request with ``_make_request``, checks the response for
+        errors and returns the decoded body.  Failed requests are retried
+        according to the endpoint's retry policy; pass ``idempotent=False``
+        for requests that must not be repeated if they may have been
+        processed.
+
+        Requests that spend credits pass either their number as ``credits``,
+        or a ``reservation`` made with ``_reserve_credits``, to be charged to
+        the client's credit budget.
+        """
+        credits = kwargs.pop('credits', 0)
+        reservation = kwargs.pop('reservation', None)
+        if self.credit_budget is not None:
+            if credits:
+                reservation = self._reserve_credits(credits)
+            if reservation is not None:
+                return self._charged_request(reservation, method, url,
+                                             *args, **kwargs)
+
+        idempotent = kwargs.pop('idempotent', True)
+        policy = self._retry_policy_for(url)
+        attempt = 1
+        while True:
+            resp = None
+            started = _clock()
+            try:
+                resp = self._make_request(method, url, *args, **kwargs)
+                body = self._check_response(resp)
+            except Exception as exc:
+                if self.hooks:
+                    self._emit(method, url, attempt, started, resp,
+                               error=exc, bytes_sent=_sent(kwargs))
+                if policy is None:
+                    raise
+                delay = policy.next_delay(attempt, exc, idempotent, resp)
+                if delay is None:
+                    raise
+            else:
+                if self.hooks:
+                    self._emit(method, url, attempt, started, resp, body,
+                               bytes_sent=_sent(kwargs))
+                return body
+            time.sleep(delay)
+            attempt += 1
 
     def _check_response(self, resp):
-        """Checks a response for errors and throws if they any present"""
+        """
+        Checks a response for errors and throws if they any present;
+        otherwise returns its decoded body, so that callers never decode it
+        a second time
+        """
         # first check that there were no errors on the wire
         resp.raise_for_status()
 
         try:
-            data = resp.json()
+            data = json_loads(resp.content)
         except Exception:
             raise GeneralException('The response from NeverBounce was ' +
                                    'unable to be parsed as json. Try the ' +
@@ -119,7 +358,7 @@ class APICore(object):
 
         # if everything is good, we're done
         if api_status == 'success':
-            return resp
+            return data
         # if not, construct and raise the appropriate exception
         try:
             exc = _status_to_exception[api_status]
@@ -147,11 +386,12 @@ class APICore(object):
 
     def __enter__(self):
         """
-        When entering a context, if no session is set, use
-        requests.session() as default.  Return self as the context manager
+        When entering a context, if no session is set, use the client's
+        transport or a new ``RequestsTransport`` as default.  Return self as
+        the context manager
         """
         if self.session is None:
-            self.session = requests.session()
+            self.session = self._build_session()
         return self
 
     def __exit__(self, *args):
@@ -0,0 +1,205 @@
+"""
+Admission control of API calls that spend credits
+"""
+import threading
+
+from .exceptions import CreditBudgetExceeded
+from .utils import _clock
+
+__all__ = ['CreditBudget']
+
+
+def _reported_credits(response):
+    """Returns the credits remaining in the account according to an API
+    response, or ``None`` if it does not say"""
+    if not isinstance(response, dict):
+        return None
+    info = response.get('credits_info')
+    if isinstance(info, dict) and ('paid_credits_remaining' in info or
+                                   'free_credits_remaining' in info):
+        return (int(info.get('paid_credits_remaining') or 0) +
+                int(info.get('free_credits_remaining') or 0))
+    # account/info
+    if 'credits' in response and 'billing_type' in response:
+        return (int(response['credits'] or 0) +
+                int(response.get('free_credits') or 0))
+    return None
+
+
+class CreditBudget(object):
+    """A thread-safe tracker of the credits spent through one or more
+    clients, which turns away calls that would overrun it.
+
+    Calls that spend credits reserve them first: a ``single_check`` one
+    credit, and a ``jobs_create`` that starts the job one per row of input
+    (rows streamed from an iterable or a file are reserved as they are
+    sent).  Reservations are committed when the call succeeds and released
+    when it fails.  A call is refused with ``CreditBudgetExceeded`` if its
+    credits would take the total spent past ``limit``, or the credits left
+    in the account below ``floor``.
+
+    The credits left in the account are taken from ``account_info``, which
+    the client calls every ``refresh_interval`` seconds, and from every
+    response carrying ``credits_info`` (e.g. ``single_check(...,
+    credits_info=True)``); in between, they are decremented locally, so
+    consulting the budget costs no requests.  Jobs started separately with
+    ``jobs_start`` or created from a remote URL are not reserved ahead,
+    since their size is not known; they are accounted for at the next
+    refresh.
+
+    A single budget may be shared by several clients and threads.
+
+    Args:
+        limit (int): The most credits that may be spent through the budget.
+            Default is ``None`` (no limit other than the account's credits).
+        floor (int): The credits to leave in the account.  Default is ``0``.
+        refresh_interval (float): The seconds between refreshes from
+            ``account_info``.  Default is ``300``.
+        block (bool): If ``True``, a call short of credits waits for other
+            calls' reservations to be released, then refreshes the budget
+            from ``account_info`` once more before giving up.  The asyncio
+            client never waits.  Default is ``False``.
+        timeout (float): The longest a blocked call waits, in seconds.
+            Default is ``None`` (no limit).
+    """
+
+    def __init__(self, limit=None, floor=0, refresh_interval=300,
+                 block=False, timeout=None):
+        self.limit = limit
+        self.floor = floor
+        self.refresh_interval = refresh_interval
+        self.block = block
+        self.timeout = timeout
+        self.spent = 0
+        self.pending = 0
+        self.remaining = None
+        self._next_refresh = None
+        self._cond = threading.Condition(threading.Lock())
+
+    def _available(self):
+        available = None
+        if self.limit is not None:
+            available = self.limit - self.spent - self.pending
+        if self.remaining is not None:
+            in_account = self.remaining - self.pending - self.floor
+            if available is None or in_account < available:
+                available = in_account
+        return available
+
+    @property
+    def available(self):
+        """The credits that may still be reserved, or ``None`` if unknown"""
+        with self._cond:
+            return self._available()
+
+    def reserve(self, credits, block=None, refresh=None):
+        """
+        Reserves ``credits`` for a call.
+
+        Args:
+            credits (int): The credits the call may spend
+            block (bool): Overrides the budget's ``block`` if given
+            refresh: A function returning an ``account_info`` response,
+                called once before a blocked call gives up, in case the
+                account was topped up since the last refresh
+
+        Returns:
+            A reservation, to ``commit`` once the call succeeded or
+            ``release`` if it failed; more credits may be reserved on it
+            with ``add``
+
+        Raises:
+            CreditBudgetExceeded: if the credits are not available
+        """
+        reservation = _Reservation(self, self.block if block is None
+                                   else block, refresh)
+        reservation.add(credits)
+        return reservation
+
+    def _take(self, credits, block, refresh=None):
+        deadline = None
+        while True:
+            with self._cond:
+                while True:
+                    available = self._available()
+                    if available is None or credits <= available:
+                        self.pending += credits
+                        return
+                    never = (self.limit is not None and
+                             credits > self.limit - self.spent)
+                    # waiting only helps while other calls' reservations
+                    # may still be released
+                    if not block or never or not self.pending:
+                        break
+                    if deadline is None and self.timeout is not None:
+                        deadline = _clock() + self.timeout
+                    wait = None if deadline is None else deadline - _clock()
+                    if wait is not None and wait <= 0:
+                        break
+                    self._cond.wait(wait)
+            if not block or never or refresh is None:
+                raise CreditBudgetExceeded(
+                    'The call needs {} credits, but only {} are left in the '
+                    'budget.'.format(credits, max(0, available)))
+            response, refresh = refresh(), None
+            self.update(response)
+
+    def _settle(self, reserved, spent):
+        with self._cond:
+            self.pending -= reserved
+            self.spent += spent
+            if self.remaining is not None:
+                self.remaining -= spent
+            self._cond.notify_all()
+
+    def update(self, response):
+        """
+        Takes the credits left in the account from ``response``, an
+        ``account_info`` response or any carrying ``credits_info``.
+
+        Returns:
+            ``True`` if ``response`` gave the credits left
+        """
+        remaining = _reported_credits(response)
+        if remaining is None:
+            return False
+        with self._cond:
+            self.remaining = remaining
+            self._next_refresh = _clock() + self.refresh_interval
+            self._cond.notify_all()
+        return True
+
+    def refresh_due(self):
+        """Returns ``True`` if the credits left in the account should be
+        fetched again; only one caller is told so per ``refresh_interval``"""
+        now = _clock()
+        with self._cond:
+            if self._next_refresh is not None and now < self._next_refresh:
+                return False
+            self._next_refresh = now + self.refresh_interval
+            return True
+
+
+class _Reservation(object):
+    """Credits reserved from a ``CreditBudget`` for one call"""
+
+    def __init__(self, budget, block, refresh=None):
+        self.budget = budget
+        self.block = block
+        self.refresh = refresh
+        self.credits = 0
+
+    def add(self, credits):
+        if credits:
+            self.budget._take(credits, self.block, self.refresh)
+            self.credits += credits
+
+    def commit(self):
+        """Counts the reserved credits as spent"""
+        self.budget._settle(self.credits, self.credits)
+        self.credits = 0
+
+    def release(self):
+        """Returns the reserved credits to the budget"""
+        self.budget._settle(self.credits, 0)
+        self.credits = 0
@@ -5,7 +5,9 @@ NeverBounce API exceptions and warnings
 __all__ = ['GeneralException',
            'AuthFailure',
            'ThrottleTriggered',
-           'BadReferrer']
+           'BadReferrer',
+           'JobTimeout',
+           'CreditBudgetExceeded']
 
 
 class GeneralException(Exception):
@@ -39,6 +41,20 @@ class BadReferrer(GeneralException):
     """
 
 
+class JobTimeout(GeneralException):
+    """
+    A bulk job did not finish in the time it was waited for; the job itself
+    keeps running
+    """
+
+
+class CreditBudgetExceeded(GeneralException):
+    """
+    A call would have spent more credits than the client's ``CreditBudget``
+    allows, so it was not made (or, for a streamed upload, was abandoned)
+    """
+
+
 _status_to_exception = {
     'general_failure': GeneralException,
     'auth_failure': AuthFailure,
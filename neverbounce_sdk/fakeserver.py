@@ -0,0 +1,832 @@
+"""
+A local fake of the NeverBounce API, for load tests and benchmarks
+
+``FakeNeverBounce`` implements the v4.2 endpoints the SDK calls, with
+configurable latency, throttling, failures and bulk job sizes and speeds.
+Start it from the command line::
+
+    python -m neverbounce_sdk.fakeserver --port 8080 \\
+        --latency uniform:0.02,0.1 --throttle 50
+
+or from Python, and point a client at it with ``api_root``::
+
+    server = FakeNeverBounce(latency='exponential:0.05').serve(
+        port=0, background=True)
+    client = neverbounce_sdk.client(
+        api_key='key', api_root='http://127.0.0.1:{}'.format(server.port))
+
+Verification results are made up but deterministic: an address whose local
+part starts with a result name (``invalid.joe@example.com``) gets that
+result, any other one a result drawn from ``result_weights`` by a hash of
+the address.
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+# Python 2 COMPAT
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:  # pragma: no cover
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qsl, urlsplit
+
+from .bulk import _appends_options, _binary_values
+from .results import RESULT_CODES
+from .utils import API_VERSION, _clock
+
+__all__ = ['FakeNeverBounce', 'Latency']
+
+DEFAULT_RESULT_WEIGHTS = OrderedDict([('valid', 0.70),
+                                      ('invalid', 0.15),
+                                      ('catchall', 0.08),
+                                      ('unknown', 0.05),
+                                      ('disposable', 0.02)])
+
+_segments = {'valids': 'valid',
+             'invalids': 'invalid',
+             'catchalls': 'catchall',
+             'unknowns': 'unknown',
+             'disposables': 'disposable'}
+
+_line_feeds = {'LINEFEED_0A': '\n',
+               'LINEFEED_0D0A': '\r\n',
+               'LINEFEED_0D': '\r'}
+
+_flags = {'valid': ['has_dns', 'has_dns_mx', 'smtp_connectable'],
+          'invalid': ['has_dns', 'has_dns_mx'],
+          'catchall': ['has_dns', 'has_dns_mx', 'accepts_all'],
+          'unknown': ['has_dns'],
+          'disposable': ['has_dns', 'has_dns_mx', 'disposable_email']}
+
+
+class Latency(object):
+    """
+    A distribution of response delays, in seconds, given as a spec:
+    ``'0.05'`` or ``'constant:0.05'``, ``'uniform:LOW,HIGH'``,
+    ``'exponential:MEAN'``, ``'normal:MEAN,STDDEV'`` or
+    ``'lognormal:MU,SIGMA'`` (the parameters of the underlying normal
+    distribution).  Negative samples are taken as zero.
+    """
+    _distributions = {
+        'constant': (1, lambda rng, value: value),
+        'uniform': (2, lambda rng, low, high: rng.uniform(low, high)),
+        'exponential': (1, lambda rng, mean: rng.expovariate(1.0 / mean)
+                        if mean > 0 else 0),
+        'normal': (2, lambda rng, mean, sd: rng.gauss(mean, sd)),
+        'lognormal': (2, lambda rng, mu, sigma: rng.lognormvariate(mu, sigma))
+    }
+
+    def __init__(self, spec=0, seed=None):
+        self.spec = spec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        kind, _, args = str(spec).partition(':')
+        if not args:
+            kind, args = 'constant', kind
+        try:
+            arity, self._sample = self._distributions[kind]
+            self._args = [float(arg) for arg in args.split(',')]
+            if len(self._args) != arity:
+                raise ValueError
+        except (KeyError, ValueError):
+            raise ValueError('{!r} is not a latency spec; see '
+                             'help(Latency)'.format(spec))
+
+    def __call__(self):
+        """Returns a delay drawn from the distribution"""
+        with self._lock:
+            return max(0.0, self._sample(self._rng, *self._args))
+
+
+class _Job(object):
+    """A bulk job held by the fake server"""
+
+    def __init__(self, job_id, rows, size, filename, fails):
+        self.id = job_id
+        self.rows = rows
+        self.size = size
+        self.filename = filename
+        self.fails = fails
+        self.created_at = time.time()
+        self.parsed = False
+        self.started_at = None
+        self.totals = None
+
+    def email(self, index):
+        if self.rows is None:
+            return 'user{}@example.com'.format(index)
+        return self.rows[index]['email']
+
+    def data(self, index):
+        if self.rows is None:
+            return {'email': self.email(index)}
+        return self.rows[index]
+
+
+def _input_row(row):
+    """Returns a ``jobs_create`` input row as a ``dict``"""
+    if isinstance(row, dict):
+        return dict((key, '' if value is None else str(value))
+                    for key, value in row.items())
+    row = [str(value) for value in row]
+    data = dict((str(i), value) for i, value in enumerate(row[1:], 1))
+    data['email'] = row[0] if row else ''
+    return data
+
+
+class _APIError(Exception):
+    def __init__(self, status, message):
+        self.status = status
+        self.message = message
+        super(_APIError, self).__init__(status, message)
+
+
+class FakeNeverBounce(object):
+    """
+    A fake NeverBounce API, served over HTTP by ``serve``.
+
+    Args:
+        api_key (str): If given, requests with another key fail with
+            ``auth_failure``.  Default is ``None`` (accept any key).
+        latency (str, float or Latency): The delay before every response;
+            see ``Latency``.  Default is ``0``.
+        latencies (dict): Latencies for particular endpoints, keyed on paths
+            such as ``'single/check'``.  Default is ``None``.
+        throttle (float): The number of requests allowed in any one second;
+            more fail with ``throttle_triggered``.  Default is ``None`` (no
+            limit).
+        error_rate (float): The probability that a request fails with an
+            HTTP 503 error.  Default is ``0``.
+        job_rate (float): The number of rows a started bulk job verifies
+            per second.  Default is ``None`` (jobs complete when started).
+        job_size (int): The number of rows of jobs created from a remote
+            URL, which are not downloaded.  Default is ``1000``.
+        job_failure_rate (float): The probability that a started job fails.
+            Default is ``0``.
+        result_weights (dict): The relative frequency of each verification
+            result.  Default is ``DEFAULT_RESULT_WEIGHTS``.
+        credits (int): The credits of the account; every verification
+            spends one.  Default is ``1000000``.
+        seed: Seeds the random latencies and failures.  Default is
+            ``None``.
+    """
+
+    def __init__(self, api_key=None, latency=0, latencies=None,
+                 throttle=None, error_rate=0, job_rate=None, job_size=1000,
+                 job_failure_rate=0, result_weights=None, credits=1000000,
+                 api_version=API_VERSION, seed=None):
+        self.api_key = api_key
+        self.latency = self._latency(latency, seed)
+        self.latencies = dict((endpoint, self._latency(spec, seed))
+                              for endpoint, spec in (latencies or {}).items())
+        self.throttle = throttle
+        self.error_rate = error_rate
+        self.job_rate = job_rate
+        self.job_size = job_size
+        self.job_failure_rate = job_failure_rate
+        self.credits = credits
+        self.api_version = api_version
+
+        weights = result_weights or DEFAULT_RESULT_WEIGHTS
+        total = float(sum(weights.values()))
+        self._result_bounds = []
+        bound = 0.0
+        for result, weight in weights.items():
+            bound += weight / total
+            self._result_bounds.append((bound, result))
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._jobs = OrderedDict()
+        self._next_job_id = 1
+        self._downloads = {}
+        self._in_flight = 0
+        self.stats = Counter()
+
+        self._endpoints = {
+            'account/info': self.account_info,
+            'single/check': self.single_check,
+            'poe/confirm': self.poe_confirm,
+            'jobs/create': self.jobs_create,
+            'jobs/parse': self.jobs_parse,
+            'jobs/start': self.jobs_start,
+            'jobs/status': self.jobs_status,
+            'jobs/search': self.jobs_search,
+            'jobs/results': self.jobs_results,
+            'jobs/download': self.jobs_download,
+            'jobs/delete': self.jobs_delete,
+        }
+
+    @staticmethod
+    def _latency(spec, seed):
+        return spec if isinstance(spec, Latency) else Latency(spec, seed)
+
+    # results
+
+    def result_for(self, email):
+        """Returns the made-up verification result of ``email``"""
+        local, _, domain = email.strip().lower().partition('@')
+        if not local or not domain:
+            return 'invalid'
+        for result in RESULT_CODES:
+            if local.startswith(result):
+                return result
+        digest = hashlib.md5(email.strip().lower().encode('utf-8')).digest()
+        point = int(hashlib.md5(digest).hexdigest()[:8], 16) / float(1 << 32)
+        for bound, result in self._result_bounds:
+            if point < bound:
+                return result
+        return self._result_bounds[-1][1]
+
+    def _verification(self, email):
+        result = self.result_for(email)
+        flags = list(_flags[result])
+        if '@' not in email:
+            flags = ['bad_syntax']
+        return result, flags
+
+    def _spend(self, count):
+        with self._lock:
+            if self.credits < count:
+                raise _APIError('general_failure', 'Insufficient credits')
+            self.credits -= count
+
+    # request handling
+
+    def handle(self, method, path, query, body, headers=None):
+        """
+        Handles an API request; returns the HTTP status code, a list of
+        response headers and the response body.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The request path, e.g. ``'/v4.2/single/check'``.
+            query (dict): The query string parameters.
+            body (bytes): The request body.
+            headers (dict): The request headers, keyed on lowercased names.
+        """
+        prefix = '/{}/'.format(self.api_version)
+        endpoint = None
+        if path.startswith(prefix):
+            endpoint = path[len(prefix):].strip('/')
+        handler = self._endpoints.get(endpoint)
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats[endpoint if handler else 'unknown'] += 1
+            self._in_flight += 1
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'],
+                                               self._in_flight)
+        try:
+            time.sleep(self.latencies.get(endpoint, self.latency)())
+            if handler is None:
+                return self._json(404, {'status': 'general_failure',
+                                        'message': 'Unknown endpoint'})
+            if self._throttled():
+                self.stats['throttled'] += 1
+                return self._error('throttle_triggered',
+                                   'Too many requests in a short time')
+            if self.error_rate and self._chance(self.error_rate):
+                self.stats['errors'] += 1
+                return 503, [('Content-Type', 'text/plain')], b'unavailable'
+
+            params = dict(query)
+            if body:
+                try:
+                    params.update(json.loads(body.decode('utf-8')))
+                except ValueError:
+                    return self._error('general_failure',
+                                       'The request body is not valid JSON')
+            key = params.get('key')
+            if not key or (self.api_key is not None and key != self.api_key):
+                return self._error('auth_failure', 'Invalid API key')
+
+            started = _clock()
+            response = handler(params, headers or {})
+            if isinstance(response, tuple):
+                return response
+            response.setdefault('status', 'success')
+            response['execution_time'] = int((_clock() - started) * 1000)
+            return self._json(200, response)
+        except _APIError as exc:
+            return self._error(exc.status, exc.message)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _throttled(self):
+        if self.throttle is None:
+            return False
+        now = _clock()
+        with self._lock:
+            while self._recent and self._recent[0] <= now - 1:
+                self._recent.popleft()
+            if len(self._recent) >= self.throttle:
+                return True
+            self._recent.append(now)
+            return False
+
+    def _chance(self, probability):
+        with self._lock:
+            return self._rng.random() < probability
+
+    @staticmethod
+    def _json(status, data):
+        body = json.dumps(data).encode('utf-8')
+        return status, [('Content-Type', 'application/json')], body
+
+    def _error(self, status, message):
+        return self._json(200, {'status': status, 'message': message,
+                                'execution_time': 0})
+
+    @staticmethod
+    def _flag(params, name):
+        return str(params.get(name, 0)).lower() in ('1', 'true')
+
+    @staticmethod
+    def _int(params, name, default):
+        try:
+            return int(params.get(name, default))
+        except (TypeError, ValueError):
+            raise _APIError('general_failure',
+                            '{} must be an integer'.format(name))
+
+    def _job(self, params):
+        job_id = self._int(params, 'job_id', 0)
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise _APIError('general_failure',
+                            'Job {} does not exist'.format(job_id))
+        return job
+
+    def _processed(self, job, now):
+        if job.started_at is None:
+            return 0
+        if not self.job_rate:
+            return job.size
+        return min(job.size, int((now - job.started_at) * self.job_rate))
+
+    def _job_status(self, job):
+        processed = self._processed(job, time.time())
+        if not job.parsed:
+            status = 'uploading'
+        elif job.started_at is None:
+            status = 'waiting'
+        elif processed < job.size:
+            status = 'running'
+        else:
+            status = 'failed' if job.fails else 'complete'
+        return status, processed
+
+    # endpoints
+
+    def account_info(self, params, headers):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        statuses = Counter(self._job_status(job)[0] for job in jobs)
+        return {'billing_type': 'default',
+                'credits': self.credits,
+                'free_credits': 0,
+                'job_counts': {'completed': statuses['complete'],
+                               'under_review': 0,
+                               'queued': statuses['waiting'],
+                               'processing': statuses['running']}}
+
+    def single_check(self, params, headers):
+        email = params.get('email')
+        if not email:
+            raise _APIError('general_failure', 'Missing required parameter '
+                                               "'email'")
+        self._spend(1)
+        result, flags = self._verification(email)
+        response = {'result': result,
+                    'flags': flags,
+                    'suggested_correction': ''}
+        if self._flag(params, 'address_info'):
+            local, _, host = email.partition('@')
+            response['address_info'] = {'original_email': email,
+                                        'normalized_email': email.lower(),
+                                        'addr': local,
+                                        'alias': '',
+                                        'host': host,
+                                        'fqdn': host,
+                                        'domain': host.split('.')[0],
+                                        'subdomain': '',
+                                        'tld': host.rpartition('.')[2]}
+        if self._flag(params, 'credits_info'):
+            response['credits_info'] = {
+                'paid_credits_used': 1,
+                'free_credits_used': 0,
+                'paid_credits_remaining': self.credits,
+                'free_credits_remaining': 0}
+        return response
+
+    def poe_confirm(self, params, headers):
+        for name in ('email', 'transaction_id', 'confirmation_token',
+                     'result'):
+            if not params.get(name):
+                raise _APIError('general_failure', 'Missing required '
+                                'parameter {!r}'.format(name))
+        return {'token_confirmed': True}
+
+    def jobs_create(self, params, headers):
+        location = params.get('input_location')
+        if location == 'remote_url':
+            rows, size = None, self.job_size
+        elif location == 'supplied':
+            try:
+                rows = [_input_row(row) for row in params.get('input') or ()]
+            except TypeError:
+                raise _APIError('general_failure', 'Malformed input')
+            size = len(rows)
+            if not size:
+                raise _APIError('general_failure', 'The input is empty')
+        else:
+            raise _APIError('general_failure',
+                            'input_location must be supplied or remote_url')
+
+        fails = bool(self.job_failure_rate and
+                     self._chance(self.job_failure_rate))
+        with self._lock:
+            job = _Job(self._next_job_id, rows, size,
+                       params.get('filename'), fails)
+            self._jobs[job.id] = job
+            self._next_job_id += 1
+        if self._flag(params, 'auto_parse'):
+            job.parsed = True
+            if self._flag(params, 'auto_start'):
+                self._start(job)
+        return {'job_id': job.id}
+
+    def _start(self, job):
+        self._spend(job.size)
+        job.started_at = time.time()
+
+    def jobs_parse(self, params, headers):
+        job = self._job(params)
+        if job.parsed:
+            raise _APIError('general_failure', 'The job was already parsed')
+        job.parsed = True
+        if self._flag(params, 'auto_start'):
+            self._start(job)
+        return {'queue_id': 'NB-PARSE-{}'.format(job.id)}
+
+    def jobs_start(self, params, headers):
+        job = self._job(params)
+        if not job.parsed or job.started_at is not None:
+            raise _APIError('general_failure',
+                            'The job is not waiting to be started')
+        self._start(job)
+        return {'queue_id': 'NB-START-{}'.format(job.id)}
+
+    def _job_summary(self, job):
+        status, processed = self._job_status(job)
+        if status == 'complete' and job.totals is None:
+            job.totals = Counter(self.result_for(job.email(index))
+                                 for index in range(job.size))
+        totals = job.totals or Counter()
+        started = job.started_at
+        finished = None
+        if status in ('complete', 'failed') and started is not None:
+            finished = started + (job.size / float(self.job_rate)
+                                  if self.job_rate else 0)
+        return {'id': job.id,
+                'filename': job.filename,
+                'created_at': _timestamp(job.created_at),
+                'started_at': _timestamp(started),
+                'finished_at': _timestamp(finished),
+                'total': {'records': job.size,
+                          'billable': job.size,
+                          'processed': processed,
+                          'valid': totals['valid'],
+                          'invalid': totals['invalid'],
+                          'catchall': totals['catchall'],
+                          'disposable': totals['disposable'],
+                          'unknown': totals['unknown'],
+                          'duplicates': 0,
+                          'bad_syntax': 0},
+                'bounce_estimate': 0.0,
+                'percent_complete': (100.0 * processed / job.size
+                                     if job.size else 100.0),
+                'job_status': status,
+                'failure_reason': 'Synthetic failure' if job.fails else None}
+
+    def jobs_status(self, params, headers):
+        return self._job_summary(self._job(params))
+
+    def _page(self, params, total):
+        page = max(self._int(params, 'page', 1), 1)
+        per_page = min(max(self._int(params, 'items_per_page', 10), 1), 1000)
+        total_pages = (total + per_page - 1) // per_page
+        start = (page - 1) * per_page
+        return page, per_page, total_pages, range(start,
+                                                  min(start + per_page, total))
+
+    def jobs_search(self, params, headers):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        summaries = [self._job_summary(job) for job in jobs]
+        if params.get('job_id'):
+            summaries = [s for s in summaries
+                         if str(s['id']) == str(params['job_id'])]
+        if params.get('filename'):
+            summaries = [s for s in summaries
+                         if s['filename'] == params['filename']]
+        if params.get('job_status'):
+            summaries = [s for s in summaries
+                         if s['job_status'] == params['job_status']]
+
+        page, per_page, total_pages, indexes = self._page(params,
+                                                          len(summaries))
+        query = dict((key, value) for key, value in params.items()
+                     if key != 'key')
+        query.update(page=page, items_per_page=per_page)
+        return {'total_results': len(summaries),
+                'total_pages': total_pages,
+                'query': query,
+                'results': [summaries[i] for i in indexes]}
+
+    def _completed_job(self, params):
+        job = self._job(params)
+        status, _ = self._job_status(job)
+        if status != 'complete':
+            raise _APIError('general_failure',
+                            'Job {} is {}, not complete'.format(job.id,
+                                                                status))
+        return job
+
+    def jobs_results(self, params, headers):
+        job = self._completed_job(params)
+        page, per_page, total_pages, indexes = self._page(params, job.size)
+        results = []
+        for index in indexes:
+            result, flags = self._verification(job.email(index))
+            results.append({'data': job.data(index),
+                            'verification': {'result': result,
+                                             'flags': flags,
+                                             'suggested_correction': '',
+                                             'address_info': {}}})
+        return {'total_results': job.size,
+                'total_pages': total_pages,
+                'query': {'job_id': job.id, 'page': page,
+                          'items_per_page': per_page},
+                'results': results}
+
+    def _download_body(self, job, params):
+        """Returns the CSV file of a job's results, made once for each set
+        of download options"""
+        key = (job.id, json.dumps(dict((k, v) for k, v in params.items()
+                                       if k != 'key'), sort_keys=True))
+        with self._lock:
+            body = self._downloads.get(key)
+        if body is not None:
+            return body
+
+        segments = set(result for name, result in _segments.items()
+                       if self._flag(params, name))
+        appends = [name for name in params if name in _appends_options and
+                   self._flag(params, name)]
+        yes, no = _binary_values.get(params.get('binary_operators_type'),
+                                     ('1', '0'))
+        line_feed = _line_feeds.get(params.get('line_feed_type'), '\n')
+
+        columns = list(job.data(0)) if job.size else ['email']
+        out = io.StringIO() if str is not bytes else io.BytesIO()
+        writer = csv.writer(out, lineterminator=line_feed)
+        writer.writerow(columns + appends)
+        for index in range(job.size):
+            email = job.email(index)
+            result, flags = self._verification(email)
+            if segments and result not in segments:
+                continue
+            data = job.data(index)
+            row = [data.get(column, '') for column in columns]
+            for name in appends:
+                if name == 'email_status':
+                    row.append(result)
+                elif name == 'email_status_int':
+                    row.append(RESULT_CODES.index(result))
+                elif name == 'bad_syntax':
+                    row.append(yes if 'bad_syntax' in flags else no)
+                elif name in ('has_dns_info', 'has_mail_server'):
+                    row.append(yes if 'has_dns' in flags else no)
+                elif name == 'mail_server_reachable':
+                    row.append(yes if 'smtp_connectable' in flags else no)
+                elif name == 'free_email_host':
+                    row.append(no)
+                elif name == 'role_account':
+                    local = email.partition('@')[0].lower()
+                    row.append(yes if local in ('admin', 'info', 'support',
+                                                'sales') else no)
+                else:
+                    row.append(_address_part(email, name))
+            writer.writerow(row)
+        body = out.getvalue()
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+
+        with self._lock:
+            self._downloads[key] = body
+        return body
+
+    def jobs_download(self, params, headers):
+        job = self._completed_job(params)
+        body = self._download_body(job, params)
+        total = len(body)
+        response_headers = [
+            ('Content-Type', 'application/octet-stream'),
+            ('Content-Disposition',
+             'attachment; filename="{}.csv"'.format(job.id)),
+            ('Accept-Ranges', 'bytes')]
+
+        match = re.match(r'bytes=(\d+)-$', headers.get('range', ''))
+        if match is None:
+            return 200, response_headers, body
+        start = int(match.group(1))
+        if start >= total:
+            return (416, [('Content-Range', 'bytes */{}'.format(total))],
+                    b'')
+        response_headers.append(
+            ('Content-Range', 'bytes {}-{}/{}'.format(start, total - 1,
+                                                      total)))
+        return 206, response_headers, body[start:]
+
+    def jobs_delete(self, params, headers):
+        job = self._job(params)
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        return {}
+
+    # serving
+
+    def serve(self, host='127.0.0.1', port=8080, background=False):
+        """
+        Serves the fake API over HTTP/1.1 with keep-alive, one thread per
+        connection.
+
+        Args:
+            background (bool): If ``True``, run the server on a daemon thread
+                and return it at once; call its ``shutdown`` method to stop
+                it.  Otherwise serve until interrupted.  Default is
+                ``False``.
+
+        Returns:
+            The HTTP server; its ``port`` is the port it listens on, useful
+            when ``port`` is ``0``, and ``url`` the ``api_root`` to give
+            clients.
+        """
+        server = _FakeHTTPServer((host, port), _FakeRequestHandler)
+        server.fake = self
+        server.port = server.server_address[1]
+        server.url = 'http://{}:{}'.format(host, server.port)
+        if not background:
+            try:
+                server.serve_forever()
+            finally:
+                server.server_close()
+            return server
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return server
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(value))
+
+
+def _address_part(email, name):
+    """Returns the value of an appended address column"""
+    local, _, host = email.partition('@')
+    labels = host.split('.')
+    return {'addr': local,
+            'alias': local.partition('+')[2],
+            'host': host,
+            'fqdn': host,
+            'subdomain': '.'.join(labels[:-2]),
+            'domain': labels[-2] if len(labels) > 1 else host,
+            'tld': labels[-1] if len(labels) > 1 else '',
+            'network': host}.get(name, '')
+
+
+class _FakeHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; without this, delayed ACKs
+    # stall every keep-alive round trip by ~40ms
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        with self.server.fake._lock:
+            self.server.fake.stats['connections'] += 1
+
+    def _body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    # the (empty) trailer
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _respond(self):
+        url = urlsplit(self.path)
+        headers = dict((name.lower(), value)
+                       for name, value in self.headers.items())
+        status, response_headers, body = self.server.fake.handle(
+            self.command, url.path, dict(parse_qsl(url.query)),
+            self._body(), headers)
+        self.send_response(status)
+        for name, value in response_headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def main(argv=None):
+    """Runs a fake API server until interrupted"""
+    parser = argparse.ArgumentParser(
+        prog='python -m neverbounce_sdk.fakeserver',
+        description='Serve a fake NeverBounce API for load tests')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--api-key', default=None,
+                        help='reject requests with another key')
+    parser.add_argument('--latency', default='0',
+                        help="delay of every response, e.g. '0.05' or "
+                             "'uniform:0.01,0.1'")
+    parser.add_argument('--endpoint-latency', action='append', default=[],
+                        metavar='ENDPOINT=SPEC',
+                        help="latency of one endpoint, e.g. "
+                             "'single/check=exponential:0.2'")
+    parser.add_argument('--throttle', type=float, default=None,
+                        help='requests allowed per second')
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help='probability of an HTTP 503 response')
+    parser.add_argument('--job-rate', type=float, default=None,
+                        help='rows verified per second by a bulk job')
+    parser.add_argument('--job-size', type=int, default=1000,
+                        help='rows of jobs created from a remote URL')
+    parser.add_argument('--job-failure-rate', type=float, default=0,
+                        help='probability that a bulk job fails')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        latencies = dict(item.split('=', 1)
+                         for item in args.endpoint_latency)
+        fake = FakeNeverBounce(api_key=args.api_key,
+                               latency=args.latency,
+                               latencies=latencies,
+                               throttle=args.throttle,
+                               error_rate=args.error_rate,
+                               job_rate=args.job_rate,
+                               job_size=args.job_size,
+                               job_failure_rate=args.job_failure_rate,
+                               seed=args.seed)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    server = fake.serve(args.host, args.port, background=True)
+    print('Serving a fake NeverBounce API at {}'.format(server.url))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
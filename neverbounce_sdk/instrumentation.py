@@ -0,0 +1,333 @@
+"""
+Instrumentation of the requests the client sends to the API
+
+Every attempt at an API call, retries and downloads included, is described by
+a ``RequestEvent`` passed to each of the client's ``hooks``::
+
+    metrics = neverbounce_sdk.MetricsCollector()
+    client = neverbounce_sdk.client(api_key=api_key, hooks=[metrics])
+    ...
+    check = metrics.snapshot()['single/check']
+    print(check.requests, check.latency.quantile(0.99))
+
+``PrometheusHook`` and ``OpenTelemetryHook`` record the same events with
+``prometheus_client`` and ``opentelemetry-api``, which must be installed
+separately.
+"""
+import copy
+import threading
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+from . import __version__ as VERSION
+from .exceptions import ThrottleTriggered
+
+__all__ = ['EXECUTION_TIME_BUCKETS', 'LATENCY_BUCKETS', 'EndpointMetrics',
+           'Histogram', 'MetricsCollector', 'OpenTelemetryHook',
+           'PrometheusHook', 'RequestEvent']
+
+#: upper bounds, in seconds, of the buckets of request latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+                   30, 60)
+#: upper bounds, in milliseconds, of the buckets of the ``execution_time``
+#: the API reports
+EXECUTION_TIME_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000,
+                          10000)
+
+
+class RequestEvent(namedtuple('RequestEvent', ['endpoint', 'method',
+                                               'status_code', 'started',
+                                               'duration', 'execution_time',
+                                               'bytes_sent', 'bytes_received',
+                                               'attempt', 'error'])):
+    """
+    One attempt at an API request.
+
+    Attributes:
+        endpoint (str): The endpoint's path, e.g. ``'jobs/create'``
+        method (str): The HTTP method
+        status_code (int): The HTTP status of the response, or ``None`` if
+            there was none (e.g. the connection failed)
+        started (float): When the attempt started, in seconds since the epoch
+        duration (float): The seconds the attempt took, including reading and
+            checking the response
+        execution_time (int): The milliseconds the API reports it took, or
+            ``None`` if it did not say
+        bytes_sent (int): The size of the request body, or ``None`` if it
+            is not known
+        bytes_received (int): The size of the response body, or ``None`` if
+            it is not known
+        attempt (int): ``1`` for the first attempt, ``2`` for the first
+            retry, and so on
+        error (Exception): What the attempt failed with, or ``None`` if it
+            succeeded
+    """
+    __slots__ = ()
+
+    @property
+    def retry(self):
+        return self.attempt > 1
+
+    @property
+    def throttled(self):
+        return (isinstance(self.error, ThrottleTriggered) or
+                self.status_code == 429)
+
+    @property
+    def error_class(self):
+        """The name of the class of ``error``, or ``None``"""
+        return None if self.error is None else type(self.error).__name__
+
+
+class Histogram(object):
+    """
+    Counts of observed values in buckets with the given upper bounds, plus
+    one for values above the last bound
+
+    Args:
+        buckets: The upper bounds of the buckets, inclusive
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        return self.sum / float(self.count) if self.count else None
+
+    def quantile(self, q):
+        """
+        Estimates the ``q``-quantile (e.g. ``0.99``) of the observed values
+        by interpolating within its bucket; values above the last bucket are
+        reported as its bound.  Returns ``None`` if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0
+        for upper, count in zip(self.buckets, self.counts):
+            if count and seen + count >= rank:
+                return lower + (upper - lower) * (rank - seen) / float(count)
+            seen += count
+            lower = upper
+        return self.buckets[-1]
+
+
+class EndpointMetrics(object):
+    """The requests made to one endpoint, as recorded by
+    ``MetricsCollector``"""
+
+    def __init__(self, latency_buckets, execution_time_buckets):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.errors = Counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram(latency_buckets)
+        self.execution_time = Histogram(execution_time_buckets)
+
+    def record(self, event):
+        self.requests += 1
+        self.retries += event.retry
+        self.throttled += event.throttled
+        if event.error is not None:
+            self.errors[event.error_class] += 1
+        self.bytes_sent += event.bytes_sent or 0
+        self.bytes_received += event.bytes_received or 0
+        self.latency.observe(event.duration)
+        if event.execution_time is not None:
+            self.execution_time.observe(event.execution_time)
+
+
+class MetricsCollector(object):
+    """
+    A hook keeping per-endpoint counts of requests, retries, throttles,
+    errors (by class) and bytes, and histograms of latencies and of the
+    ``execution_time`` the API reports.  It may be shared by many clients
+    and threads.
+
+    Args:
+        latency_buckets: The bucket bounds of latencies, in seconds.
+            Default is ``LATENCY_BUCKETS``.
+        execution_time_buckets: The bucket bounds of execution times, in
+            milliseconds.  Default is ``EXECUTION_TIME_BUCKETS``.
+    """
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS,
+                 execution_time_buckets=EXECUTION_TIME_BUCKETS):
+        self.latency_buckets = latency_buckets
+        self.execution_time_buckets = execution_time_buckets
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            metrics = self._endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self._endpoints[event.endpoint] = EndpointMetrics(
+                    self.latency_buckets, self.execution_time_buckets)
+            metrics.record(event)
+
+    def snapshot(self):
+        """Returns a ``dict`` mapping endpoints to copies of their
+        ``EndpointMetrics``"""
+        with self._lock:
+            return copy.deepcopy(self._endpoints)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+class PrometheusHook(object):
+    """
+    A hook recording requests with ``prometheus_client``, as the metrics
+    (prefixed with ``namespace``):
+
+    - ``request_duration_seconds``: histogram by endpoint and method
+    - ``execution_time_milliseconds``: histogram by endpoint
+    - ``requests_total``: counter by endpoint, method, status and error class
+    - ``retries_total`` and ``throttled_total``: counters by endpoint
+    - ``transferred_bytes_total``: counter by endpoint and direction (``sent``
+      or ``received``)
+
+    Args:
+        registry: The registry of the metrics.  Default is
+            ``prometheus_client``'s global one.
+        namespace (str): Default is ``'neverbounce'``.
+    """
+
+    def __init__(self, registry=None, namespace='neverbounce',
+                 latency_buckets=LATENCY_BUCKETS,
+                 execution_time_buckets=EXECUTION_TIME_BUCKETS):
+        try:
+            import prometheus_client
+        except ImportError:
+            raise ImportError('PrometheusHook requires prometheus_client; '
+                              'install it with `pip install '
+                              'prometheus_client`')
+        kwargs = dict(namespace=namespace)
+        if registry is not None:
+            kwargs['registry'] = registry
+        self.latency = prometheus_client.Histogram(
+            'request_duration_seconds', 'Time taken by API requests',
+            ['endpoint', 'method'], buckets=latency_buckets, **kwargs)
+        self.execution_time = prometheus_client.Histogram(
+            'execution_time_milliseconds',
+            'Execution time of API requests, as reported by the API',
+            ['endpoint'], buckets=execution_time_buckets, **kwargs)
+        self.requests = prometheus_client.Counter(
+            'requests', 'API requests',
+            ['endpoint', 'method', 'status', 'error'], **kwargs)
+        self.retries = prometheus_client.Counter(
+            'retries', 'Retried API requests', ['endpoint'], **kwargs)
+        self.throttled = prometheus_client.Counter(
+            'throttled', 'Throttled API requests', ['endpoint'], **kwargs)
+        self.transferred = prometheus_client.Counter(
+            'transferred_bytes', 'Bytes of API request and response bodies',
+            ['endpoint', 'direction'], **kwargs)
+
+    def __call__(self, event):
+        endpoint = event.endpoint
+        self.latency.labels(endpoint, event.method).observe(event.duration)
+        if event.execution_time is not None:
+            self.execution_time.labels(endpoint).observe(event.execution_time)
+        self.requests.labels(endpoint, event.method,
+                             str(event.status_code or ''),
+                             event.error_class or '').inc()
+        if event.retry:
+            self.retries.labels(endpoint).inc()
+        if event.throttled:
+            self.throttled.labels(endpoint).inc()
+        if event.bytes_sent:
+            self.transferred.labels(endpoint, 'sent').inc(event.bytes_sent)
+        if event.bytes_received:
+            self.transferred.labels(endpoint, 'received').inc(
+                event.bytes_received)
+
+
+class OpenTelemetryHook(object):
+    """
+    A hook recording requests with the OpenTelemetry API: as the metrics
+    ``neverbounce.request.duration``, ``neverbounce.execution_time`` (both
+    histograms), ``neverbounce.requests`` and ``neverbounce.transferred``
+    (counters), and, unless ``tracing`` is ``False``, as a span per request
+    attempt.
+
+    Args:
+        meter: Default is the global meter provider's meter for
+            ``neverbounce_sdk``.
+        tracer: Default is the global tracer provider's tracer for
+            ``neverbounce_sdk``.
+        tracing (bool): Default is ``True``.
+    """
+
+    def __init__(self, meter=None, tracer=None, tracing=True):
+        try:
+            from opentelemetry import metrics, trace
+        except ImportError:
+            raise ImportError('OpenTelemetryHook requires opentelemetry-api; '
+                              'install it with `pip install '
+                              'opentelemetry-api`')
+        self._trace = trace
+        if meter is None:
+            meter = metrics.get_meter('neverbounce_sdk', VERSION)
+        if tracer is None and tracing:
+            tracer = trace.get_tracer('neverbounce_sdk', VERSION)
+        self.tracer = tracer if tracing else None
+        self.latency = meter.create_histogram(
+            'neverbounce.request.duration', unit='s',
+            description='Time taken by API requests')
+        self.execution_time = meter.create_histogram(
+            'neverbounce.execution_time', unit='ms',
+            description='Execution time of API requests, as reported by the '
+                        'API')
+        self.requests = meter.create_counter(
+            'neverbounce.requests', description='API requests')
+        self.transferred = meter.create_counter(
+            'neverbounce.transferred', unit='By',
+            description='Bytes of API request and response bodies')
+
+    def __call__(self, event):
+        attributes = {'neverbounce.endpoint': event.endpoint,
+                      'http.request.method': event.method,
+                      'neverbounce.attempt': event.attempt}
+        if event.status_code is not None:
+            attributes['http.response.status_code'] = event.status_code
+        if event.error is not None:
+            attributes['error.type'] = event.error_class
+        if event.throttled:
+            attributes['neverbounce.throttled'] = True
+
+        endpoint = {'neverbounce.endpoint': event.endpoint}
+        self.latency.record(event.duration, attributes)
+        if event.execution_time is not None:
+            self.execution_time.record(event.execution_time, endpoint)
+        self.requests.add(1, attributes)
+        if event.bytes_sent:
+            self.transferred.add(event.bytes_sent,
+                                 dict(endpoint, direction='sent'))
+        if event.bytes_received:
+            self.transferred.add(event.bytes_received,
+                                 dict(endpoint, direction='received'))
+
+        if self.tracer is not None:
+            # the span is recorded after the fact, with the attempt's times
+            span = self.tracer.start_span(
+                'neverbounce {}'.format(event.endpoint),
+                kind=self._trace.SpanKind.CLIENT, attributes=attributes,
+                start_time=int(event.started * 1e9))
+            if event.error is not None:
+                span.set_status(self._trace.Status(
+                    self._trace.StatusCode.ERROR, str(event.error)))
+            span.end(end_time=int((event.started + event.duration) * 1e9))
@@ -1,7 +1,6 @@
 """
 API support for endpoints located at API_ROOT/poe
 """
-from .utils import urlforversion
 
 
 class POEMixin(object):
@@ -24,11 +23,9 @@ class POEMixin(object):
         See Also:
             https://developers.neverbounce.com/v4.0/reference#widget-poe-confirm
         """
-        endpoint = urlforversion(self.api_version, 'poe', 'confirm')
+        endpoint = self._url('poe', 'confirm')
         params = dict(email=email,
                       transaction_id=transaction_id,
                       confirmation_token=confirmation_token,
                       result=result)
-        resp = self._make_request('GET', endpoint, params=params)
-        self._check_response(resp)
-        return resp.json()
+        return self._request('GET', endpoint, params=params)
@@ -0,0 +1,255 @@
+"""
+Local screening of email addresses before they are sent for verification
+
+Addresses that are malformed, repeated, or at disposable or blocked domains
+would spend a request and a credit each for a foregone result.  A
+``PreFilter`` sets them aside, and reports which were set aside and why::
+
+    screen = neverbounce_sdk.PreFilter().screen(rows)
+    job = client.jobs_create(screen.rows, auto_parse=True, auto_start=True)
+    for rejection in screen.rejected:
+        print(rejection.index, rejection.email, rejection.reason)
+"""
+import re
+from collections import Counter, namedtuple
+
+__all__ = ['DISPOSABLE_DOMAINS', 'ROLE_ACCOUNTS', 'PreFilter',
+           'PreFilterReport', 'Rejection']
+
+#: a sample of widely used disposable email domains
+DISPOSABLE_DOMAINS = frozenset([
+    '10minutemail.com', '20minutemail.com', 'discard.email',
+    'dispostable.com', 'emailondeck.com', 'fakeinbox.com', 'getairmail.com',
+    'getnada.com', 'guerrillamail.biz', 'guerrillamail.com',
+    'guerrillamail.de', 'guerrillamail.info', 'guerrillamail.net',
+    'guerrillamail.org', 'guerrillamailblock.com', 'maildrop.cc',
+    'mailinator.com', 'mailinator.net', 'mailnesia.com', 'mintemail.com',
+    'mohmal.com', 'moakt.com', 'mytemp.email', 'sharklasers.com',
+    'spam4.me', 'spamgourmet.com', 'temp-mail.org', 'tempail.com',
+    'tempmail.net', 'tempmailo.com', 'tempr.email', 'throwawaymail.com',
+    'trashmail.com', 'trashmail.de', 'yopmail.com', 'yopmail.fr',
+    'yopmail.net',
+])
+
+#: local parts of addresses reaching a role or a system rather than a person
+ROLE_ACCOUNTS = frozenset([
+    'abuse', 'admin', 'administrator', 'billing', 'compliance', 'contact',
+    'devnull', 'dns', 'ftp', 'help', 'hostmaster', 'info', 'inoc',
+    'ispfeedback', 'ispsupport', 'list', 'list-request', 'maildaemon',
+    'mailer-daemon', 'marketing', 'no-reply', 'noc', 'noreply', 'null',
+    'office', 'phish', 'phishing', 'postmaster', 'privacy', 'registrar',
+    'root', 'sales', 'security', 'spam', 'support', 'sysadmin', 'tech',
+    'undisclosed-recipients', 'unsubscribe', 'usenet', 'uucp', 'webmaster',
+    'www',
+])
+
+# the reasons addresses are set aside, in the order they are checked
+SYNTAX = 'syntax'
+DUPLICATE = 'duplicate'
+DISPOSABLE = 'disposable'
+BLOCKED = 'blocked'
+ROLE = 'role'
+
+# RFC 5321/5322 addresses: a dot-atom or quoted local part, and a domain of
+# at least two labels (the last not numeric) or an IPv4 address literal.
+# Characters beyond ASCII are allowed, as SMTPUTF8 does.
+_NON_ASCII = u'[^\\x00-\\x7f]'
+_ATEXT = u"(?:[A-Za-z0-9!#$%&'*+/=?^_`{{|}}~-]|{})".format(_NON_ASCII)
+_ALNUM = u'(?:[A-Za-z0-9]|{})'.format(_NON_ASCII)
+_LABEL = u'{alnum}(?:(?:{alnum}|-){{0,61}}{alnum})?'.format(alnum=_ALNUM)
+_ADDRESS = re.compile(
+    u'(?:{atext}+(?:\\.{atext}+)*|"(?:[^"\\\\\\r\\n]|\\\\.){{0,62}}")'
+    u'@(?:(?:{label}\\.)+(?!\\d+\\Z){label}'
+    u'|\\[\\d{{1,3}}(?:\\.\\d{{1,3}}){{3}}\\])\\Z'
+    .format(atext=_ATEXT, label=_LABEL))
+
+
+class Rejection(namedtuple('Rejection', ['index', 'email', 'reason',
+                                         'duplicate_of'])):
+    """
+    An address set aside by a ``PreFilter``.
+
+    Attributes:
+        index (int): The position of the row in the screened input
+        email (str): The address, normalized unless it is malformed
+        reason (str): ``'syntax'``, ``'duplicate'``, ``'disposable'``,
+            ``'blocked'`` or ``'role'``
+        duplicate_of (int): For duplicates, the index of the first row with
+            the same address; otherwise ``None``
+    """
+    __slots__ = ()
+
+    @property
+    def result(self):
+        """The verification result the API would give the address, if it is
+        known: ``'invalid'`` for malformed addresses, ``'disposable'`` for
+        disposable domains, ``None`` otherwise"""
+        return {SYNTAX: 'invalid', DISPOSABLE: 'disposable'}.get(self.reason)
+
+
+class PreFilterReport(object):
+    """
+    The outcome of ``PreFilter.screen``.
+
+    Attributes:
+        rows (list): The rows that passed, in input order, with their
+            addresses normalized (rows that are ``dict`` objects or lists
+            are copied, lists as lists)
+        indexes (list): The position in the input of each row in ``rows``
+        rejected (list): A ``Rejection`` for each row set aside, in input
+            order
+        counts (Counter): The number of rows set aside for each reason
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.indexes = []
+        self.rejected = []
+        self.counts = Counter()
+
+    @property
+    def total(self):
+        """The number of rows screened"""
+        return len(self.rows) + len(self.rejected)
+
+    def __repr__(self):
+        return 'PreFilterReport(passed={}, rejected={})'.format(
+            len(self.rows), dict(self.counts))
+
+
+class PreFilter(object):
+    """
+    Screens email addresses for ones not worth verifying: malformed ones,
+    repeats of an earlier address, and ones at disposable or blocked
+    domains or, optionally, role accounts such as ``postmaster@``.
+
+    Addresses are normalized by trimming whitespace and lowercasing the
+    domain (and, with ``lowercase``, the local part too); duplicates are
+    found without regard to case, as the API does.
+
+    Args:
+        disposable_domains: Domains of disposable mailboxes.  Default is
+            ``DISPOSABLE_DOMAINS``; pass ``()`` to keep them.
+        blocked_domains: Other domains to set aside.  Default is ``()``.
+        role_accounts: Local parts to set aside, e.g. ``ROLE_ACCOUNTS``.
+            Default is ``()``.
+        dedupe (bool): If ``True``, set aside repeated addresses.  Default is
+            ``True``.
+        lowercase (bool): If ``True``, lowercase the whole address rather
+            than its domain only.  Default is ``False``.
+        field (str): The key of the address in rows that are ``dict``
+            objects, as given to ``jobs_create``.  Default is ``'email'``.
+    """
+
+    def __init__(self, disposable_domains=DISPOSABLE_DOMAINS,
+                 blocked_domains=(), role_accounts=(), dedupe=True,
+                 lowercase=False, field='email'):
+        self.disposable_domains = frozenset(
+            domain.lower() for domain in disposable_domains)
+        self.blocked_domains = frozenset(
+            domain.lower() for domain in blocked_domains)
+        self.role_accounts = frozenset(
+            account.lower() for account in role_accounts)
+        self.dedupe = dedupe
+        self.lowercase = lowercase
+        self.field = field
+
+    def normalize(self, email):
+        """Returns ``email`` normalized, or ``None`` if it is malformed"""
+        email = email.strip()
+        if len(email) > 254 or not _ADDRESS.match(email):
+            return None
+        local, _, domain = email.rpartition('@')
+        if len(local) > 64:
+            return None
+        if self.lowercase:
+            local = local.lower()
+        return u'{}@{}'.format(local, domain.lower())
+
+    def _domain_reason(self, domain):
+        if domain in self.disposable_domains:
+            return DISPOSABLE
+        if domain in self.blocked_domains:
+            return BLOCKED
+        return None
+
+    def _reason(self, email, domain_reasons=None):
+        """Returns why the normalized ``email`` is set aside, apart from
+        repeats, or ``None``.  The reasons found for domains are memoized
+        in ``domain_reasons``, if given."""
+        local, _, domain = email.rpartition('@')
+        if domain_reasons is None:
+            reason = self._domain_reason(domain)
+        else:
+            try:
+                reason = domain_reasons[domain]
+            except KeyError:
+                reason = domain_reasons[domain] = self._domain_reason(domain)
+        if reason is None and self.role_accounts and \
+                local.lower() in self.role_accounts:
+            return ROLE
+        return reason
+
+    def check(self, email):
+        """Returns why ``email`` would be set aside (other than as a repeat),
+        or ``None`` if it is worth verifying; e.g. before ``single_check``"""
+        normalized = self.normalize(email)
+        if normalized is None:
+            return SYNTAX
+        return self._reason(normalized)
+
+    def screen(self, rows):
+        """
+        Screens ``rows``: email addresses, or rows as given to
+        ``jobs_create``, either ``dict`` objects holding the address under
+        ``field`` or lists (or tuples) with the address first.
+
+        Returns:
+            A ``PreFilterReport``
+        """
+        report = PreFilterReport()
+        passed, indexes = report.rows, report.indexes
+        rejected, counts = report.rejected, report.counts
+        seen = {}
+        field = self.field
+        # domains repeat a lot in real lists, so each is looked up once
+        domain_reasons = {}
+        for index, row in enumerate(rows):
+            is_dict = isinstance(row, dict)
+            is_list = isinstance(row, (list, tuple))
+            if is_dict:
+                email = row.get(field)
+            elif is_list:
+                email = row[0] if row else None
+            else:
+                email = row
+            normalized = self.normalize(email) if email else None
+            if normalized is None:
+                rejected.append(Rejection(index, email, SYNTAX, None))
+                counts[SYNTAX] += 1
+                continue
+            if self.dedupe:
+                key = normalized.lower()
+                first = seen.setdefault(key, index)
+                if first != index:
+                    rejected.append(Rejection(index, normalized, DUPLICATE,
+                                              first))
+                    counts[DUPLICATE] += 1
+                    continue
+            reason = self._reason(normalized, domain_reasons)
+            if reason is not None:
+                rejected.append(Rejection(index, normalized, reason, None))
+                counts[reason] += 1
+                continue
+            if is_dict:
+                if normalized != email:
+                    row = dict(row)
+                    row[field] = normalized
+            elif is_list:
+                if normalized != email:
+                    row = [normalized] + list(row[1:])
+            else:
+                row = normalized
+            passed.append(row)
+            indexes.append(index)
+        return report
@@ -0,0 +1,92 @@
+"""
+Client-side rate limiting for NeverBounce API requests
+"""
+import threading
+import time
+
+from .utils import _clock
+
+__all__ = ['RateLimiter']
+
+
+class RateLimiter(object):
+    """A thread-safe token bucket limiting the rate of API requests.
+
+    The bucket holds up to ``burst`` tokens and is refilled at ``rate`` tokens
+    per second; every request takes one token.  When the bucket is empty,
+    requests wait for their token in the order they asked for it, so callers
+    can saturate the allowance without exceeding it and triggering
+    ``ThrottleTriggered``.
+
+    A single limiter may be shared by several clients, threads and the asyncio
+    client (which waits on the event loop instead of blocking).
+
+    Args:
+        rate (float): The sustained number of requests allowed per second.
+        burst (int): The number of requests that may be made at once after a
+            quiet period.  Default is ``rate`` (rounded up, at least ``1``).
+    """
+
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError('rate must be positive, not {}'.format(rate))
+        if burst is None:
+            burst = max(1, int(rate + 0.5))
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = _clock()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.delayed_requests = 0
+        self.total_wait = 0.0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def reserve(self, tokens=1):
+        """Takes ``tokens`` from the bucket and returns the number of seconds
+        the caller must wait before using them (``0.0`` if it may proceed
+        immediately).  The bucket goes into debt rather than refusing, which
+        queues later callers behind this one."""
+        with self._lock:
+            self._refill(_clock())
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+            self.requests += 1
+            if wait:
+                self.delayed_requests += 1
+                self.total_wait += wait
+        return wait
+
+    def acquire(self, tokens=1):
+        """Blocks until ``tokens`` are available; returns the time waited"""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    @property
+    def tokens(self):
+        """The number of tokens currently in the bucket; negative while
+        callers are waiting"""
+        with self._lock:
+            self._refill(_clock())
+            return self._tokens
+
+    @property
+    def wait_time(self):
+        """The number of seconds a request made now would have to wait"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def metrics(self):
+        """Returns a ``dict`` snapshot of the limiter's state and counters"""
+        return dict(rate=self.rate,
+                    burst=self.burst,
+                    tokens=self.tokens,
+                    wait_time=self.wait_time,
+                    requests=self.requests,
+                    delayed_requests=self.delayed_requests,
+                    total_wait=self.total_wait)
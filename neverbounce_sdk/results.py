@@ -0,0 +1,268 @@
+"""
+Compact in-memory storage of bulk verification results
+"""
+from array import array
+
+__all__ = ['ResultTable', 'ResultRecord', 'RESULT_CODES']
+
+# the verification results in the order of their integer codes, as used by the
+# API's email_status_int append
+RESULT_CODES = ('valid', 'invalid', 'disposable', 'catchall', 'unknown')
+
+
+def _normalize(email):
+    return email.strip().lower()
+
+
+class ResultRecord(object):
+    """The verification result of a single email from a ``ResultTable``.
+
+    Attributes:
+        email (str): The address that was verified.
+        result (str): The verification result (``'valid'``, ...).
+        flags (tuple): The flags set by the verification.
+        suggested_correction (str): A suggested address, or ``''``.
+        data (dict): The other fields given for the address when the job was
+            created.
+    """
+    __slots__ = ('email', 'result', 'flags', 'suggested_correction', 'data')
+
+    def __init__(self, email, result, flags, suggested_correction, data):
+        self.email = email
+        self.result = result
+        self.flags = flags
+        self.suggested_correction = suggested_correction
+        self.data = data
+
+    def __eq__(self, other):
+        if not isinstance(other, ResultRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name)
+                   for name in self.__slots__)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __repr__(self):
+        return 'ResultRecord({})'.format(', '.join(
+            '{}={!r}'.format(name, getattr(self, name))
+            for name in self.__slots__))
+
+
+class ResultTable(object):
+    """Holds the results of a bulk job column by column, using a fraction of
+    the memory of the API's nested dicts.
+
+    Verification results are stored as one-byte codes, flags as indexes
+    into the distinct sets of flags seen, and the job's input fields as one
+    column each; addresses and other strings are kept once per row.  Rows
+    are read as ``ResultRecord`` objects, created on demand::
+
+        table = client.jobs_results_table(job_id)
+        len(table), table.counts()        # 1000, {'valid': 800, ...}
+        table[0].email, table[0].result   # 'a@example.com', 'valid'
+        table.get('A@example.com').flags  # ('has_dns', 'has_dns_mx')
+
+    A table is filled from ``jobs_results`` items with ``extend``, or from
+    ``jobs_download_rows`` rows with ``extend_rows``.  Its columns may be
+    exported as lists, NumPy arrays or a PyArrow table.
+    """
+
+    def __init__(self, results=()):
+        self.emails = []
+        self.suggested_corrections = []
+        self.data = {}
+        self.result_names = list(RESULT_CODES)
+        self.flag_sets = [()]
+        self._result_codes = array('B')
+        self._flag_codes = array('I')
+        self._result_index = dict((name, code) for code, name
+                                  in enumerate(self.result_names))
+        self._flag_index = {(): 0}
+        self._email_index = None
+        self.extend(results)
+
+    def __len__(self):
+        return len(self.emails)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        email = self.emails[index]
+        return ResultRecord(
+            email,
+            self.result_names[self._result_codes[index]],
+            self.flag_sets[self._flag_codes[index]],
+            self.suggested_corrections[index],
+            dict((name, column[index])
+                 for name, column in self.data.items()))
+
+    def __contains__(self, email):
+        return _normalize(email) in self._get_email_index()
+
+    def _get_email_index(self):
+        if self._email_index is None:
+            self._email_index = {}
+            for index, email in enumerate(self.emails):
+                self._email_index.setdefault(_normalize(email), index)
+        return self._email_index
+
+    def _intern(self, value, values, index):
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(values)
+            values.append(value)
+        return code
+
+    def _append(self, email, result, flags, suggested_correction, data):
+        row = len(self.emails)
+        self.emails.append(email)
+        self.suggested_corrections.append(suggested_correction or '')
+        self._result_codes.append(
+            self._intern(result, self.result_names, self._result_index))
+        self._flag_codes.append(
+            self._intern(tuple(flags), self.flag_sets, self._flag_index))
+        for name, value in data.items():
+            column = self.data.get(name)
+            if column is None:
+                # a field missing from earlier rows is empty in them
+                column = self.data[name] = [''] * row
+            column.append(value)
+        for column in self.data.values():
+            if len(column) == row:
+                column.append('')
+        if self._email_index is not None:
+            self._email_index.setdefault(_normalize(email), row)
+
+    def append(self, result):
+        """Adds an item of the ``results`` of the jobs/results endpoint"""
+        data = dict(result['data'])
+        email = data.pop('email', '')
+        verification = result['verification']
+        self._append(email,
+                     verification['result'],
+                     verification.get('flags', ()),
+                     verification.get('suggested_correction'),
+                     data)
+
+    def extend(self, results):
+        """Adds every item of ``results``, e.g. an iterator returned by
+        ``jobs_results``"""
+        for result in results:
+            self.append(result)
+
+    def extend_rows(self, rows, email_field='email'):
+        """Adds the rows returned by ``jobs_download_rows``.  The download must
+        include the ``email_status`` or ``email_status_int`` append, which
+        give each row's result; other columns are stored as data."""
+        for row in rows:
+            data = row._asdict()
+            email = data.pop(email_field)
+            result = data.pop('email_status', None)
+            code = data.pop('email_status_int', None)
+            if result is None:
+                if code is None:
+                    raise ValueError('Rows must include the email_status or '
+                                     'email_status_int append.')
+                result = RESULT_CODES[int(code)]
+            self._append(email, result, (), '', data)
+
+    def index(self, email):
+        """Returns the row number of the first result for ``email`` (compared
+        without case or surrounding whitespace); raises ``KeyError`` if there
+        is none"""
+        return self._get_email_index()[_normalize(email)]
+
+    def get(self, email, default=None):
+        """Returns the ``ResultRecord`` for ``email``, or ``default``"""
+        try:
+            return self[self.index(email)]
+        except KeyError:
+            return default
+
+    def counts(self):
+        """Returns a ``dict`` mapping each verification result to the number of
+        rows having it"""
+        tally = [0] * len(self.result_names)
+        for code in self._result_codes:
+            tally[code] += 1
+        return dict((name, count) for name, count
+                    in zip(self.result_names, tally) if count)
+
+    @property
+    def results(self):
+        """The verification result of every row, as a list"""
+        names = self.result_names
+        return [names[code] for code in self._result_codes]
+
+    @property
+    def result_codes(self):
+        """The code of every row's verification result (the index of the
+        result in ``result_names``, which for the known results matches
+        ``email_status_int``), as an ``array`` of bytes"""
+        return self._result_codes
+
+    @property
+    def flags(self):
+        """The flags of every row, as a list of tuples"""
+        flag_sets = self.flag_sets
+        return [flag_sets[code] for code in self._flag_codes]
+
+    def to_dict(self):
+        """Returns the table as a ``dict`` of equally long lists, one per
+        column: ``email``, ``result``, ``flags``, ``suggested_correction``
+        and, for each input field, ``data.<field>``"""
+        columns = dict(email=list(self.emails),
+                       result=self.results,
+                       flags=self.flags,
+                       suggested_correction=list(self.suggested_corrections))
+        # prefixed, so that input fields named like the result columns are
+        # kept
+        for name, column in self.data.items():
+            columns['data.' + name] = list(column)
+        return columns
+
+    def to_numpy(self):
+        """Returns the table as a ``dict`` of NumPy arrays, one per column.
+        ``result_code`` holds the result codes as ``uint8``; strings are
+        stored in ``object`` arrays.  Requires ``numpy``."""
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover
+            raise ImportError('ResultTable.to_numpy requires numpy')
+
+        def strings(values):
+            column = numpy.empty(len(values), dtype=object)
+            column[:] = values
+            return column
+
+        columns = dict((name, strings(values))
+                       for name, values in self.to_dict().items())
+        columns['result_code'] = numpy.frombuffer(
+            self._result_codes, dtype=numpy.uint8).copy()
+        return columns
+
+    def to_arrow(self):
+        """Returns the table as a ``pyarrow.Table``, with ``result``
+        dictionary-encoded.  Requires ``pyarrow``."""
+        try:
+            import pyarrow
+        except ImportError:  # pragma: no cover
+            raise ImportError('ResultTable.to_arrow requires pyarrow')
+
+        columns = self.to_dict()
+        codes = pyarrow.Array.from_buffers(
+            pyarrow.uint8(), len(self),
+            [None, pyarrow.py_buffer(self._result_codes.tobytes())])
+        columns['result'] = pyarrow.DictionaryArray.from_arrays(
+            codes,
+            pyarrow.array(self.result_names, type=pyarrow.string()))
+        columns['flags'] = pyarrow.array(
+            [list(flags) for flags in columns['flags']],
+            type=pyarrow.list_(pyarrow.string()))
+        return pyarrow.table(columns)
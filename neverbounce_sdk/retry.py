@@ -0,0 +1,145 @@
+"""
+Retrying of failed NeverBounce API requests
+"""
+import random
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+import requests
+
+from .exceptions import ThrottleTriggered
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+__all__ = ['RetryPolicy']
+
+# failures after which the request may or may not have been processed
+_TRANSIENT_ERRORS = (ThrottleTriggered,
+                     requests.ConnectionError,
+                     requests.Timeout)
+
+# failures after which the request certainly was not processed, so that even
+# requests which are not idempotent may be sent again
+_NOT_PROCESSED_ERRORS = (ThrottleTriggered,
+                         requests.exceptions.ConnectTimeout)
+
+if httpx is not None:
+    _TRANSIENT_ERRORS += (httpx.TransportError,)
+    _NOT_PROCESSED_ERRORS += (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _status_code(exc):
+    """Returns the HTTP status of the response attached to ``exc``, if any"""
+    return getattr(getattr(exc, 'response', None), 'status_code', None)
+
+
+def _parse_retry_after(value):
+    """Parses a Retry-After header (delay in seconds or an HTTP date) into a
+    number of seconds, or returns ``None`` if it can't be parsed"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, mktime_tz(parsedate_tz(value)) - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class RetryPolicy(object):
+    """Describes when and how failed API requests are retried.
+
+    A request is retried when it fails with one of the ``retry_on`` exceptions
+    (by default throttling, connection errors and timeouts) or with an HTTP
+    error status in ``retry_statuses``.  Requests that are not idempotent,
+    such as ``jobs_create``, are only retried if the failure shows that the
+    API did not process them: a throttle, a 429 status or a failure to
+    connect.
+
+    Retries wait for an exponentially growing delay of ``backoff_factor * 2 **
+    (attempt - 1)`` seconds, capped at ``max_backoff``.  With ``jitter`` the
+    delay is drawn uniformly between zero and that value, which keeps many
+    clients from retrying in lockstep.  A ``Retry-After`` header on the
+    failed response takes precedence when it asks for a longer wait.
+
+    Args:
+        max_attempts (int): The maximum number of attempts, including the
+            first.  Default is ``3``.
+        backoff_factor (float): The delay before the first retry, in seconds,
+            before jitter.  Default is ``0.5``.
+        max_backoff (float): The longest delay between attempts, before
+            ``Retry-After``.  Default is ``30``.
+        jitter (bool): If ``True``, randomize delays.  Default is ``True``.
+        retry_on (tuple): The exception classes that are retried.
+        retry_statuses (tuple): The HTTP status codes that are retried.
+            Default is ``(429, 500, 502, 503, 504)``.
+        respect_retry_after (bool): If ``True``, honor ``Retry-After``
+            headers.  Default is ``True``.
+    """
+
+    def __init__(self,
+                 max_attempts=3,
+                 backoff_factor=0.5,
+                 max_backoff=30.0,
+                 jitter=True,
+                 retry_on=_TRANSIENT_ERRORS,
+                 retry_statuses=(429, 500, 502, 503, 504),
+                 respect_retry_after=True):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_on = tuple(retry_on)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+
+    def is_retryable(self, exc, idempotent=True):
+        """Returns ``True`` if a request that failed with ``exc`` may be sent
+        again"""
+        status = _status_code(exc)
+        if not (isinstance(exc, self.retry_on) or
+                status in self.retry_statuses):
+            return False
+        if idempotent:
+            return True
+        return isinstance(exc, _NOT_PROCESSED_ERRORS) or status == 429
+
+    def backoff(self, attempt):
+        """Returns the delay before retrying after attempt ``attempt``"""
+        delay = min(self.max_backoff,
+                    self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def next_delay(self, attempt, exc, idempotent=True, response=None):
+        """Decides whether to retry after attempt number ``attempt`` failed
+        with ``exc``.
+
+        Arguments:
+            attempt (int): the number of the failed attempt, starting at 1
+            exc (Exception): the exception the attempt failed with
+            idempotent (bool): whether the request may safely be repeated
+            response: the response to the failed attempt, if there was one
+
+        Returns:
+            The number of seconds to wait before the next attempt, or ``None``
+            if the request should not be retried.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not self.is_retryable(exc, idempotent):
+            return None
+
+        delay = self.backoff(attempt)
+        if self.respect_retry_after:
+            if response is None:
+                response = getattr(exc, 'response', None)
+            headers = getattr(response, 'headers', None) or {}
+            retry_after = _parse_retry_after(headers.get('Retry-After'))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
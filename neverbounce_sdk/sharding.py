@@ -0,0 +1,280 @@
+"""
+Verification of lists too large for a single bulk job
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
+import requests
+
+# Python 2 COMPAT
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+from .bulk import _JobPoller, _input_rows
+from .exceptions import GeneralException
+from .retry import RetryPolicy
+from .utils import _clock, _string_types
+
+__all__ = ['ShardingMixin']
+
+# errors of the requests made for a shard that its RetryPolicy may retry
+_SHARD_ERRORS = (GeneralException, requests.RequestException)
+
+
+def _shard_row(row, index, row_key):
+    """Returns ``row`` as a ``dict`` holding its index under ``row_key``;
+    an email given alone becomes ``{'email': email}`` and a list becomes
+    the email (its first item) and its other items keyed by position"""
+    if isinstance(row, Mapping):
+        row = dict(row)
+    elif isinstance(row, _string_types):
+        row = {'email': row}
+    else:
+        values = list(row)
+        row = dict((str(i), value) for i, value in enumerate(values[1:], 1))
+        row['email'] = values[0]
+    if row_key in row:
+        raise ValueError('input row {} already has a {!r} field; pick '
+                         'another row_key'.format(index, row_key))
+    row[row_key] = index
+    return row
+
+
+def _spooled(path):
+    """Yields the rows written to the file at ``path`` by ``_spool_shards``"""
+    with io.open(path, encoding='utf-8') as fd:
+        for line in fd:
+            yield json.loads(line)
+
+
+class _Shard(object):
+    """A slice of the input of ``verify_list``, spooled to a file"""
+    __slots__ = ('number', 'path', 'size')
+
+    def __init__(self, number, path):
+        self.number = number
+        self.path = path
+        self.size = 0
+
+
+class ShardingMixin(object):
+    __doc__ = __doc__
+
+    def verify_list(self, source, shard_size=100000, workers=4,
+                    max_attempts=3, min_interval=1, max_interval=60,
+                    items_per_page=1000, prefetch=2, row_key='nb_row',
+                    **create_kwargs):
+        """
+        Verifies a list of any size by splitting it into shards of
+        ``shard_size`` rows, verifying each shard as its own bulk job and
+        merging the jobs' results back into input order.
+
+        The input is read once, a shard at a time, and spooled to temporary
+        files, so neither it nor the results are ever held in memory in
+        full.  Each shard's job is created and started by ``jobs_create``
+        (with ``auto_parse`` and ``auto_start``) on one of ``workers``
+        threads, which then wait for it to complete.  A shard whose job
+        failed is sent again as a new job, up to ``max_attempts`` times,
+        independently of the other shards.  Throttled or failed requests
+        are retried as by a ``RetryPolicy`` of ``max_attempts``; the
+        creation of a job only if it certainly was not processed, so that
+        no shard is ever verified twice at once.
+
+        Each row is sent with its index in the input as the metadata field
+        ``row_key``, which is used to put the results back in order and
+        removed from them.
+
+        Arguments:
+            source (list, iterable, file or str):
+                The emails to verify, in any form accepted by
+                ``jobs_create``: mappings with an ``email`` key, lists with
+                the email first, or a CSV file given as an open file or a
+                path.  Plain email strings are accepted as well.
+
+            shard_size (int):
+                The number of rows per job.  Default is ``100000``.
+
+            workers (int):
+                The number of shards created and waited for at once.
+                Default is ``4``.
+
+            max_attempts (int):
+                How many jobs may be created for one shard, and how many
+                times each request is attempted, before giving up.
+                Default is ``3``.
+
+            min_interval, max_interval (float):
+                The shortest and longest times between two checks of a
+                job's status, which are spaced as by ``wait_for_job``.
+                Defaults are ``1`` and ``60`` seconds.
+
+            items_per_page (int):
+                The number of results fetched per request.  Default is
+                ``1000``.
+
+            prefetch (int):
+                Passed to ``jobs_results``.  Default is ``2``.
+
+            row_key (str):
+                The metadata field holding each row's index.  Default is
+                ``'nb_row'``.
+
+        Any other keyword arguments, such as ``historical_data`` or
+        ``filename``, are passed to ``jobs_create``; a ``filename`` has the
+        shard number appended.
+
+        Returns:
+            A generator of ``(row, result)`` tuples in input order, where
+            ``row`` is the index of the row in ``source`` and ``result`` its
+            result object, as yielded by ``jobs_results``.  Shards are
+            verified in the background while the results of earlier ones
+            are consumed; closing the generator stops waiting for them.
+            If a shard can't be verified in ``max_attempts`` jobs, the last
+            error is raised when its results are reached.
+        """
+        for key in ('auto_parse', 'auto_start', 'as_sample', 'from_url'):
+            if key in create_kwargs:
+                raise TypeError('verify_list does not accept {!r}'.format(key))
+        intervals = (min_interval, max_interval)
+        return self._verify_shards(source, shard_size, workers, max_attempts,
+                                   intervals, items_per_page, prefetch,
+                                   row_key, create_kwargs)
+
+    def _verify_shards(self, source, shard_size, workers, max_attempts,
+                       intervals, items_per_page, prefetch, row_key,
+                       create_kwargs):
+        """The generator returned by ``verify_list``"""
+        spool_dir = tempfile.mkdtemp(prefix='neverbounce-')
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = []
+        try:
+            for shard in self._spool_shards(source, shard_size, row_key,
+                                            spool_dir):
+                futures.append(executor.submit(
+                    self._verify_shard, shard, max_attempts, intervals, stop,
+                    create_kwargs))
+
+            for future in futures:
+                job_id = future.result()
+                for item in self._shard_results(job_id, row_key,
+                                                items_per_page, prefetch):
+                    yield item
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            shutil.rmtree(spool_dir, ignore_errors=True)
+
+    @staticmethod
+    def _spool_shards(source, shard_size, row_key, spool_dir):
+        """Writes the rows of ``source`` to files of ``shard_size`` rows,
+        yielding each ``_Shard`` once it is complete"""
+        shard = fd = None
+        try:
+            for index, row in enumerate(_input_rows(source)):
+                if shard is None or shard.size == shard_size:
+                    if shard is not None:
+                        fd.close()
+                        yield shard
+                    number = 0 if shard is None else shard.number + 1
+                    path = os.path.join(spool_dir, '{}.jsonl'.format(number))
+                    shard = _Shard(number, path)
+                    fd = io.open(path, 'w', encoding='utf-8')
+                # json.dumps gives a byte string on Python 2
+                fd.write(u'{}\n'.format(
+                    json.dumps(_shard_row(row, index, row_key))))
+                shard.size += 1
+        finally:
+            if fd is not None:
+                fd.close()
+        if shard is not None:
+            yield shard
+
+    def _verify_shard(self, shard, max_attempts, intervals, stop,
+                      create_kwargs):
+        """Creates a job for ``shard`` and waits for it to complete, creating
+        it again if the job fails; returns the id of the completed job.
+
+        So that a shard never runs as two jobs, ``jobs_create`` is only sent
+        again if it certainly was not processed, and failed status checks
+        are retried for the same job."""
+        create_kwargs = dict(create_kwargs)
+        if create_kwargs.get('filename') is not None:
+            create_kwargs['filename'] = '{}.{}'.format(
+                create_kwargs['filename'], shard.number)
+        policy = RetryPolicy(max_attempts=max_attempts,
+                             backoff_factor=intervals[0],
+                             max_backoff=intervals[1])
+
+        def create():
+            return self.jobs_create(_spooled(shard.path), auto_parse=True,
+                                    auto_start=True, **create_kwargs)
+
+        attempt = 1
+        while True:
+            job_id = self._retrying(policy, stop, False, create)['job_id']
+            status = self._wait_for_shard(job_id, intervals, stop, policy)
+            if status is None or status['job_status'] != 'failed':
+                return job_id
+            if stop.is_set() or attempt >= max_attempts:
+                raise GeneralException('Job {} failed: {}'.format(
+                    job_id, status.get('failure_reason')))
+            attempt += 1
+
+    @staticmethod
+    def _retrying(policy, stop, idempotent, func):
+        """Returns ``func()``, calling it again after failures that
+        ``policy`` retries until ``stop`` is set"""
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except _SHARD_ERRORS as exc:
+                delay = policy.next_delay(attempt, exc, idempotent)
+                if delay is None or stop.wait(delay):
+                    raise
+            attempt += 1
+
+    def _wait_for_shard(self, job_id, intervals, stop, policy):
+        """Polls the status of job ``job_id`` like ``wait_for_job`` until it
+        finishes, and returns its last status; returns ``None`` if ``stop``
+        is set first"""
+        poller = _JobPoller(*intervals)
+        while not stop.is_set():
+            status = self._retrying(policy, stop, True,
+                                    lambda: self.jobs_status(job_id))
+            delay = poller.update(status, _clock())
+            if delay is None:
+                return status
+            stop.wait(delay)
+        return None
+
+    def _shard_results(self, job_id, row_key, items_per_page, prefetch):
+        """Returns the ``(row, result)`` pairs of job ``job_id``, sorted by
+        row"""
+        results = self.jobs_results(job_id, items_per_page=items_per_page,
+                                    prefetch=prefetch)
+        rows = []
+        try:
+            for result in results:
+                try:
+                    row = int(result['data'].pop(row_key))
+                except (KeyError, TypeError, ValueError):
+                    raise GeneralException(
+                        'A result of job {} has no valid {!r} field: '
+                        '{!r}'.format(job_id, row_key, result))
+                rows.append((row, result))
+        finally:
+            results.close()
+        rows.sort(key=itemgetter(0))
+        return rows
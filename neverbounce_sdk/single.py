@@ -1,7 +1,36 @@
 """
 API support for endpoints located at API_ROOT/single
 """
-from .utils import urlforversion
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+SingleCheckResult = namedtuple('SingleCheckResult',
+                               ['index', 'email', 'result', 'exception'])
+SingleCheckResult.__doc__ = """The outcome of one check made by
+``single_check_many``.  ``index`` is the position of ``email`` in the input;
+exactly one of ``result`` (the API response) and ``exception`` is set."""
+
+
+class _Reorderer(object):
+    """Holds back ``SingleCheckResult`` objects that complete early so that
+    they can be released in input order"""
+
+    def __init__(self):
+        self._buffered = {}
+        self._next_index = 0
+
+    def __len__(self):
+        return len(self._buffered)
+
+    def push(self, outcome):
+        """Adds ``outcome``; returns the outcomes now ready, in order"""
+        self._buffered[outcome.index] = outcome
+        ready = []
+        while self._next_index in self._buffered:
+            ready.append(self._buffered.pop(self._next_index))
+            self._next_index += 1
+        return ready
 
 
 class SingleMixin(object):
@@ -29,12 +58,42 @@ class SingleMixin(object):
                 ``timeout`` parameter on the client). Default is ``30``.
 
         Returns:
-            A ``dict``
+            A ``dict``.  If the client has a ``cache`` holding a fresh result
+            for the same email and flags, that result is returned without
+            calling the API; cached results carry no ``credits_info``.  If
+            the client's ``coalesce`` option is set and an identical check
+            is already in flight, its result is shared.
 
         See Also:
             https://developers.neverbounce.com/v4.0/reference#single-check
         """
-        endpoint = urlforversion(self.api_version, 'single', 'check')
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(email, address_info, historical_data)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        endpoint, params = self._single_check_params(
+            email, address_info, credits_info, historical_data, timeout)
+        if self.coalesce:
+            flight_key = (email.strip().lower(), bool(address_info),
+                          bool(credits_info), bool(historical_data), timeout)
+            result = self._inflight.do(flight_key, self._request,
+                                       'GET', endpoint, params=params,
+                                       credits=1)
+        else:
+            result = self._request('GET', endpoint, params=params,
+                                   credits=1)
+
+        if cache_key is not None:
+            self.cache.set(cache_key, result)
+        return result
+
+    def _single_check_params(self, email, address_info, credits_info,
+                             historical_data, timeout):
+        """Returns the endpoint and query parameters for a single check"""
+        endpoint = self._url('single', 'check')
         params = dict(email=email,
                       # convert boolean flags to 0 or 1
                       address_info=int(address_info),
@@ -42,6 +101,57 @@ class SingleMixin(object):
                       timeout=timeout)
         historical_data_key = 'request_meta_data[leverage_historical_data]'
         params[historical_data_key] = int(historical_data)
-        resp = self._make_request('GET', endpoint, params=params)
-        self._check_response(resp)
-        return resp.json()
+        return endpoint, params
+
+    def single_check_many(self, emails, concurrency=10, ordered=False,
+                          **kwargs):
+        """Verifies many emails concurrently with ``single_check``, using a
+        pool of ``concurrency`` threads.
+
+        This is a generator: results are yielded as the checks complete, and
+        only a small window of ``emails`` is read ahead of the results, so
+        ``emails`` may be an arbitrarily long iterable.  A failed check does
+        not abort the batch; its exception is reported in the result instead.
+
+        Arguments:
+            emails (iterable): the email addresses to verify
+            concurrency (int): the maximum number of checks in flight.
+                Default is ``10``.
+            ordered (bool): If ``True``, yield results in the order of
+                ``emails`` rather than in order of completion.  Default is
+                ``False``.
+            **kwargs: passed on to ``single_check``
+
+        Yields:
+            ``SingleCheckResult`` objects
+        """
+        return self._single_check_many(emails, concurrency, ordered, kwargs)
+
+    def _single_check_many(self, emails, concurrency, ordered, kwargs):
+        def check(index, email):
+            try:
+                result = self.single_check(email, **kwargs)
+            except Exception as exc:
+                return SingleCheckResult(index, email, None, exc)
+            return SingleCheckResult(index, email, result, None)
+
+        reorderer = _Reorderer() if ordered else None
+        window = 2 * concurrency
+        emails = enumerate(emails)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # keep the workers busy while reading no further ahead than needed
+            pending = set(executor.submit(check, index, email)
+                          for index, email in islice(emails, window))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                ready = [future.result() for future in done]
+                if reorderer is not None:
+                    ready = [outcome for result in ready
+                             for outcome in reorderer.push(result)]
+                # results held back for ordering count against the window,
+                # so that a slow check can't make the buffer grow unbounded
+                room = window - len(pending) - len(reorderer or ())
+                for index, email in islice(emails, max(0, room)):
+                    pending.add(executor.submit(check, index, email))
+                for outcome in ready:
+                    yield outcome
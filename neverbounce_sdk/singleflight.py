@@ -0,0 +1,49 @@
+"""
+Coalescing of concurrent identical API calls
+"""
+import copy
+import threading
+from concurrent.futures import Future
+
+__all__ = ['SingleFlight']
+
+
+class SingleFlight(object):
+    """Deduplicates concurrent calls: while a call for a given key is in
+    flight, other threads asking for the same key wait for it and share its
+    outcome instead of making their own call.
+
+    The thread that made the call receives its result; threads that shared it
+    receive deep copies, so results can be modified safely.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Returns ``fn(*args, **kwargs)``, or the outcome of the call already
+        in flight for ``key``"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return copy.deepcopy(call.result())
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            call.set_exception(exc)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
@@ -0,0 +1,232 @@
+"""
+Transports send the HTTP requests of the synchronous client
+
+A transport is any object with the ``request`` and ``close`` methods of a
+``requests.Session``, whose responses behave like ``requests.Response``
+objects.  The client sends its requests through a ``RequestsTransport``
+unless it is given another one::
+
+    from neverbounce_sdk import HTTPXTransport
+
+    # many threads' requests multiplexed over a few HTTP/2 connections
+    client = neverbounce_sdk.client(api_key=api_key,
+                                    transport=HTTPXTransport(http2=True))
+
+``HTTPXTransport`` requires the optional ``httpx`` and ``h2`` dependencies::
+
+    pip install neverbounce_sdk[http2]
+"""
+import io
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .auth import StaticTokenAuth
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+__all__ = ['HTTPXTransport', 'RequestsTransport']
+
+
+class RequestsTransport(requests.Session):
+    """
+    The default transport: a ``requests.Session`` whose connection pool is
+    sized for the client.  Requests are sent over HTTP/1.1, one at a time
+    per connection.
+
+    Args:
+        pool_size (int): The maximum number of connections kept alive per
+            host.  Default is ``10``.
+        max_retries (int): The number of times to retry failed connections
+            (not failed requests).  Default is ``0``.
+    """
+
+    def __init__(self, pool_size=10, max_retries=0):
+        super(RequestsTransport, self).__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size,
+                              pool_maxsize=pool_size,
+                              max_retries=max_retries)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+
+def _translated(exc, body=False):
+    """Returns the ``requests`` exception matching the ``httpx`` exception
+    ``exc``, so that callers need only handle the former"""
+    if body and isinstance(exc, (httpx.ReadError,
+                                 httpx.RemoteProtocolError)):
+        return requests.exceptions.ChunkedEncodingError(exc)
+    if isinstance(exc, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(exc)
+    if isinstance(exc, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(exc)
+    if isinstance(exc, httpx.TransportError):
+        return requests.ConnectionError(exc)
+    return exc
+
+
+class _HTTPXBody(io.RawIOBase):
+    """The body of a streaming ``httpx`` response as a raw file, the way
+    ``requests`` exposes it as ``Response.raw``"""
+
+    # read by the download code from urllib3's responses; httpx always
+    # decodes the body and closes the stream when it has been read
+    decode_content = True
+    auto_close = True
+
+    def __init__(self, response):
+        self._chunks = response.iter_content()
+        self._pending = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b''
+                return 0
+        count = min(len(buf), len(self._pending))
+        buf[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
+
+class _HTTPXResponse(object):
+    """Presents an ``httpx.Response`` with the parts of the interface of
+    ``requests.Response`` that the client uses"""
+
+    def __init__(self, response):
+        self._response = response
+        self.request = response.request
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.reason = response.reason_phrase
+        self.url = str(response.url)
+        self.http_version = response.http_version
+        self._raw = None
+
+    @property
+    def content(self):
+        try:
+            return self._response.read()
+        except httpx.HTTPError as exc:
+            raise _translated(exc, body=True)
+
+    @property
+    def text(self):
+        self.content
+        return self._response.text
+
+    @property
+    def raw(self):
+        if self._raw is None:
+            self._raw = _HTTPXBody(self)
+        return self._raw
+
+    def json(self, **kwargs):
+        return self._response.json(**kwargs)
+
+    def iter_content(self, chunk_size=None):
+        try:
+            for chunk in self._response.iter_bytes(chunk_size):
+                yield chunk
+        except httpx.HTTPError as exc:
+            raise _translated(exc, body=True)
+
+    def raise_for_status(self):
+        if 400 <= self.status_code < 600:
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.HTTPError('{} {} Error: {} for url: {}'.format(
+                self.status_code, kind, self.reason, self.url),
+                response=self)
+
+    def close(self):
+        self._response.close()
+
+
+class HTTPXTransport(object):
+    """
+    A transport sending requests through an ``httpx.Client``.  With
+    ``http2``, the requests of every thread using the client are multiplexed
+    as concurrent streams over a few connections, rather than each taking a
+    connection of its own.
+
+    The ``httpx.Client`` is created on first use, and again after ``close``.
+
+    Args:
+        http2 (bool): If ``True``, speak HTTP/2 with servers that support it
+            (over TLS).  Requires the ``h2`` package.  Default is ``True``.
+        pool_size (int): The maximum number of connections.  Default is
+            ``10``.
+        max_retries (int): The number of times to retry failed connections
+            (not failed requests).  Default is ``0``.
+        **client_kwargs: Passed on to ``httpx.Client``, e.g. ``verify`` or
+            ``proxy``.
+    """
+
+    def __init__(self, http2=True, pool_size=10, max_retries=0,
+                 **client_kwargs):
+        if httpx is None:
+            raise ImportError('HTTPXTransport requires httpx; install it '
+                              'with `pip install neverbounce_sdk[http2]`')
+        self.http2 = http2
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.client_kwargs = client_kwargs
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    limits = httpx.Limits(
+                        max_connections=self.pool_size,
+                        max_keepalive_connections=self.pool_size)
+                    transport = httpx.HTTPTransport(
+                        http2=self.http2, limits=limits,
+                        retries=self.max_retries)
+                    # timeouts are given per request, as with requests
+                    kwargs = dict(timeout=None)
+                    kwargs.update(self.client_kwargs)
+                    self._client = httpx.Client(transport=transport,
+                                                **kwargs)
+        return self._client
+
+    def request(self, method, url, params=None, data=None, headers=None,
+                auth=None, timeout=None, stream=False, **kwargs):
+        """Sends a request, taking the arguments of
+        ``requests.Session.request`` that the client uses"""
+        params = dict(params or {})
+        if isinstance(auth, StaticTokenAuth):
+            params.update(auth.api_key_d)
+        elif auth is not None:
+            kwargs['auth'] = auth
+        if isinstance(data, dict):
+            kwargs['data'] = data
+        elif data is not None:
+            # bytes, or an iterable of bytes such as a streamed upload
+            kwargs['content'] = data
+
+        client = self._get_client()
+        try:
+            request = client.build_request(method, url, params=params,
+                                           headers=headers, timeout=timeout,
+                                           **kwargs)
+            response = client.send(request, stream=stream)
+        except httpx.HTTPError as exc:
+            raise _translated(exc)
+        return _HTTPXResponse(response)
+
+    def close(self):
+        """Closes the transport's connections"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
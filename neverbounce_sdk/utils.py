@@ -1,17 +1,45 @@
 """
 Utility functions and constants used in the codebase
 """
+import json
+import time
 
 __all__ = [
     'API_ROOT',
     'API_VERSION',
     'urlfor',
+    'urlforroot',
     'urlforversion'
 ]
 
 API_ROOT = 'https://api.neverbounce.com'
 API_VERSION = 'v4.2'
 
+# Python 2 COMPAT
+_clock = getattr(time, 'monotonic', time.time)
+
+try:
+    _string_types = (str, unicode)  # noqa: F821
+except NameError:
+    _string_types = (str,)
+
+
+def _stdlib_loads(content):
+    # json only accepts bytes from Python 3.6 on
+    if isinstance(content, bytes):
+        content = content.decode('utf-8')
+    return json.loads(content)
+
+
+# decode responses with the fastest JSON library installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        json_loads = _stdlib_loads
+
 
 def urlfor(*parts):
     """Returns the API endpoint base url (i.e. does not handle URL params)"""
@@ -20,5 +48,11 @@ def urlfor(*parts):
 
 def urlforversion(api_version, *parts):
     """Returns the API endpoint base url (i.e. does not handle URL params)"""
+    return urlforroot(API_ROOT, api_version, *parts)
+
+
+def urlforroot(api_root, api_version, *parts):
+    """Returns the endpoint base url of the API served at ``api_root``, e.g.
+    a local fake server"""
     endpoint = '/'.join(parts)
-    return '{}/{}/{}'.format(API_ROOT, api_version, endpoint)
+    return '{}/{}/{}'.format(api_root.rstrip('/'), api_version, endpoint)
@@ -35,7 +35,17 @@ setup(
     include_package_data=True,
     install_requires=[
         'requests',
+        'futures; python_version < "3.2"',
     ],
+    extras_require={
+        'async': ['httpx'],
+        'http2': ['httpx[http2]'],
+        'prometheus': ['prometheus_client'],
+        'opentelemetry': ['opentelemetry-api'],
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
+        'speedups': ['orjson; python_version >= "3.6"'],
+    },
     license='MIT',
     zip_safe=False,
     keywords=['neverbounce', 'api', 'email', 'verification', 'cleaning'],
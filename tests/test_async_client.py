@@ -0,0 +1,536 @@
+"""
+Tests the asyncio client
+"""
+import asyncio
+import json
+
+import pytest
+
+from neverbounce_sdk import (AuthFailure, CreditBudget, CreditBudgetExceeded,
+                             GeneralException, JobTimeout, RateLimiter,
+                             RetryPolicy)
+from neverbounce_sdk.callbacks import CallbackReceiver
+from neverbounce_sdk.fakeserver import FakeNeverBounce
+
+httpx = pytest.importorskip('httpx')
+aio = pytest.importorskip('neverbounce_sdk.aio')
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def make_client(handler, **kwargs):
+    session = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return aio.async_client(api_key='static key', session=session, **kwargs)
+
+
+def test_account_info():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={'status': 'success'})
+
+    async def go():
+        async with make_client(handler) as client:
+            return await client.account_info()
+
+    assert run(go()) == {'status': 'success'}
+    assert len(requests) == 1
+    assert (str(requests[0].url) ==
+            'https://api.neverbounce.com/v4.2/account/info?key=static+key')
+    assert 'NeverBounceAPI-Python' in requests[0].headers['User-Agent']
+
+
+def test_single_check_params():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={'status': 'success',
+                                         'result': 'valid'})
+
+    async def go():
+        async with make_client(handler) as client:
+            return await client.single_check('test@example.com',
+                                             credits_info=True)
+
+    assert run(go())['result'] == 'valid'
+    url = str(requests[0].url)
+    for urlchunk in ('https://api.neverbounce.com/v4.2/single/check',
+                     'email=test%40example.com',
+                     'address_info=0',
+                     'credits_info=1',
+                     'key=static+key'):
+        assert urlchunk in url
+
+
+def test_many_checks_in_flight():
+    def handler(request):
+        return httpx.Response(200, json={'status': 'success',
+                                         'email': request.url.params['email']})
+
+    async def go():
+        async with make_client(handler) as client:
+            emails = ['{}@example.com'.format(i) for i in range(50)]
+            return await asyncio.gather(*[client.single_check(e)
+                                          for e in emails])
+
+    results = run(go())
+    assert [r['email'] for r in results] == ['{}@example.com'.format(i)
+                                             for i in range(50)]
+
+
+def test_error_mapping():
+    def handler(request):
+        return httpx.Response(200, json={'status': 'auth_failure',
+                                         'message': 'bad key'})
+
+    async def go():
+        async with make_client(handler) as client:
+            await client.account_info()
+
+    with pytest.raises(AuthFailure) as exc:
+        run(go())
+    assert 'We were unable to authenticate your request' in str(exc.value)
+
+
+def test_jobs_create_posts_json():
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content.decode('UTF-8')))
+        return httpx.Response(200, json={'status': 'success', 'job_id': 1})
+
+    async def go():
+        async with make_client(handler) as client:
+            return await client.jobs_create(['test@example.com'])
+
+    assert run(go())['job_id'] == 1
+    assert bodies[0]['input'] == ['test@example.com']
+    assert bodies[0]['input_location'] == 'supplied'
+
+
+def test_jobs_create_streams_iterables():
+    bodies = []
+
+    async def handler(request):
+        bodies.append(json.loads((await request.aread()).decode('UTF-8')))
+        return httpx.Response(200, json={'status': 'success', 'job_id': 1})
+
+    async def go():
+        async with make_client(handler) as client:
+            rows = ({'email': '{}@example.com'.format(i)} for i in range(3))
+            return await client.jobs_create(rows)
+
+    assert run(go())['job_id'] == 1
+    assert bodies[0]['input'][2] == {'email': '2@example.com'}
+    assert bodies[0]['input_location'] == 'supplied'
+
+
+def test_results_iteration():
+    pages = {
+        1: [{'data': val} for val in 'abc'],
+        2: [{'data': val} for val in '123'],
+    }
+
+    def handler(request):
+        assert request.url.path == '/v4.2/jobs/results'
+        page = int(request.url.params['page'])
+        return httpx.Response(200, json={
+            'status': 'success',
+            'results': pages[page],
+            'total_pages': 2,
+            'total_results': 6,
+            'query': {'job_id': '7', 'page': str(page),
+                      'items_per_page': '3'}})
+
+    async def go():
+        async with make_client(handler) as client:
+            return [row async for row in client.jobs_results(7,
+                                                             items_per_page=3)]
+
+    assert run(go()) == pages[1] + pages[2]
+
+
+def test_results_parallel():
+    in_flight = []
+    peak = []
+
+    async def handler(request):
+        page = int(request.url.params['page'])
+        in_flight.append(page)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01 * (page % 3))
+        in_flight.remove(page)
+        return httpx.Response(200, json={
+            'status': 'success',
+            'results': [{'page': page}],
+            'total_pages': 9,
+            'total_results': 9,
+            'query': {'job_id': '7', 'page': str(page),
+                      'items_per_page': '1'}})
+
+    async def go():
+        queue = asyncio.Queue()
+        async with make_client(handler) as client:
+            stats = await client.jobs_results_parallel(7, queue, workers=3,
+                                                       ordered=True)
+        pages = []
+        while not queue.empty():
+            pages.append(queue.get_nowait())
+        return stats, pages
+
+    stats, pages = run(go())
+    assert stats['total_pages'] == 9
+    assert [page for page, _ in pages] == list(range(1, 10))
+    assert [rows for _, rows in pages] == [[{'page': n}] for n in range(1, 10)]
+    assert max(peak) <= 3
+
+
+def test_download(tmpdir):
+    def handler(request):
+        return httpx.Response(200, content=b'data\ndata',
+                              headers={'Content-Type':
+                                       'application/octet-stream'})
+
+    target = tmpdir.join('test.csv')
+
+    async def go():
+        async with make_client(handler) as client:
+            with target.open('wb') as fd:
+                await client.jobs_download(123, fd)
+
+    run(go())
+    assert target.read() == 'data\ndata'
+
+
+def test_download_rows():
+    body = ('\ufeffemail,note,has_dns_info\r\n'
+            'a@example.com,"one, ""two""\r\nthree",true\r\n'
+            'b@example.com,,false').encode('utf-8')
+
+    def handler(request):
+        return httpx.Response(200, content=body,
+                              headers={'Content-Type':
+                                       'application/octet-stream'})
+
+    events = []
+
+    async def go():
+        async with make_client(handler, hooks=[events.append]) as client:
+            rows = await client.jobs_download_rows(
+                123, appends=('has_dns_info',), yes_no_representation='bool',
+                chunk_size=5)
+            return [row async for row in rows]
+
+    rows = run(go())
+    assert [(e.endpoint, e.bytes_received, e.error) for e in events] == [
+        ('jobs/download', len(body), None)]
+    assert rows[0].email == 'a@example.com'
+    assert rows[0].note == 'one, "two"\r\nthree'
+    assert rows[0].has_dns_info is True
+    assert tuple(rows[1]) == ('b@example.com', '', False)
+
+
+def test_download_resumable(tmpdir, monkeypatch):
+    body = b''.join(b'row-%d,valid\n' % i for i in range(5000))
+    ranges = []
+
+    async def broken(data):
+        yield data[:1000]
+        raise httpx.ReadError('connection reset')
+
+    def handler(request):
+        start = int(request.headers.get('Range', 'bytes=0-')[6:-1])
+        ranges.append(start)
+        headers = {'Content-Type': 'application/octet-stream'}
+        if start:
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+                start, len(body) - 1, len(body))
+            return httpx.Response(206, content=body[start:], headers=headers)
+        return httpx.Response(200, content=broken(body), headers=headers)
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(aio.asyncio, 'sleep', no_sleep)
+    target = str(tmpdir.join('results.csv'))
+
+    async def go():
+        async with make_client(handler) as client:
+            return await client.jobs_download_resumable(123, target)
+
+    stats = run(go())
+    assert ranges == [0, 1000]
+    assert stats['attempts'] == 2
+    assert tmpdir.join('results.csv').read_binary() == body
+
+
+def test_sync_context_manager_is_rejected():
+    with pytest.raises(TypeError):
+        with aio.async_client():
+            pass
+
+
+def test_single_check_many():
+    def handler(request):
+        email = request.url.params['email']
+        if email.startswith('bad'):
+            return httpx.Response(200, json={'status': 'general_failure',
+                                             'message': 'bad address'})
+        return httpx.Response(200, json={'status': 'success',
+                                         'email': email})
+
+    emails = ['{}@example.com'.format(i) for i in range(40)]
+    emails[3] = 'bad@example.com'
+
+    async def go():
+        async with make_client(handler) as client:
+            return [outcome async for outcome in
+                    client.single_check_many(emails, concurrency=5,
+                                             ordered=True)]
+
+    outcomes = run(go())
+    assert [o.index for o in outcomes] == list(range(40))
+    assert outcomes[3].result is None
+    assert isinstance(outcomes[3].exception, GeneralException)
+    assert outcomes[4].result == {'status': 'success',
+                                  'email': '4@example.com'}
+
+
+def test_rate_limiter_is_consulted():
+    limiter = RateLimiter(rate=1000, burst=1)
+
+    def handler(request):
+        return httpx.Response(200, json={'status': 'success'})
+
+    async def go():
+        async with make_client(handler, rate_limiter=limiter) as client:
+            await asyncio.gather(*[client.account_info() for _ in range(5)])
+
+    run(go())
+    assert limiter.requests == 5
+    assert limiter.delayed_requests == 4
+
+
+def test_retry_policy(monkeypatch):
+    responses = [httpx.Response(502),
+                 httpx.Response(200, json={'status': 'throttle_triggered',
+                                           'message': 'slow down'}),
+                 httpx.Response(200, json={'status': 'success'})]
+
+    def handler(request):
+        return responses.pop(0)
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(aio.asyncio, 'sleep', no_sleep)
+    policy = RetryPolicy(max_attempts=3)
+
+    async def go():
+        async with make_client(handler, retry_policy=policy) as client:
+            return await client.account_info()
+
+    assert run(go()) == {'status': 'success'}
+    assert responses == []
+
+
+def test_identical_checks_are_coalesced():
+    requests = []
+
+    async def handler(request):
+        requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={'status': 'success',
+                                         'result': 'valid'})
+
+    async def go():
+        async with make_client(handler) as client:
+            return await asyncio.gather(
+                *[client.single_check('test@example.com') for _ in range(10)]
+                + [client.single_check('other@example.com')])
+
+    results = run(go())
+    assert len(results) == 11
+    assert all(r['result'] == 'valid' for r in results)
+    assert len(requests) == 2
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = aio.AsyncSingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {'result': 'valid'}
+
+    async def go():
+        leader = asyncio.ensure_future(flight.do('key', call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do('key', call))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(leader, 0.01)
+        return await follower
+
+    assert run(go()) == {'result': 'valid'}
+    assert len(calls) == 1
+
+
+def test_call_is_cancelled_when_nobody_waits():
+    flight = aio.AsyncSingleFlight()
+    finished = []
+
+    async def call():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+
+    async def go():
+        waiter = asyncio.ensure_future(flight.do('key', call))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.1)
+        return len(flight)
+
+    assert run(go()) == 0
+    assert finished == []
+
+
+def test_results_prefetch():
+    requested = []
+
+    async def handler(request):
+        page = int(request.url.params['page'])
+        requested.append(page)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={
+            'status': 'success',
+            'results': [{'page': page}],
+            'total_pages': 5,
+            'total_results': 5,
+            'query': {'job_id': '7', 'page': str(page),
+                      'items_per_page': '1'}})
+
+    async def go():
+        async with make_client(handler) as client:
+            results = client.jobs_results(7, items_per_page=1, prefetch=2)
+            return [row['page'] async for row in results]
+
+    assert run(go()) == [1, 2, 3, 4, 5]
+    assert sorted(requested) == [1, 2, 3, 4, 5]
+
+
+def test_results_resume():
+    def handler(request):
+        page = int(request.url.params['page'])
+        return httpx.Response(200, json={
+            'status': 'success',
+            'results': [{'page': page, 'row': row} for row in range(2)],
+            'total_pages': 3,
+            'total_results': 6,
+            'query': {'job_id': 7, 'page': page, 'items_per_page': 2}})
+
+    async def go():
+        async with make_client(handler) as client:
+            results = client.jobs_results(7, items_per_page=2)
+            for _ in range(3):
+                await results.__anext__()
+            token = results.checkpoint()
+            return [row async for row in
+                    client.jobs_results(7, resume_from=token)]
+
+    assert run(go()) == [{'page': 2, 'row': 1},
+                         {'page': 3, 'row': 0}, {'page': 3, 'row': 1}]
+
+
+def test_wait_for_jobs():
+    percents = {'1': [0, 50, 100], '2': [100], '3': [0]}
+
+    def handler(request):
+        job = percents[request.url.params['job_id']]
+        percent = job.pop(0) if len(job) > 1 else job[0]
+        return httpx.Response(200, json={
+            'status': 'success',
+            'job_status': 'complete' if percent == 100 else 'running',
+            'percent_complete': percent})
+
+    async def go():
+        seen = []
+        async with make_client(handler) as client:
+            status = await client.wait_for_job(1, min_interval=0)
+            assert status['job_status'] == 'complete'
+
+            finished = client.wait_for_jobs(
+                [2, 3], timeout=0.2, min_interval=0.01, max_interval=0.01,
+                progress=lambda job_id, status: seen.append(job_id))
+            assert (await finished.__anext__())['percent_complete'] == 100
+            with pytest.raises(JobTimeout):
+                await finished.__anext__()
+        return seen
+
+    seen = run(go())
+    assert seen.count(2) == 1
+    assert seen.count(3) > 1
+
+
+def test_asgi_callback_app():
+    receiver = CallbackReceiver(headers={'X-Token': 'secret'})
+    app = aio.ASGICallbackApp(receiver)
+    body = json.dumps({'job_id': 5, 'job_status': 'complete'}).encode('utf-8')
+
+    async def post(headers):
+        messages = [{'type': 'http.request', 'body': body[:10],
+                     'more_body': True},
+                    {'type': 'http.request', 'body': body[10:]}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'POST', 'path': '/',
+                 'headers': headers}
+        await app(scope, receive, send)
+        return sent[0]['status']
+
+    async def go():
+        future = asyncio.wrap_future(receiver.future(5))
+        assert await post([(b'x-token', b'wrong')]) == 401
+        assert not future.done()
+        assert await post([(b'X-Token', b'secret')]) == 200
+        return await future
+
+    assert run(go()).job_id == '5'
+
+
+def test_credit_budget():
+    fake = FakeNeverBounce(credits=1000)
+    server = fake.serve(port=0, background=True)
+    rows = [{'email': 'user{}@example.com'.format(i)} for i in range(5)]
+
+    async def go():
+        budget = CreditBudget(limit=2, block=True)
+        async with aio.async_client(api_key='key', api_root=server.url,
+                                    credit_budget=budget) as client:
+            await client.single_check('a@example.com')
+            await client.single_check('b@example.com')
+            # the event loop is never blocked waiting for credits
+            with pytest.raises(CreditBudgetExceeded):
+                await client.single_check('c@example.com')
+            with pytest.raises(CreditBudgetExceeded):
+                await client.jobs_create(rows, auto_parse=True,
+                                         auto_start=True)
+        return budget
+
+    try:
+        budget = run(go())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert budget.spent == 2
+    assert budget.remaining == 998
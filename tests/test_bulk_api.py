@@ -1,12 +1,21 @@
 """Test the API endpoints located at /jobs (except /jobs/download)"""
 from __future__ import unicode_literals
+import io
 import json
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2 COMPAT
+    import Queue as queue
 
 import pytest
 import responses
 
 import neverbounce_sdk
 from neverbounce_sdk import urlforversion
+from neverbounce_sdk import bulk
 from neverbounce_sdk.bulk import _job_status
 
 
@@ -116,6 +125,89 @@ def test_create(client):
         assert called_with[k] == v
 
 
+def sent_body(call):
+    body = call.request.body
+    if not isinstance(body, bytes):
+        body = b''.join(body)
+    return json.loads(body.decode('UTF-8'))
+
+
+@pytest.fixture
+def create_endpoint():
+    with responses.RequestsMock() as mock:
+        mock.add(responses.POST, urlforversion('v4.2', 'jobs', 'create'),
+                 json={'status': 'success', 'job_id': 1})
+        yield mock
+
+
+def test_create_streams_iterables(client, create_endpoint):
+    rows = ({'email': '{}@example.com'.format(i), 'id': i}
+            for i in range(5000))
+    client.jobs_create(rows, filename='big.csv')
+
+    request = create_endpoint.calls[0].request
+    assert request.headers['Transfer-Encoding'] == 'chunked'
+    assert request.headers['Content-Type'] == 'application/json'
+    chunks = list(request.body)
+    assert len(chunks) > 1
+    assert all(len(chunk) < 2 * bulk.UPLOAD_CHUNK_SIZE for chunk in chunks)
+
+    sent = json.loads(b''.join(chunks).decode('UTF-8'))
+    assert sent['input'][4999] == {'email': '4999@example.com', 'id': 4999}
+    assert len(sent['input']) == 5000
+    assert sent['filename'] == 'big.csv'
+    assert sent['input_location'] == 'supplied'
+
+
+def test_create_from_csv_path(client, create_endpoint, tmpdir):
+    with_header = tmpdir.join('with_header.csv')
+    with_header.write('Email,name\r\na@example.com,"A, Person"\r\n\r\n'
+                      'b@example.com,B\r\n')
+    no_header = tmpdir.join('no_header.csv')
+    no_header.write('a@example.com,A\nb@example.com,B\n')
+
+    client.jobs_create(str(with_header))
+    client.jobs_create(str(no_header))
+
+    calls = create_endpoint.calls
+    assert sent_body(calls[0])['input'] == [
+        {'Email': 'a@example.com', 'name': 'A, Person'},
+        {'Email': 'b@example.com', 'name': 'B'}]
+    assert sent_body(calls[1])['input'] == [['a@example.com', 'A'],
+                                            ['b@example.com', 'B']]
+
+
+@pytest.mark.parametrize('binary', [True, False])
+def test_create_from_file_object(client, create_endpoint, binary):
+    text = 'ignored line\nemail\nc@example.com\n'
+    fd = io.BytesIO(text.encode('utf-8')) if binary else io.StringIO(text)
+    fd.readline()
+
+    client.jobs_create(fd)
+    body = create_endpoint.calls[0].request.body
+    # the body can be sent again, e.g. on retry, and leaves the file open
+    assert list(body) == list(body)
+    assert sent_body(create_endpoint.calls[0])['input'] == [
+        {'email': 'c@example.com'}]
+    assert not fd.closed
+
+
+def test_create_streams_long_lists(client, create_endpoint, monkeypatch):
+    monkeypatch.setattr(bulk, '_STREAM_MIN_ROWS', 2)
+    client.jobs_create(['a@example.com', 'b@example.com'])
+    client.jobs_create(['a@example.com', 'b@example.com', 'c@example.com'])
+    assert isinstance(create_endpoint.calls[0].request.body, bytes)
+    assert sent_body(create_endpoint.calls[1])['input'][2] == 'c@example.com'
+
+
+def test_create_generator_is_not_resent(client, create_endpoint):
+    client.jobs_create(iter(['a@example.com']))
+    body = create_endpoint.calls[0].request.body
+    list(body)
+    with pytest.raises(neverbounce_sdk.GeneralException):
+        list(body)
+
+
 @responses.activate
 def test_parse(client):
     responses.add(responses.POST,
@@ -164,3 +256,256 @@ def test_delete(client):
 
     client.jobs_delete(123)
     assert 'job_id=123' in responses.calls[0].request.url
+
+
+class FakePages(object):
+    """Stands in for ``raw_results``, serving ``total_pages`` pages of
+    ``per_page`` rows and recording the pages asked for"""
+
+    def __init__(self, total_pages, per_page=3, delay=0):
+        self.total_pages = total_pages
+        self.per_page = per_page
+        self.delay = delay
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, job_id=0, page=1, items_per_page=None, **kwargs):
+        with self.lock:
+            self.requested.append(page)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        rows = []
+        if page <= self.total_pages:
+            rows = [{'page': page, 'row': row}
+                    for row in range(self.per_page)]
+        return dict(results=rows,
+                    total_pages=self.total_pages,
+                    total_results=self.total_pages * self.per_page,
+                    query=dict(job_id=job_id, page=str(page),
+                               items_per_page=str(self.per_page)))
+
+
+def expected_rows(pages, per_page=3):
+    return [{'page': page, 'row': row}
+            for page in range(1, pages + 1) for row in range(per_page)]
+
+
+def test_results_without_prefetch(client, monkeypatch):
+    pages = FakePages(total_pages=3)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    assert list(client.jobs_results(1)) == expected_rows(3)
+    # the page after the last one is fetched to find the end
+    assert pages.requested == [1, 2, 3, 4]
+
+
+def test_results_with_prefetch(client, monkeypatch):
+    pages = FakePages(total_pages=6, delay=0.05)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    results = client.jobs_results(1, prefetch=3)
+    assert list(results) == expected_rows(6)
+    assert sorted(pages.requested) == [1, 2, 3, 4, 5, 6]
+    assert 1 < pages.max_in_flight <= 3
+    assert results._executor is None
+
+
+def test_prefetch_buffer_is_bounded(client, monkeypatch):
+    pages = FakePages(total_pages=20)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    results = client.jobs_results(1, prefetch=2)
+    for _ in range(3):
+        next(results)       # consume page 1
+    next(results)           # first row of page 2
+    assert len(results._pending) <= 2
+    assert max(pages.requested) <= 4
+    results.close()
+
+
+def test_results_parallel_to_callable(client, monkeypatch):
+    pages = FakePages(total_pages=10, delay=0.01)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    delivered = []
+
+    summary = client.jobs_results_parallel(
+        1, lambda page, results: delivered.append((page, results)),
+        workers=3, items_per_page=3)
+
+    assert summary == dict(job_id=1, total_pages=10, total_results=30)
+    assert sorted(page for page, _ in delivered) == list(range(1, 11))
+    assert (sorted(sum((rows for _, rows in delivered), []),
+                   key=lambda r: (r['page'], r['row'])) ==
+            expected_rows(10))
+    assert sorted(pages.requested) == list(range(1, 11))
+    assert 1 < pages.max_in_flight <= 3
+
+
+def test_results_parallel_ordered_to_queue(client, monkeypatch):
+    pages = FakePages(total_pages=12, delay=0.01)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    sink = queue.Queue()
+
+    client.jobs_results_parallel(1, sink, workers=4, ordered=True)
+
+    delivered = [sink.get_nowait() for _ in range(sink.qsize())]
+    assert [page for page, _ in delivered] == list(range(1, 13))
+    assert sum((rows for _, rows in delivered), []) == expected_rows(12)
+
+
+def test_results_parallel_to_file(client, monkeypatch, tmpdir):
+    pages = FakePages(total_pages=4)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    target = tmpdir.join('results.jsonl')
+
+    with target.open('wb') as fd:
+        client.jobs_results_parallel(1, fd, workers=2, ordered=True)
+
+    lines = target.read().splitlines()
+    assert [json.loads(line) for line in lines] == expected_rows(4)
+
+
+def test_results_parallel_to_binary_stream(client, monkeypatch):
+    monkeypatch.setattr(client, 'raw_results', FakePages(total_pages=2))
+    sink = io.BytesIO()
+    client.jobs_results_parallel(1, sink, ordered=True)
+    lines = sink.getvalue().decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == expected_rows(2)
+
+
+def test_results_parallel_bad_sink(client, monkeypatch):
+    monkeypatch.setattr(client, 'raw_results', FakePages(total_pages=1))
+    with pytest.raises(TypeError):
+        client.jobs_results_parallel(1, object())
+
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_results_checkpoint_and_resume(client, monkeypatch, prefetch):
+    pages = FakePages(total_pages=5)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    expected = expected_rows(5)
+
+    results = client.jobs_results(1, items_per_page=3, prefetch=prefetch)
+    consumed = [next(results) for _ in range(7)]
+    token = results.checkpoint()
+    results.close()
+    assert consumed == expected[:7]
+
+    del pages.requested[:]
+    resumed = client.jobs_results(1, resume_from=token, prefetch=prefetch)
+    assert list(resumed) == expected[7:]
+    # only the page holding the checkpoint and those after it are fetched
+    assert min(pages.requested) == 3
+
+
+def test_checkpoint_at_page_boundary(client, monkeypatch):
+    pages = FakePages(total_pages=3)
+    monkeypatch.setattr(client, 'raw_results', pages)
+    results = client.jobs_results(1)
+    for _ in range(6):
+        next(results)
+    token = results.checkpoint()
+    assert list(client.jobs_results(1, resume_from=token)) == \
+        expected_rows(3)[6:]
+
+
+def test_resume_validation(client, monkeypatch):
+    monkeypatch.setattr(client, 'raw_results', FakePages(total_pages=2))
+    token = client.jobs_results(1).checkpoint()
+    with pytest.raises(ValueError):
+        client.jobs_results(2, resume_from=token)
+    with pytest.raises(ValueError):
+        client.jobs_results(1, resume_from='not a checkpoint')
+
+
+class FakeStatus(object):
+    """Reports each job's percent_complete from a list, one per check"""
+
+    def __init__(self, **jobs):
+        self.jobs = dict((int(job_id[3:]), list(percents))
+                         for job_id, percents in jobs.items())
+        self.checks = []
+
+    def __call__(self, job_id):
+        self.checks.append(job_id)
+        percents = self.jobs[job_id]
+        percent = percents.pop(0) if len(percents) > 1 else percents[0]
+        if percent is None:
+            return {'job_status': 'queued', 'percent_complete': 0}
+        return {'job_status': 'complete' if percent == 100 else 'running',
+                'percent_complete': percent}
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(bulk, '_clock', lambda: now[0])
+    monkeypatch.setattr(bulk.time, 'sleep', sleep)
+    return sleeps
+
+
+def test_job_poller_intervals():
+    poller = bulk._JobPoller(min_interval=1, max_interval=60)
+    # backs off while queued
+    assert poller.update({'job_status': 'queued'}, 0) == 2
+    assert poller.update({'job_status': 'queued'}, 2) == 4
+    assert poller.update({'job_status': 'running',
+                          'percent_complete': 0}, 6) == 8
+    # 10% in 10s leaves 90s for the remaining 90%; check halfway there
+    assert poller.update({'job_status': 'running',
+                          'percent_complete': 10}, 16) == 45
+    assert poller.update({'job_status': 'running',
+                          'percent_complete': 20}, 26) == 40
+    assert poller.eta == 80
+    assert poller.update({'job_status': 'running',
+                          'percent_complete': 99}, 66) == 1
+    assert poller.update({'job_status': 'complete'}, 67) is None
+    # never longer than max_interval
+    slow = bulk._JobPoller(min_interval=1, max_interval=60)
+    slow.update({'job_status': 'running', 'percent_complete': 1}, 0)
+    assert slow.update({'job_status': 'running',
+                        'percent_complete': 2}, 100) == 60
+
+
+def test_wait_for_job(client, monkeypatch, fake_clock):
+    status = FakeStatus(job1=[None, None, 10, 20, 60, 100])
+    monkeypatch.setattr(client, 'jobs_status', status)
+    seen = []
+    final = client.wait_for_job(1, progress=lambda *args: seen.append(args))
+    assert final['job_status'] == 'complete'
+    assert len(status.checks) == len(seen) == 6
+    assert seen[0] == (1, {'job_status': 'queued', 'percent_complete': 0})
+    assert fake_clock[:2] == [2, 4]
+
+
+def test_wait_for_job_timeout(client, monkeypatch, fake_clock):
+    monkeypatch.setattr(client, 'jobs_status', FakeStatus(job1=[None]))
+    with pytest.raises(neverbounce_sdk.JobTimeout):
+        client.wait_for_job(1, timeout=30)
+    assert sum(fake_clock) == 30
+
+
+def test_wait_for_jobs(client, monkeypatch, fake_clock):
+    status = FakeStatus(job1=[None, 50, 70, 90, 100], job2=[100],
+                        job3=[10, 100])
+    monkeypatch.setattr(client, 'jobs_status', status)
+    finished = client.wait_for_jobs([1, 2, 3, 2], workers=2)
+    assert [s['percent_complete'] for s in finished] == [100, 100, 100]
+    assert sorted(set(status.checks)) == [1, 2, 3]
+    assert status.checks.count(2) == 1
+
+    status = FakeStatus(job1=[None], job2=[100])
+    monkeypatch.setattr(client, 'jobs_status', status)
+    finished = client.wait_for_jobs([1, 2], timeout=10)
+    assert next(finished)['job_status'] == 'complete'
+    with pytest.raises(neverbounce_sdk.JobTimeout) as info:
+        next(finished)
+    assert 'job(s) 1 ' in str(info.value)
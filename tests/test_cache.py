@@ -0,0 +1,129 @@
+"""
+Tests caching of single check results
+"""
+import pytest
+import responses
+
+import neverbounce_sdk
+from neverbounce_sdk import MemoryCache, SQLiteCache, urlfor
+from neverbounce_sdk import cache as cache_module
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 1000000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(cache_module.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def cache(request, tmpdir):
+    if request.param == 'memory':
+        return MemoryCache(maxsize=2)
+    return SQLiteCache(str(tmpdir.join('cache.db')), maxsize=2)
+
+
+def result(kind):
+    return {'status': 'success', 'result': kind, 'flags': [],
+            'credits_info': {'paid_credits_remaining': 10}}
+
+
+def test_key_normalizes_email():
+    assert (MemoryCache.key(' Test@Example.COM ') ==
+            MemoryCache.key('test@example.com'))
+    assert (MemoryCache.key('test@example.com', address_info=True) !=
+            MemoryCache.key('test@example.com'))
+    assert (MemoryCache.key('test@example.com', historical_data=False) !=
+            MemoryCache.key('test@example.com'))
+
+
+def test_results_expire_by_class(cache, clock):
+    cache.set('valid', result('valid'))
+    cache.set('unknown', result('unknown'))
+    assert cache.get('valid')['result'] == 'valid'
+    assert cache.get('unknown')['result'] == 'unknown'
+
+    clock.now += 2 * 60 * 60
+    assert cache.get('unknown') is None
+    assert cache.get('valid')['result'] == 'valid'
+
+    clock.now += 31 * 24 * 60 * 60
+    assert cache.get('valid') is None
+    assert cache.hits == 3
+    assert cache.misses == 2
+
+
+def test_credits_info_is_not_cached(cache, clock):
+    cache.set('key', result('valid'))
+    assert 'credits_info' not in cache.get('key')
+
+
+def test_uncacheable_results(cache, clock):
+    cache.set('key', {'status': 'success', 'result': 'something new'})
+    assert cache.get('key') is None
+
+
+def test_lru_eviction(cache, clock):
+    cache.set('a', result('valid'))
+    clock.now += 1
+    cache.set('b', result('valid'))
+    clock.now += 1
+    assert cache.get('a') is not None    # a is now more recent than b
+    clock.now += 1
+    cache.set('c', result('valid'))
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get('c') is not None
+
+
+def test_cached_results_are_copies():
+    cache = MemoryCache()
+    cache.set('key', result('valid'))
+    cache.get('key')['flags'].append('mutated')
+    assert cache.get('key')['flags'] == []
+
+
+def test_stored_results_are_copies():
+    cache = MemoryCache()
+    stored = result('valid')
+    stored['address_info'] = {'host': 'example.com'}
+    cache.set('key', stored)
+    stored['address_info']['host'] = 'changed'
+    stored['flags'].append('mutated')
+    assert cache.get('key')['address_info'] == {'host': 'example.com'}
+    assert cache.get('key')['flags'] == []
+
+
+def test_sqlite_cache_survives_restarts(tmpdir, clock):
+    path = str(tmpdir.join('cache.db'))
+    cache = SQLiteCache(path)
+    cache.set('key', result('valid'))
+    cache.close()
+    assert SQLiteCache(path).get('key')['result'] == 'valid'
+
+
+@responses.activate
+def test_single_check_uses_cache():
+    responses.add(responses.GET, urlfor('single', 'check'),
+                  json=result('valid'))
+    client = neverbounce_sdk.client(api_key='key', cache=MemoryCache())
+
+    first = client.single_check('test@example.com', credits_info=True)
+    assert first['credits_info'] == {'paid_credits_remaining': 10}
+    second = client.single_check('TEST@example.com')
+    assert second['result'] == 'valid'
+    assert 'credits_info' not in second
+    assert len(responses.calls) == 1
+
+    # different flags are cached separately
+    client.single_check('test@example.com', address_info=True)
+    assert len(responses.calls) == 2
@@ -0,0 +1,101 @@
+"""Tests the receiver of bulk job callbacks"""
+import io
+import json
+
+import requests
+
+from neverbounce_sdk.callbacks import CallbackReceiver, JobEvent
+
+
+def call_wsgi(app, body, method='POST', path='/', **headers):
+    if not isinstance(body, bytes):
+        body = json.dumps(body).encode('utf-8')
+    environ = {'REQUEST_METHOD': method,
+               'PATH_INFO': path,
+               'CONTENT_LENGTH': str(len(body)),
+               'wsgi.input': io.BytesIO(body)}
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper()] = value
+    statuses = []
+    payload = b''.join(app(environ,
+                           lambda status, headers: statuses.append(status)))
+    assert json.loads(payload.decode('utf-8'))['status']
+    return int(statuses[0].split()[0])
+
+
+def test_events_are_dispatched():
+    receiver = CallbackReceiver()
+    every, mine = [], []
+    receiver.on(every.append)
+    receiver.on(mine.append, job_id=7)
+
+    assert call_wsgi(receiver, {'job_id': 7, 'event': 'job.progress',
+                                'job_status': 'running'}) == 200
+    assert call_wsgi(receiver, {'job_id': 8, 'job_status': 'running'}) == 200
+    assert [e.job_id for e in every] == ['7', '8']
+    assert mine == [JobEvent('7', 'job.progress',
+                             {'job_id': 7, 'event': 'job.progress',
+                              'job_status': 'running'})]
+    assert every[1].event == 'running'
+    assert not every[0].finished
+
+    receiver.remove(every.append)
+    call_wsgi(receiver, {'job_id': 8, 'job_status': 'running'})
+    assert len(every) == 2
+
+
+def test_futures_resolve_when_jobs_finish():
+    receiver = CallbackReceiver()
+    future = receiver.future(7)
+    call_wsgi(receiver, {'job_id': 7, 'job_status': 'running'})
+    assert not future.done()
+    call_wsgi(receiver, {'job_id': 7, 'event': 'job.completed'})
+    assert future.result(0).event == 'job.completed'
+    assert receiver.future('7') is future
+
+    # a future asked for after the job finished is resolved at once
+    call_wsgi(receiver, {'id': 9, 'job_status': 'failed'})
+    assert receiver.future(9).result(0).data['job_status'] == 'failed'
+
+
+def test_requests_are_validated():
+    receiver = CallbackReceiver(headers={'X-Token': 'secret'},
+                                path='/hooks/nb')
+    event = {'job_id': 1, 'job_status': 'complete'}
+    assert call_wsgi(receiver, event, path='/hooks/nb') == 401
+    assert call_wsgi(receiver, event, path='/hooks/nb', X_TOKEN='nope') == 401
+    assert call_wsgi(receiver, event, path='/other', X_TOKEN='secret') == 404
+    assert call_wsgi(receiver, event, method='GET', path='/hooks/nb',
+                     X_TOKEN='secret') == 405
+    assert call_wsgi(receiver, b'not json', path='/hooks/nb',
+                     X_TOKEN='secret') == 400
+    assert call_wsgi(receiver, {'no': 'job'}, path='/hooks/nb',
+                     X_TOKEN='secret') == 400
+    assert not receiver.future(1).done()
+    assert call_wsgi(receiver, event, path='/hooks/nb',
+                     X_TOKEN='secret') == 200
+    assert receiver.future(1).done()
+
+
+def test_failing_handler():
+    receiver = CallbackReceiver()
+
+    @receiver.on
+    def broken(event):
+        raise RuntimeError
+
+    assert call_wsgi(receiver, {'job_id': 1}) == 500
+
+
+def test_serve():
+    receiver = CallbackReceiver(headers={'X-Token': 'secret'})
+    server = receiver.serve(port=0, background=True)
+    try:
+        url = 'http://127.0.0.1:{}/'.format(server.server_port)
+        resp = requests.post(url, json={'job_id': 3, 'job_status': 'complete'},
+                             headers={'X-Token': 'secret'})
+        assert resp.status_code == 200
+        assert receiver.future(3).result(5).job_id == '3'
+    finally:
+        server.shutdown()
+        server.server_close()
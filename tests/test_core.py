@@ -1,10 +1,13 @@
 """
 Tests the core functionality of the NeverBounce API SDK
 """
+import responses
 from requests import Session
 
 import neverbounce_sdk
-from neverbounce_sdk import NeverBounceAPIClient, StaticTokenAuth
+from neverbounce_sdk import NeverBounceAPIClient, StaticTokenAuth, urlfor
+from neverbounce_sdk import core, utils
+from neverbounce_sdk.utils import json_loads
 
 
 def test_client_function():
@@ -134,3 +137,68 @@ def test_setting_api_version_by_name():
     """You may set API version NeverBounceAPIClient.api_version property"""
     client = neverbounce_sdk.client(api_version="some_other_version")
     assert client.api_version == "some_other_version"
+
+
+def test_pooled_session_is_created_lazily_and_reused():
+    """Outside a context, the client sends requests through a single pooled
+    session that it creates on first use"""
+    client = neverbounce_sdk.client(api_key='secret', pool_size=4,
+                                    max_retries=2)
+    assert client._pool is None
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, urlfor('account', 'info'),
+                 json={'status': 'success'})
+        client.account_info()
+        pool = client._pool
+        assert isinstance(pool, Session)
+        client.account_info()
+        assert client._pool is pool
+        assert client.session is None
+
+    adapter = pool.get_adapter('https://api.neverbounce.com')
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+
+
+def test_closing_pooled_session():
+    """close() releases the pooled session; a new one is made when needed"""
+    client = neverbounce_sdk.client()
+    pool = client._get_pool()
+    client.close()
+    assert client._pool is None
+    assert client._get_pool() is not pool
+
+
+def test_custom_session_bypasses_pool():
+    """A session given by the caller is used instead of the pooled one"""
+    custom_session = Session()
+    client = neverbounce_sdk.client(api_key='secret', session=custom_session)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, urlfor('account', 'info'),
+                 json={'status': 'success'})
+        client.account_info()
+    assert client._pool is None
+
+
+def test_response_body_is_decoded_once(monkeypatch):
+    """_check_response returns the decoded body, which _request passes on
+    without decoding the response again"""
+    calls = []
+
+    def loads(content):
+        calls.append(content)
+        return json_loads(content)
+
+    monkeypatch.setattr(core, 'json_loads', loads)
+    client = neverbounce_sdk.client(api_key='secret')
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, urlfor('account', 'info'),
+                 json={'status': 'success', 'credits': 5})
+        assert client.account_info() == {'status': 'success', 'credits': 5}
+    assert len(calls) == 1
+
+
+def test_stdlib_json_loads_accepts_bytes():
+    assert utils._stdlib_loads(b'{"status": "success"}') == \
+        {'status': 'success'}
@@ -0,0 +1,158 @@
+"""Tests the credit budget of API calls"""
+import threading
+import time
+
+import pytest
+
+import neverbounce_sdk
+from neverbounce_sdk import CreditBudget, CreditBudgetExceeded
+from neverbounce_sdk.fakeserver import FakeNeverBounce
+
+
+@pytest.fixture
+def fake():
+    fake = FakeNeverBounce(api_key='key', credits=1000)
+    server = fake.serve(port=0, background=True)
+    fake.url = server.url
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def rows(count):
+    return [{'email': 'user{}@example.com'.format(i)} for i in range(count)]
+
+
+def test_limits():
+    budget = CreditBudget(limit=10)
+    assert budget.available == 10
+    first = budget.reserve(6)
+    assert budget.available == 4
+    with pytest.raises(CreditBudgetExceeded):
+        budget.reserve(5)
+    first.commit()
+    budget.reserve(3).release()
+    assert (budget.spent, budget.pending, budget.available) == (6, 0, 4)
+
+    # the account's credits, less the floor, may be lower than the limit
+    budget = CreditBudget(limit=100, floor=20)
+    assert budget.available == 100
+    assert budget.update({'billing_type': 'default', 'credits': 50,
+                          'free_credits': 5})
+    assert budget.available == 35
+    assert budget.update({'credits_info': {'paid_credits_remaining': 25,
+                                           'free_credits_remaining': 0}})
+    assert budget.available == 5
+    assert not budget.update({'status': 'success', 'result': 'valid'})
+    budget.reserve(5).commit()
+    assert budget.remaining == 20
+
+
+def test_refresh_due():
+    budget = CreditBudget(refresh_interval=60)
+    assert budget.refresh_due()
+    assert not budget.refresh_due()
+    budget = CreditBudget(refresh_interval=0)
+    assert budget.refresh_due()
+    assert budget.refresh_due()
+
+
+def test_blocking():
+    budget = CreditBudget(limit=10, block=True, timeout=5)
+    held = budget.reserve(8)
+    threading.Timer(0.05, held.release).start()
+    budget.reserve(5).commit()
+    assert budget.spent == 5
+
+    # a reservation that can never fit is refused at once
+    started = time.time()
+    with pytest.raises(CreditBudgetExceeded):
+        budget.reserve(6)
+    assert time.time() - started < 1
+
+    budget = CreditBudget(limit=10, block=True, timeout=0.05)
+    budget.reserve(10)
+    with pytest.raises(CreditBudgetExceeded):
+        budget.reserve(1)
+
+
+def test_blocked_calls_short_of_account_credits(fake):
+    fake.credits = 1
+    budget = CreditBudget(block=True)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    credit_budget=budget)
+    client.single_check('a@example.com')
+    # nothing may be released, so the call refreshes and gives up at once
+    started = time.time()
+    with pytest.raises(CreditBudgetExceeded):
+        client.single_check('b@example.com')
+    assert time.time() - started < 1
+    assert fake.stats['account/info'] == 2
+
+    # but goes through if the account was topped up in the meantime
+    fake.credits = 10
+    client.single_check('b@example.com')
+    assert fake.stats['single/check'] == 2
+    assert budget.remaining == 9
+
+
+def test_single_checks(fake):
+    budget = CreditBudget(limit=3)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    credit_budget=budget)
+    client.single_check('a@example.com')
+    # the first charged call refreshed the budget from account_info
+    assert fake.stats['account/info'] == 1
+    assert budget.remaining == 999
+    client.single_check('b@example.com', credits_info=True)
+    assert budget.remaining == 998
+    assert budget.spent == 2
+
+    client.single_check('c@example.com')
+    with pytest.raises(CreditBudgetExceeded):
+        client.single_check('d@example.com')
+    assert fake.stats['single/check'] == 3
+    assert fake.credits == 997
+
+    results = list(client.single_check_many(['e@example.com'] * 2))
+    assert all(isinstance(r.exception, CreditBudgetExceeded)
+               for r in results)
+
+
+def test_failed_calls_release_credits(fake):
+    budget = CreditBudget(limit=10)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    credit_budget=budget)
+    fake.error_rate = 1
+    with pytest.raises(Exception):
+        client.single_check('a@example.com')
+    assert (budget.spent, budget.pending) == (0, 0)
+
+
+def test_jobs(fake):
+    budget = CreditBudget(floor=500)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    credit_budget=budget)
+    # jobs that don't start at once spend nothing yet
+    client.jobs_create(rows(800))
+    assert budget.pending == budget.spent == 0
+
+    client.jobs_create(rows(300), auto_parse=True, auto_start=True)
+    assert budget.spent == 300
+    assert budget.remaining == 700
+
+    with pytest.raises(CreditBudgetExceeded):
+        client.jobs_create(rows(300), auto_parse=True, auto_start=True)
+
+    # streamed rows are reserved as they are sent, and the upload abandoned
+    # once they overrun the budget
+    jobs = fake.stats['jobs/create']
+    with pytest.raises(CreditBudgetExceeded):
+        client.jobs_create(iter(rows(100000)), auto_parse=True,
+                           auto_start=True)
+    assert fake.stats['jobs/create'] == jobs
+    assert budget.pending == 0
+    assert fake.credits == 700
+
+    client.jobs_create(iter(rows(150)), auto_parse=True, auto_start=True)
+    assert (budget.spent, budget.remaining) == (450, 550)
@@ -1,12 +1,19 @@
 """Test the API endpoints located at /jobs"""
 from __future__ import unicode_literals
+import gzip
+import hashlib
+import io
 import json
+import os
 
 import pytest
+import requests
 import responses
+import urllib3
 
 import neverbounce_sdk
 from neverbounce_sdk import urlforversion, GeneralException
+from neverbounce_sdk import bulk
 
 
 @pytest.fixture
@@ -67,3 +74,335 @@ def test_malformed_download_options(client, tempfile):
         client.jobs_download(123, tempfile, yes_no_representation='frowns')
     with pytest.raises(ValueError):
         client.jobs_download(123, tempfile, line_feed_type='emojis')
+
+
+BIG_BODY = b''.join(b'row-%d,valid\n' % i for i in range(50000))
+
+
+@responses.activate
+def test_download_fast_path_to_binary_file(client, tmpdir):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=BIG_BODY,
+                  status=200,
+                  content_type='application/octet-stream')
+
+    target = tmpdir.join('big.csv')
+    with target.open('wb') as fd:
+        stats = client.jobs_download(123, fd, chunk_size=4096)
+
+    assert target.read_binary() == BIG_BODY
+    assert stats['bytes'] == len(BIG_BODY)
+    assert stats['seconds'] >= 0
+    assert 'bytes_per_second' in stats
+
+
+@responses.activate
+def test_download_fast_path_reads_into_buffer(client, monkeypatch):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=BIG_BODY,
+                  status=200,
+                  content_type='application/octet-stream')
+
+    def read(*args, **kwargs):
+        raise AssertionError('the body should not be read by urllib3')
+
+    monkeypatch.setattr(urllib3.HTTPResponse, 'read', read)
+    fd = io.BytesIO()
+    client.jobs_download(123, fd, chunk_size=4096)
+    assert fd.getvalue() == BIG_BODY
+
+
+@responses.activate
+def test_download_fast_path_truncated_body(client):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=BIG_BODY[:500],
+                  status=200,
+                  headers={'Content-Length': '1000'},
+                  content_type='application/octet-stream')
+
+    with pytest.raises(urllib3.exceptions.ProtocolError):
+        client.jobs_download(123, io.BytesIO(), chunk_size=64)
+
+
+@responses.activate
+def test_download_fast_path_decodes_content(client):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=gzip.compress(BIG_BODY),
+                  status=200,
+                  headers={'Content-Encoding': 'gzip'},
+                  content_type='application/octet-stream')
+
+    fd = io.BytesIO()
+    stats = client.jobs_download(123, fd)
+    assert fd.getvalue() == BIG_BODY
+    assert stats['bytes'] == len(BIG_BODY)
+
+
+@responses.activate
+def test_download_chunk_size_for_file_like_objects(client):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=BIG_BODY,
+                  status=200,
+                  content_type='application/octet-stream')
+
+    class Sink(object):
+        def __init__(self):
+            self.chunks = []
+
+        def write(self, chunk):
+            self.chunks.append(chunk)
+
+    sink = Sink()
+    stats = client.jobs_download(123, sink, chunk_size=65536)
+    assert b''.join(sink.chunks) == BIG_BODY
+    assert max(len(chunk) for chunk in sink.chunks) <= 65536
+    assert len(sink.chunks) < len(BIG_BODY) // 128
+    assert stats['bytes'] == len(BIG_BODY)
+
+
+class FlakyStream(io.RawIOBase):
+    """Serves ``data`` but fails like a dropped connection after ``fail_at``
+    bytes"""
+
+    def __init__(self, data, fail_at=None):
+        self.data = data
+        self.pos = 0
+        self.fail_at = fail_at
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if self.fail_at is not None and self.pos >= self.fail_at:
+            raise OSError('connection reset')
+        end = len(self.data)
+        if self.fail_at is not None:
+            end = min(end, self.fail_at)
+        count = min(len(buf), end - self.pos)
+        buf[:count] = self.data[self.pos:self.pos + count]
+        self.pos += count
+        return count
+
+
+class RangeServer(object):
+    """A ``responses`` callback serving ``BIG_BODY`` for jobs/download,
+    honoring Range headers if ``ranges`` is set; the first response is cut
+    off after ``fail_at`` bytes"""
+
+    def __init__(self, ranges=True, fail_at=None):
+        self.ranges = ranges
+        self.fail_at = fail_at
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        headers = {'Content-Type': 'application/octet-stream'}
+        start = 0
+        range_header = request.headers.get('Range')
+        if self.ranges and range_header:
+            start = int(range_header[len('bytes='):-1])
+            headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+                start, len(BIG_BODY) - 1, len(BIG_BODY))
+        body = BIG_BODY[start:]
+        headers['Content-Length'] = str(len(body))
+        fail_at, self.fail_at = self.fail_at, None
+        stream = io.BufferedReader(FlakyStream(body, fail_at))
+        return (206 if start else 200, headers, stream)
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bulk.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def add_range_server(server):
+    responses.add_callback(responses.POST,
+                           urlforversion('v4.2', 'jobs', 'download'),
+                           callback=server)
+
+
+@responses.activate
+def test_resumable_download_in_one_go(client, tmpdir, no_sleep):
+    server = RangeServer()
+    add_range_server(server)
+    target = str(tmpdir.join('results.csv'))
+
+    stats = client.jobs_download_resumable(
+        123, target, expected_sha256=hashlib.sha256(BIG_BODY).hexdigest())
+
+    with open(target, 'rb') as fd:
+        assert fd.read() == BIG_BODY
+    assert stats['bytes'] == len(BIG_BODY)
+    assert stats['resumed_from'] == 0
+    assert stats['attempts'] == 1
+    assert stats['sha256'] == hashlib.sha256(BIG_BODY).hexdigest()
+    assert not os.path.exists(target + '.progress')
+    assert 'Range' not in server.requests[0].headers
+
+
+@pytest.mark.parametrize('ranges', [True, False])
+@responses.activate
+def test_resumable_download_recovers_from_drop(client, tmpdir, no_sleep,
+                                               ranges):
+    server = RangeServer(ranges=ranges, fail_at=100000)
+    add_range_server(server)
+    target = str(tmpdir.join('results.csv'))
+
+    stats = client.jobs_download_resumable(123, target, chunk_size=8192)
+
+    with open(target, 'rb') as fd:
+        assert fd.read() == BIG_BODY
+    assert stats['attempts'] == 2
+    assert len(no_sleep) == 1
+    resumed_at = int(server.requests[1].headers['Range'][6:-1])
+    assert 0 < resumed_at <= 100000
+
+
+@responses.activate
+def test_resumable_download_after_restart(client, tmpdir, no_sleep):
+    server = RangeServer()
+    add_range_server(server)
+    target = str(tmpdir.join('results.csv'))
+    write_partial(client, target, BIG_BODY[:12345])
+
+    stats = client.jobs_download_resumable(123, target)
+
+    assert stats['resumed_from'] == 12345
+    assert server.requests[0].headers['Range'] == 'bytes=12345-'
+    with open(target, 'rb') as fd:
+        assert fd.read() == BIG_BODY
+
+
+@responses.activate
+def test_resumable_download_restarts_with_other_options(client, tmpdir,
+                                                        no_sleep):
+    server = RangeServer()
+    add_range_server(server)
+    target = str(tmpdir.join('results.csv'))
+    with open(target, 'wb') as fd:
+        fd.write(b'something else entirely')
+
+    client.jobs_download_resumable(123, target)
+
+    assert 'Range' not in server.requests[0].headers
+    with open(target, 'rb') as fd:
+        assert fd.read() == BIG_BODY
+
+
+@responses.activate
+def test_resumable_download_checksum_mismatch(client, tmpdir, no_sleep):
+    server = RangeServer()
+    add_range_server(server)
+    target = str(tmpdir.join('results.csv'))
+    with pytest.raises(GeneralException):
+        client.jobs_download_resumable(123, target, expected_sha256='00')
+    # the corrupt download is discarded, so the next call starts over
+    assert not os.path.exists(target)
+    assert not os.path.exists(target + '.progress')
+
+    client.jobs_download_resumable(123, target)
+    assert 'Range' not in server.requests[1].headers
+
+
+def write_partial(client, target, body):
+    with open(target, 'wb') as fd:
+        fd.write(body)
+    with open(target + '.progress', 'w') as fd:
+        json.dump(dict(job_id=123,
+                       request=client._download_params(
+                           123, ('valids', 'invalids', 'catchalls',
+                                 'unknowns'), (), 'int', 'unix')), fd)
+
+
+@pytest.mark.parametrize('size', [len(BIG_BODY), len(BIG_BODY) + 10])
+@responses.activate
+def test_resumable_download_range_not_satisfiable(client, tmpdir, no_sleep,
+                                                  size):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  status=416,
+                  headers={'Content-Range':
+                           'bytes */{}'.format(len(BIG_BODY))},
+                  content_type='application/octet-stream')
+    target = str(tmpdir.join('results.csv'))
+    write_partial(client, target, (BIG_BODY + b'x' * 10)[:size])
+
+    if size == len(BIG_BODY):
+        # the earlier call had finished writing the file
+        stats = client.jobs_download_resumable(123, target)
+        assert stats['bytes'] == len(BIG_BODY)
+    else:
+        with pytest.raises(GeneralException):
+            client.jobs_download_resumable(123, target)
+        assert not os.path.exists(target)
+    assert not os.path.exists(target + '.progress')
+
+
+ROWS_CSV = ('email,name,role_account,email_status_int\r\n'
+            'support@example.com,"Support, Team",yes,0\r\n'
+            'jane@example.com,"Jane\nDoe",no,1\r\n'
+            '\r\n'
+            'short@example.com\r\n')
+
+
+@responses.activate
+def test_download_rows(client):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=ROWS_CSV.encode('utf-8'),
+                  content_type='application/octet-stream')
+
+    rows = list(client.jobs_download_rows(
+        123, appends=('role_account', 'email_status_int'),
+        yes_no_representation='lowercase', chunk_size=16))
+
+    assert [row.email for row in rows] == ['support@example.com',
+                                           'jane@example.com',
+                                           'short@example.com']
+    assert rows[0].name == 'Support, Team'
+    assert rows[0].role_account is True
+    assert rows[0].email_status_int == 0
+    assert rows[1].name == 'Jane\nDoe'
+    assert rows[1].role_account is False
+    assert rows[2] == ('short@example.com', '', '', '')
+
+    called_with = json.loads(responses.calls[0].request.body.decode('UTF-8'))
+    assert called_with['binary_operators_type'] == 'BIN_yes_no'
+    assert called_with['role_account'] == 1
+
+
+@responses.activate
+def test_download_rows_with_fieldnames(client):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  body=b'a@example.com,Y\n\rb@example.com,N\n\r',
+                  content_type='application/octet-stream')
+
+    rows = client.jobs_download_rows(
+        123, appends=('has_dns_info',), yes_no_representation='upper',
+        line_feed_type='spooled', fieldnames=['email', 'has_dns_info'])
+    assert [tuple(row) for row in rows] == [('a@example.com', True),
+                                            ('b@example.com', False)]
+
+
+@responses.activate
+def test_download_rows_upstream_error(client, monkeypatch):
+    responses.add(responses.POST,
+                  urlforversion('v4.2', 'jobs', 'download'),
+                  json={'status': 'general_failure',
+                        'message': 'Something went wrong'})
+    closed = []
+    close = requests.Response.close
+    monkeypatch.setattr(requests.Response, 'close',
+                        lambda resp: closed.append(close(resp)))
+    with pytest.raises(GeneralException):
+        client.jobs_download_rows(123)
+    # the connection is released to the pool
+    assert len(closed) == 1
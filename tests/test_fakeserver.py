@@ -0,0 +1,137 @@
+"""Tests the local fake of the NeverBounce API"""
+import random
+
+import pytest
+import requests
+
+import neverbounce_sdk
+from neverbounce_sdk import AuthFailure, GeneralException, ThrottleTriggered
+from neverbounce_sdk.fakeserver import FakeNeverBounce, Latency
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def serve(**kwargs):
+        fake = FakeNeverBounce(**kwargs)
+        server = fake.serve(port=0, background=True)
+        servers.append(server)
+        client = neverbounce_sdk.client(api_key='key', api_root=server.url)
+        return fake, client
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def server_url(client, *parts):
+    return client._url(*parts) + '?key=key'
+
+
+def test_latency_specs():
+    assert Latency('0.25')() == 0.25
+    assert Latency(0)() == 0
+    samples = [Latency('uniform:0.1,0.2', seed=1)() for _ in range(10)]
+    assert all(0.1 <= sample <= 0.2 for sample in samples)
+    assert Latency('exponential:0.1', seed=1)() >= 0
+    assert Latency('normal:0,1', seed=random.random())() >= 0
+    for spec in ('fast', 'uniform:1', 'gamma:1,2'):
+        with pytest.raises(ValueError):
+            Latency(spec)
+
+
+def test_single_check(serve):
+    fake, client = serve()
+    assert client.single_check('catchall.x@example.com')['result'] == \
+        'catchall'
+    first = client.single_check('someone@example.com', address_info=True)
+    assert first['result'] == fake.result_for('someone@example.com')
+    assert first['address_info']['host'] == 'example.com'
+    assert client.single_check('someone@example.com')['result'] == \
+        first['result']
+    assert fake.stats['single/check'] == 3
+    assert client.account_info()['credits'] == 1000000 - 3
+
+
+def test_auth_throttle_and_errors(serve):
+    _, client = serve(api_key='other key')
+    with pytest.raises(AuthFailure):
+        client.account_info()
+
+    fake, client = serve(throttle=2)
+    client.account_info()
+    client.account_info()
+    with pytest.raises(ThrottleTriggered):
+        client.account_info()
+    assert fake.stats['throttled'] == 1
+
+    _, client = serve(error_rate=1)
+    with pytest.raises(requests.HTTPError):
+        client.account_info()
+
+
+def test_job_lifecycle(serve):
+    fake, client = serve(job_rate=1000)
+    rows = [{'email': 'user{}@example.com'.format(i), 'id': str(i)}
+            for i in range(500)]
+    job_id = client.jobs_create(rows, filename='list.csv')['job_id']
+    assert client.jobs_status(job_id)['job_status'] == 'uploading'
+    client.jobs_parse(job_id)
+    assert client.jobs_status(job_id)['job_status'] == 'waiting'
+    with pytest.raises(GeneralException):
+        client.raw_results(job_id)
+
+    client.jobs_start(job_id)
+    status = client.wait_for_job(job_id, min_interval=0.05, timeout=5)
+    assert status['percent_complete'] == 100
+    assert sum(status['total'][result] for result in
+               ('valid', 'invalid', 'catchall', 'unknown', 'disposable')) \
+        == 500
+
+    results = list(client.jobs_results(job_id, items_per_page=200))
+    assert [r['data'] for r in results] == rows
+    search = client.raw_search(filename='list.csv')
+    assert [job['id'] for job in search['results']] == [job_id]
+
+    client.jobs_delete(job_id)
+    with pytest.raises(GeneralException):
+        client.jobs_status(job_id)
+
+
+def test_remote_jobs_and_downloads(serve, tmpdir):
+    fake, client = serve(job_size=50)
+    job_id = client.jobs_create('https://example.com/list.csv',
+                                from_url=True, auto_parse=True,
+                                auto_start=True)['job_id']
+    rows = list(client.jobs_download_rows(
+        job_id, segmentation=['valids'], appends=['email_status_int']))
+    expected = [i for i in range(50)
+                if fake.result_for('user{}@example.com'.format(i)) == 'valid']
+    assert [row.email for row in rows] == \
+        ['user{}@example.com'.format(i) for i in expected]
+    assert set(row.email_status_int for row in rows) == {0}
+
+    path = str(tmpdir.join('results.csv'))
+    stats = client.jobs_download_resumable(job_id, path)
+    assert stats['bytes'] > 0
+
+    # ranges are honored, and an exhausted one is refused
+    url = server_url(client, 'jobs', 'download')
+    body = {'job_id': job_id, 'valids': 1}
+    full = requests.post(url, json=body).content
+    tail = requests.post(url, json=body, headers={'Range': 'bytes=10-'})
+    assert tail.status_code == 206
+    assert tail.content == full[10:]
+    past = requests.post(url, json=body,
+                         headers={'Range': 'bytes={}-'.format(len(full))})
+    assert past.status_code == 416
+
+
+def test_failed_jobs(serve):
+    _, client = serve(job_failure_rate=1)
+    job_id = client.jobs_create(['a@example.com'], auto_parse=True,
+                                auto_start=True)['job_id']
+    status = client.wait_for_job(job_id, min_interval=0)
+    assert status['job_status'] == 'failed'
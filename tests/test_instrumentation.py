@@ -0,0 +1,172 @@
+"""Tests the instrumentation of API requests"""
+import io
+
+import pytest
+
+import neverbounce_sdk
+from neverbounce_sdk import (AuthFailure, Histogram, MetricsCollector,
+                             RequestEvent, RetryPolicy, ThrottleTriggered)
+from neverbounce_sdk.fakeserver import FakeNeverBounce
+
+
+@pytest.fixture
+def fake():
+    fake = FakeNeverBounce(api_key='key', job_size=20)
+    server = fake.serve(port=0, background=True)
+    fake.url = server.url
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def event(**kwargs):
+    fields = dict(endpoint='single/check', method='GET', status_code=200,
+                  started=0, duration=0.1, execution_time=None,
+                  bytes_sent=0, bytes_received=10, attempt=1, error=None)
+    fields.update(kwargs)
+    return RequestEvent(**fields)
+
+
+def test_histogram():
+    histogram = Histogram([1, 2, 4])
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.mean == 3.2
+    assert histogram.quantile(0.2) == 0.5
+    assert histogram.quantile(0.5) == 1.5
+    assert histogram.quantile(0.7) == 3
+    assert histogram.quantile(1) == 4
+
+
+def test_request_events():
+    assert not event().retry
+    assert event(attempt=2).retry
+    assert event(error=ThrottleTriggered('slow down')).throttled
+    assert event(status_code=429).throttled
+    assert event(error=ValueError()).error_class == 'ValueError'
+
+
+def test_collector(fake):
+    metrics = MetricsCollector()
+    events = []
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    hooks=[metrics, events.append])
+    client.single_check('someone@example.com')
+    client.single_check('someone.else@example.com')
+    client.account_info()
+    rows = [{'email': 'user{}@example.com'.format(i)} for i in range(100)]
+    job_id = client.jobs_create(rows, auto_parse=True,
+                                auto_start=True)['job_id']
+    buffer = io.BytesIO()
+    client.jobs_download(job_id, buffer)
+    rows = list(client.jobs_download_rows(job_id, chunk_size=100))
+
+    client.api_key = 'wrong'
+    with pytest.raises(AuthFailure):
+        client.account_info()
+
+    snapshot = metrics.snapshot()
+    check = snapshot['single/check']
+    assert check.requests == 2
+    assert check.latency.count == 2
+    assert check.execution_time.count == 2
+    assert check.bytes_received > 0
+    account = snapshot['account/info']
+    assert account.errors == {'AuthFailure': 1}
+
+    create = [e for e in events if e.endpoint == 'jobs/create'][0]
+    assert create.method == 'POST'
+    assert create.bytes_sent > 100 * len('"user0@example.com"')
+    download, download_rows = [e for e in events
+                               if e.endpoint == 'jobs/download']
+    assert download.bytes_received == len(buffer.getvalue())
+    # the download of rows is reported once they have all been read
+    assert download_rows.bytes_received == len(buffer.getvalue())
+    assert download_rows.error is None
+    assert rows
+    assert events[-1].error is not None
+    assert events[-1].status_code == 200
+
+    # snapshots are copies
+    metrics.reset()
+    assert metrics.snapshot() == {}
+    assert check.requests == 2
+
+
+def test_retries_and_throttles_are_recorded(fake):
+    fake.throttle = 5
+    metrics = MetricsCollector()
+    policy = RetryPolicy(max_attempts=20, backoff_factor=0.05, max_backoff=0.2)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    retry_policy=policy, hooks=[metrics])
+    for _ in range(8):
+        client.account_info()
+    account = metrics.snapshot()['account/info']
+    assert account.throttled > 0
+    assert account.retries == account.throttled
+    assert account.requests == 8 + account.retries
+    assert account.errors == {'ThrottleTriggered': account.throttled}
+
+
+def test_failing_hooks_warn(fake):
+    def broken(event):
+        raise RuntimeError('broken')
+
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    hooks=[broken])
+    with pytest.warns(RuntimeWarning, match='broken'):
+        assert client.account_info()['status'] == 'success'
+
+
+def test_prometheus_hook():
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from neverbounce_sdk import PrometheusHook
+    registry = prometheus_client.CollectorRegistry()
+    hook = PrometheusHook(registry=registry)
+    hook(event(execution_time=12))
+    hook(event(attempt=2, status_code=429,
+               error=ThrottleTriggered('slow down')))
+
+    def value(name, **labels):
+        return registry.get_sample_value(name, labels)
+
+    assert value('neverbounce_request_duration_seconds_count',
+                 endpoint='single/check', method='GET') == 2
+    assert value('neverbounce_requests_total', endpoint='single/check',
+                 method='GET', status='429', error='ThrottleTriggered') == 1
+    assert value('neverbounce_throttled_total', endpoint='single/check') == 1
+    assert value('neverbounce_transferred_bytes_total',
+                 endpoint='single/check', direction='received') == 20
+
+
+def test_opentelemetry_hook():
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import InMemoryMetricReader
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import \
+        InMemorySpanExporter
+    from neverbounce_sdk import OpenTelemetryHook
+
+    reader = InMemoryMetricReader()
+    meter = MeterProvider(metric_readers=[reader]).get_meter('test')
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    hook = OpenTelemetryHook(meter=meter,
+                             tracer=tracer_provider.get_tracer('test'))
+    hook(event(started=100, duration=0.5, execution_time=12))
+    hook(event(error=ValueError('bad')))
+
+    spans = exporter.get_finished_spans()
+    assert [span.name for span in spans] == ['neverbounce single/check'] * 2
+    assert spans[0].end_time - spans[0].start_time == 500000000
+    assert not spans[1].status.is_ok
+    names = set(metric.name
+                for resource in reader.get_metrics_data().resource_metrics
+                for scope in resource.scope_metrics
+                for metric in scope.metrics)
+    assert 'neverbounce.request.duration' in names
@@ -0,0 +1,107 @@
+"""Tests the local screening of addresses before verification"""
+import pytest
+
+from neverbounce_sdk import ROLE_ACCOUNTS, PreFilter, Rejection
+
+
+@pytest.mark.parametrize('email', [
+    'someone@example.com',
+    'first.last+tag@mail.example.co.uk',
+    "o'hara!#$%&*=?^_`{|}~@example.com",
+    '"quoted name"@example.com',
+    'user@[192.168.0.1]',
+    u'jörg@bücher.de',
+    '  padded@example.com\t',
+])
+def test_valid_syntax(email):
+    assert PreFilter().check(email) is None
+
+
+@pytest.mark.parametrize('email', [
+    '', 'plain', '@example.com', 'someone@', 'someone@localhost',
+    'some one@example.com', 'a..b@example.com', '.a@example.com',
+    'a.@example.com', 'a@b@example.com', 'someone@example..com',
+    'someone@-example.com', 'someone@example-.com', 'someone@example.123',
+    'someone@exa_mple.com', '{}@example.com'.format('a' * 65),
+    'a@{}.com'.format('b' * 64), 'a@{}.com'.format('.'.join(['b' * 60] * 5)),
+    'some\none@example.com',
+])
+def test_invalid_syntax(email):
+    assert PreFilter().check(email) == 'syntax'
+
+
+def test_normalize():
+    prefilter = PreFilter()
+    assert prefilter.normalize(' Some.One@Example.COM ') == \
+        'Some.One@example.com'
+    assert PreFilter(lowercase=True).normalize('Some.One@Example.COM') == \
+        'some.one@example.com'
+    assert prefilter.normalize('nope') is None
+
+
+def test_domains_and_roles():
+    prefilter = PreFilter(blocked_domains=['Competitor.com'],
+                          role_accounts=ROLE_ACCOUNTS)
+    assert prefilter.check('x@mailinator.com') == 'disposable'
+    assert prefilter.check('x@competitor.COM') == 'blocked'
+    assert prefilter.check('Postmaster@example.com') == 'role'
+    assert prefilter.check('x@example.com') is None
+    assert PreFilter().check('postmaster@example.com') is None
+    assert PreFilter(disposable_domains=()).check('x@mailinator.com') is None
+
+
+def test_screen():
+    rows = ['a@example.com', 'bad', ' A@Example.com', 'b@yopmail.com',
+            'info@example.com', 'B@example.com', None, 'a@example.com']
+    report = PreFilter(role_accounts=['info']).screen(rows)
+    assert report.rows == ['a@example.com', 'B@example.com']
+    assert report.indexes == [0, 5]
+    assert report.rejected == [
+        Rejection(1, 'bad', 'syntax', None),
+        Rejection(2, 'A@example.com', 'duplicate', 0),
+        Rejection(3, 'b@yopmail.com', 'disposable', None),
+        Rejection(4, 'info@example.com', 'role', None),
+        Rejection(6, None, 'syntax', None),
+        Rejection(7, 'a@example.com', 'duplicate', 0),
+    ]
+    assert report.counts == {'syntax': 2, 'duplicate': 2, 'disposable': 1,
+                             'role': 1}
+    assert report.total == len(rows)
+    assert [r.result for r in report.rejected] == \
+        ['invalid', None, 'disposable', None, 'invalid', None]
+
+    report = PreFilter(dedupe=False).screen(['a@example.com'] * 2)
+    assert report.rows == ['a@example.com'] * 2
+
+
+def test_screen_dict_rows():
+    rows = [{'email': 'Someone@EXAMPLE.com', 'id': '1'},
+            {'email': 'someone@example.com', 'id': '2'},
+            {'email': 'other@example.com', 'id': '3'},
+            {'id': '4'}]
+    report = PreFilter().screen(rows)
+    assert report.rows == [{'email': 'Someone@example.com', 'id': '1'},
+                           {'email': 'other@example.com', 'id': '3'}]
+    # rows that change are copied, and the others passed on as they are
+    assert rows[0]['email'] == 'Someone@EXAMPLE.com'
+    assert report.rows[1] is rows[2]
+    assert [(r.index, r.reason) for r in report.rejected] == \
+        [(1, 'duplicate'), (3, 'syntax')]
+
+
+def test_screen_list_rows():
+    rows = [['Someone@EXAMPLE.com', 'one'],
+            ('other@example.com', 'two'),
+            ('someone@example.com', 'three'),
+            ['bad', 'four'],
+            []]
+    report = PreFilter().screen(rows)
+    assert report.rows == [['Someone@example.com', 'one'],
+                           ('other@example.com', 'two')]
+    assert rows[0][0] == 'Someone@EXAMPLE.com'
+    assert report.rows[1] is rows[1]
+    assert report.rejected == [
+        Rejection(2, 'someone@example.com', 'duplicate', 0),
+        Rejection(3, 'bad', 'syntax', None),
+        Rejection(4, None, 'syntax', None),
+    ]
@@ -0,0 +1,90 @@
+"""
+Tests the client-side rate limiter
+"""
+import pytest
+import responses
+
+import neverbounce_sdk
+from neverbounce_sdk import RateLimiter, urlfor
+from neverbounce_sdk import ratelimit
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, '_clock', clock)
+    monkeypatch.setattr(ratelimit.time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_burst_then_steady_rate(clock):
+    limiter = RateLimiter(rate=2, burst=3)
+    # the first ``burst`` requests go straight through
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # then one request every 1/rate seconds
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert limiter.acquire() == pytest.approx(0.5)
+    assert clock.slept == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_tokens_refill_up_to_burst(clock):
+    limiter = RateLimiter(rate=10, burst=5)
+    for _ in range(5):
+        limiter.acquire()
+    assert limiter.tokens == pytest.approx(0)
+    clock.now += 0.2
+    assert limiter.tokens == pytest.approx(2)
+    clock.now += 60
+    assert limiter.tokens == pytest.approx(5)
+
+
+def test_reservations_queue_callers(clock):
+    limiter = RateLimiter(rate=1, burst=1)
+    assert limiter.reserve() == 0.0
+    # each caller waits behind the previous ones
+    assert limiter.reserve() == pytest.approx(1)
+    assert limiter.reserve() == pytest.approx(2)
+    assert limiter.wait_time == pytest.approx(3)
+
+
+def test_metrics(clock):
+    limiter = RateLimiter(rate=1, burst=1)
+    limiter.acquire()
+    limiter.acquire()
+    metrics = limiter.metrics()
+    assert metrics['requests'] == 2
+    assert metrics['delayed_requests'] == 1
+    assert metrics['total_wait'] == pytest.approx(1)
+    assert metrics['rate'] == 1
+    assert metrics['burst'] == 1
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+@responses.activate
+def test_client_waits_for_limiter(clock):
+    responses.add(responses.GET, urlfor('account', 'info'),
+                  json={'status': 'success'})
+    limiter = RateLimiter(rate=4, burst=1)
+    client = neverbounce_sdk.client(api_key='key', rate_limiter=limiter)
+    for _ in range(3):
+        client.account_info()
+    assert len(responses.calls) == 3
+    assert limiter.requests == 3
+    assert clock.slept == [pytest.approx(0.25), pytest.approx(0.25)]
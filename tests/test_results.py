@@ -0,0 +1,137 @@
+"""
+Tests the compact storage of bulk results
+"""
+import collections
+
+import pytest
+import responses
+
+import neverbounce_sdk
+from neverbounce_sdk import ResultRecord, ResultTable, urlfor
+
+
+def result(email, kind, flags=(), correction='', **data):
+    data['email'] = email
+    return {'data': data,
+            'verification': {'result': kind,
+                             'flags': list(flags),
+                             'suggested_correction': correction}}
+
+
+RESULTS = [
+    result('a@example.com', 'valid', ['has_dns', 'has_dns_mx'], id='1'),
+    result('b@example.con', 'invalid', correction='b@example.com', id='2'),
+    result('c@example.com', 'valid', ['has_dns', 'has_dns_mx'], id='3',
+           name='Cee'),
+    result('A@Example.com', 'catchall'),
+]
+
+
+def test_records():
+    table = ResultTable(RESULTS)
+    assert len(table) == 4
+    assert table[0] == ResultRecord('a@example.com', 'valid',
+                                    ('has_dns', 'has_dns_mx'), '',
+                                    {'id': '1', 'name': ''})
+    assert table[1].suggested_correction == 'b@example.com'
+    assert table[2].data == {'id': '3', 'name': 'Cee'}
+    assert table[-1].data == {'id': '', 'name': ''}
+    assert [record.email for record in table] == [r['data']['email']
+                                                  for r in RESULTS]
+
+
+def test_values_are_interned():
+    table = ResultTable(RESULTS)
+    assert list(table.result_codes) == [0, 1, 0, 3]
+    assert table.flag_sets == [(), ('has_dns', 'has_dns_mx')]
+    assert table[0].flags is table[2].flags
+
+    table.append(result('d@example.com', 'something new'))
+    assert table[-1].result == 'something new'
+    assert table.counts() == {'valid': 2, 'invalid': 1, 'catchall': 1,
+                              'something new': 1}
+
+
+def test_index_by_email():
+    table = ResultTable(RESULTS[:2])
+    assert table.index(' B@EXAMPLE.CON') == 1
+    assert 'a@example.com' in table
+    assert 'c@example.com' not in table
+    assert table.get('c@example.com') is None
+    with pytest.raises(KeyError):
+        table.index('c@example.com')
+
+    # the index follows appends, and keeps the first row for an address
+    table.extend(RESULTS[2:])
+    assert table.get('c@example.com').data['name'] == 'Cee'
+    assert table.index('a@example.com') == 0
+
+
+def test_extend_rows():
+    Row = collections.namedtuple('DownloadRow',
+                                 ['email', 'id', 'email_status_int'])
+    table = ResultTable()
+    table.extend_rows([Row('a@example.com', '1', 0),
+                       Row('b@example.com', '2', 4)])
+    assert table.results == ['valid', 'unknown']
+    assert table.to_dict()['data.id'] == ['1', '2']
+
+    Row = collections.namedtuple('DownloadRow', ['email'])
+    with pytest.raises(ValueError):
+        table.extend_rows([Row('c@example.com')])
+
+
+def test_to_dict():
+    columns = ResultTable(RESULTS).to_dict()
+    assert columns['email'][1] == 'b@example.con'
+    assert columns['result'] == ['valid', 'invalid', 'valid', 'catchall']
+    assert columns['flags'][1] == ()
+    assert columns['data.name'] == ['', '', 'Cee', '']
+    assert set(len(column) for column in columns.values()) == {4}
+
+
+def test_data_fields_named_like_columns_are_kept():
+    row = result('a@example.com', 'valid')
+    row['data'].update(result='mine', flags='also mine')
+    table = ResultTable([row])
+    columns = table.to_dict()
+    assert columns['result'] == ['valid']
+    assert columns['data.result'] == ['mine']
+    assert columns['data.flags'] == ['also mine']
+
+
+def test_to_numpy():
+    numpy = pytest.importorskip('numpy')
+    columns = ResultTable(RESULTS).to_numpy()
+    assert columns['result_code'].dtype == numpy.uint8
+    assert list(columns['result_code']) == [0, 1, 0, 3]
+    assert list(columns['email'][:2]) == ['a@example.com', 'b@example.con']
+
+
+def test_to_arrow():
+    pytest.importorskip('pyarrow')
+    table = ResultTable(RESULTS)
+    arrow = table.to_arrow()
+    assert arrow.num_rows == 4
+    assert arrow.column('result').to_pylist() == table.results
+    assert arrow.column('flags').to_pylist()[0] == ['has_dns', 'has_dns_mx']
+
+    # the table can still grow after an export
+    table.append(result('d@example.com', 'valid'))
+    assert len(table) == 5
+
+
+@responses.activate
+def test_jobs_results_table():
+    for page, results in enumerate([RESULTS, []], 1):
+        responses.add(responses.GET, urlfor('jobs', 'results'),
+                      json={'status': 'success',
+                            'query': {'job_id': 1, 'page': page,
+                                      'items_per_page': 1000},
+                            'total_pages': 1,
+                            'total_results': len(RESULTS),
+                            'results': results})
+    client = neverbounce_sdk.client(api_key='key')
+    table = client.jobs_results_table(1)
+    assert table.counts() == {'valid': 2, 'invalid': 1, 'catchall': 1}
+    assert 'items_per_page=1000' in responses.calls[0].request.url
@@ -0,0 +1,129 @@
+"""
+Tests retrying of failed requests
+"""
+import pytest
+import requests
+import responses
+
+import neverbounce_sdk
+from neverbounce_sdk import RetryPolicy, ThrottleTriggered, urlfor
+from neverbounce_sdk import core
+
+THROTTLED = {'status': 'throttle_triggered', 'message': 'slow down'}
+SUCCESS = {'status': 'success'}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(core.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def client_with(policy):
+    return neverbounce_sdk.client(api_key='key', retry_policy=policy)
+
+
+@responses.activate
+def test_no_retries_by_default(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), json=THROTTLED)
+    with pytest.raises(ThrottleTriggered):
+        neverbounce_sdk.client(api_key='key').account_info()
+    assert len(responses.calls) == 1
+    assert sleeps == []
+
+
+@responses.activate
+def test_retries_server_errors_then_succeeds(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), status=502)
+    responses.add(responses.GET, urlfor('account', 'info'), json=THROTTLED)
+    responses.add(responses.GET, urlfor('account', 'info'), json=SUCCESS)
+
+    policy = RetryPolicy(max_attempts=3, backoff_factor=1, jitter=False)
+    assert client_with(policy).account_info() == SUCCESS
+    assert len(responses.calls) == 3
+    assert sleeps == [1, 2]
+
+
+@responses.activate
+def test_gives_up_after_max_attempts(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), json=THROTTLED)
+    with pytest.raises(ThrottleTriggered):
+        client_with(RetryPolicy(max_attempts=4)).account_info()
+    assert len(responses.calls) == 4
+    assert len(sleeps) == 3
+
+
+@responses.activate
+def test_client_errors_are_not_retried(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), status=404)
+    with pytest.raises(requests.HTTPError):
+        client_with(RetryPolicy()).account_info()
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_retry_after_header_is_honored(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), status=503,
+                  headers={'Retry-After': '7'})
+    responses.add(responses.GET, urlfor('account', 'info'), json=SUCCESS)
+
+    policy = RetryPolicy(backoff_factor=0.1, jitter=False)
+    client_with(policy).account_info()
+    assert sleeps == [7]
+
+
+def test_next_delay():
+    class Response(object):
+        headers = {'Retry-After': '7'}
+
+    exc = ThrottleTriggered('slow down')
+    policy = RetryPolicy(max_attempts=3, backoff_factor=0.1, jitter=False)
+    assert policy.next_delay(1, exc, response=Response()) == 7
+    assert policy.next_delay(3, exc, response=Response()) is None
+    assert policy.next_delay(1, ValueError()) is None
+
+    policy.respect_retry_after = False
+    assert policy.next_delay(1, exc, response=Response()) == 0.1
+
+
+@responses.activate
+def test_jobs_create_is_not_blindly_reposted(sleeps):
+    responses.add(responses.POST, urlfor('jobs', 'create'), status=502)
+    with pytest.raises(requests.HTTPError):
+        client_with(RetryPolicy()).jobs_create(['test@example.com'])
+    assert len(responses.calls) == 1
+
+
+@responses.activate
+def test_jobs_create_is_retried_when_not_processed(sleeps):
+    responses.add(responses.POST, urlfor('jobs', 'create'), json=THROTTLED)
+    responses.add(responses.POST, urlfor('jobs', 'create'), status=429)
+    responses.add(responses.POST, urlfor('jobs', 'create'), json=SUCCESS)
+    client_with(RetryPolicy()).jobs_create(['test@example.com'])
+    assert len(responses.calls) == 3
+
+
+@responses.activate
+def test_per_endpoint_policies(sleeps):
+    responses.add(responses.GET, urlfor('account', 'info'), json=THROTTLED)
+    responses.add(responses.GET, urlfor('jobs', 'status'), json=THROTTLED)
+    client = client_with({'jobs/status': RetryPolicy(max_attempts=2),
+                          '*': None})
+
+    with pytest.raises(ThrottleTriggered):
+        client.account_info()
+    assert len(responses.calls) == 1
+
+    with pytest.raises(ThrottleTriggered):
+        client.jobs_status(123)
+    assert len(responses.calls) == 3
+
+
+def test_backoff_curve():
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+    assert [policy.backoff(n) for n in range(1, 6)] == [0.5, 1, 2, 3, 3]
+
+    policy.jitter = True
+    for n in range(1, 6):
+        assert 0 <= policy.backoff(n) <= min(3, 0.5 * 2 ** (n - 1))
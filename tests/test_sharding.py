@@ -0,0 +1,150 @@
+"""Tests the verification of lists split across several bulk jobs"""
+import threading
+
+import pytest
+import requests
+
+import neverbounce_sdk
+from neverbounce_sdk import GeneralException, ThrottleTriggered
+
+
+EMAILS = ['{}@example.com'.format(i) for i in range(10)]
+
+
+class FakeJobs(object):
+    """Stands in for the jobs endpoints; each job completes on its second
+    status check and returns its results in reverse order"""
+
+    def __init__(self, fail_first=(), fail_create=(), fail_polls=0,
+                 create_error=ThrottleTriggered):
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.creates = []
+        self.fail_first = set(fail_first)
+        self.fail_create = set(fail_create)
+        self.fail_polls = fail_polls
+        self.create_error = create_error
+
+    def jobs_create(self, input, **kwargs):
+        rows = list(input)
+        shard = rows[0]['nb_row']
+        with self.lock:
+            self.creates.append((shard, kwargs))
+            if shard in self.fail_create:
+                raise self.create_error('boom')
+            job_id = len(self.creates)
+            failed = shard in self.fail_first
+            self.fail_first.discard(shard)
+            self.jobs[job_id] = dict(rows=rows, polls=0, failed=failed)
+        return {'status': 'success', 'job_id': job_id}
+
+    def jobs_status(self, job_id):
+        with self.lock:
+            if self.fail_polls:
+                self.fail_polls -= 1
+                raise ThrottleTriggered('slow down')
+        job = self.jobs[job_id]
+        job['polls'] += 1
+        if job['failed']:
+            status = 'failed'
+        else:
+            status = 'complete' if job['polls'] > 1 else 'running'
+        return {'status': 'success', 'job_status': status}
+
+    def raw_results(self, job_id, page=1, items_per_page=10, **kwargs):
+        rows = self.jobs[job_id]['rows'][::-1]
+        start = (page - 1) * items_per_page
+        page_rows = rows[start:start + items_per_page]
+        results = [{'data': dict((k, str(v)) for k, v in row.items()),
+                    'verification': {'result': 'valid'}}
+                   for row in page_rows]
+        total_pages = -(-len(rows) // items_per_page)
+        return dict(results=results, total_pages=total_pages,
+                    total_results=len(rows),
+                    query=dict(job_id=job_id, page=page,
+                               items_per_page=items_per_page))
+
+
+@pytest.fixture
+def fake():
+    return FakeJobs()
+
+
+def client_for(fake):
+    client = neverbounce_sdk.client(api_key='secret key')
+    for name in ('jobs_create', 'jobs_status', 'raw_results'):
+        setattr(client, name, getattr(fake, name))
+    return client
+
+
+def test_results_are_merged_in_input_order(fake):
+    client = client_for(fake)
+    emails = ['{}@example.com'.format(i) for i in range(25)]
+    results = list(client.verify_list(emails, shard_size=10, min_interval=0,
+                                      items_per_page=4,
+                                      filename='list.csv'))
+
+    assert [row for row, _ in results] == list(range(25))
+    assert [r['data'] for _, r in results] == [{'email': e} for e in emails]
+    assert sorted(shard for shard, _ in fake.creates) == [0, 10, 20]
+    assert sorted(kw['filename'] for _, kw in fake.creates) == [
+        'list.csv.0', 'list.csv.1', 'list.csv.2']
+    assert all(kw['auto_start'] for _, kw in fake.creates)
+
+
+def test_rows_keep_their_metadata(fake, tmpdir):
+    path = tmpdir.join('input.csv')
+    path.write('email,name\na@example.com,A\nb@example.com,B\n')
+    client = client_for(fake)
+    results = list(client.verify_list(str(path), min_interval=0))
+    assert [r['data'] for _, r in results] == [
+        {'email': 'a@example.com', 'name': 'A'},
+        {'email': 'b@example.com', 'name': 'B'}]
+
+    results = list(client.verify_list([['c@example.com', 'C']],
+                                      min_interval=0))
+    assert results[0][1]['data'] == {'email': 'c@example.com', '1': 'C'}
+
+
+def test_failed_shards_are_retried():
+    fake = FakeJobs(fail_first=[5])
+    client = client_for(fake)
+    results = list(client.verify_list(EMAILS, shard_size=5,
+                                      min_interval=0))
+    assert [row for row, _ in results] == list(range(10))
+    assert sorted(shard for shard, _ in fake.creates) == [0, 5, 5]
+
+
+def test_shard_gives_up_after_max_attempts():
+    fake = FakeJobs(fail_create=[5])
+    client = client_for(fake)
+    results = client.verify_list(EMAILS, shard_size=5, max_attempts=2,
+                                 min_interval=0)
+    assert next(results)[0] == 0
+    with pytest.raises(GeneralException):
+        list(results)
+    assert sorted(shard for shard, _ in fake.creates) == [0, 5, 5]
+
+
+def test_failed_status_checks_keep_the_job():
+    fake = FakeJobs(fail_polls=2)
+    client = client_for(fake)
+    results = list(client.verify_list(EMAILS, min_interval=0))
+    assert [row for row, _ in results] == list(range(10))
+    assert [shard for shard, _ in fake.creates] == [0]
+
+
+def test_create_is_not_resent_unless_unprocessed():
+    fake = FakeJobs(fail_create=[0], create_error=requests.ReadTimeout)
+    client = client_for(fake)
+    with pytest.raises(requests.ReadTimeout):
+        list(client.verify_list(EMAILS, min_interval=0))
+    assert [shard for shard, _ in fake.creates] == [0]
+
+
+def test_row_key_clash(fake):
+    client = client_for(fake)
+    with pytest.raises(ValueError):
+        list(client.verify_list([{'email': 'a@example.com', 'nb_row': 1}]))
+    with pytest.raises(TypeError):
+        client.verify_list([], auto_start=False)
@@ -1,10 +1,18 @@
 """
 Tests the Single endpoints
 """
+import json
+import threading
+
 import responses
 
 import neverbounce_sdk
-from neverbounce_sdk import urlforversion, urlfor
+from neverbounce_sdk import urlforversion, urlfor, GeneralException
+
+try:
+    from urllib.parse import parse_qs, urlparse
+except ImportError:  # Python 2 COMPAT
+    from urlparse import parse_qs, urlparse
 
 
 @responses.activate
@@ -51,3 +59,87 @@ def test_single_check_with_specific_version():
                      'timeout=30',
                      'key=abc'):
         assert urlchunk in url
+
+
+def _check_callback(request):
+    email = parse_qs(urlparse(request.url).query)['email'][0]
+    if email.startswith('bad'):
+        body = {'status': 'general_failure', 'message': 'bad address'}
+    else:
+        body = {'status': 'success', 'result': 'valid', 'email': email}
+    return (200, {}, json.dumps(body))
+
+
+@responses.activate
+def test_single_check_many_reports_per_email_errors():
+    responses.add_callback(responses.GET, urlfor('single', 'check'),
+                           callback=_check_callback,
+                           content_type='application/json')
+    emails = ['{}@example.com'.format(i) for i in range(20)]
+    emails[5] = 'bad@example.com'
+
+    client = neverbounce_sdk.client(api_key='static key')
+    outcomes = list(client.single_check_many(emails, concurrency=4))
+
+    assert len(outcomes) == 20
+    assert len(responses.calls) == 20
+    assert sorted(o.index for o in outcomes) == list(range(20))
+    for outcome in outcomes:
+        assert outcome.email == emails[outcome.index]
+        if outcome.index == 5:
+            assert outcome.result is None
+            assert isinstance(outcome.exception, GeneralException)
+        else:
+            assert outcome.exception is None
+            assert outcome.result['email'] == outcome.email
+
+
+@responses.activate
+def test_single_check_many_ordered():
+    responses.add_callback(responses.GET, urlfor('single', 'check'),
+                           callback=_check_callback,
+                           content_type='application/json')
+    emails = ('{}@example.com'.format(i) for i in range(30))
+
+    client = neverbounce_sdk.client(api_key='static key')
+    outcomes = client.single_check_many(emails, concurrency=8, ordered=True,
+                                        address_info=True)
+
+    for index, outcome in enumerate(outcomes):
+        assert outcome.index == index
+        assert outcome.result['email'] == '{}@example.com'.format(index)
+    assert 'address_info=1' in responses.calls[0].request.url
+
+
+def test_single_check_many_ordered_reads_ahead_boundedly(monkeypatch):
+    client = neverbounce_sdk.client(api_key='static key')
+    release = threading.Event()
+    read = []
+
+    def single_check(email, **kwargs):
+        if email == 'slow@example.com':
+            release.wait(5)
+        return {'email': email}
+
+    def emails():
+        yield 'slow@example.com'
+        for i in range(1000):
+            read.append(i)
+            yield '{}@example.com'.format(i)
+
+    monkeypatch.setattr(client, 'single_check', single_check)
+    outcomes = client.single_check_many(emails(), concurrency=4,
+                                        ordered=True)
+    read_while_slow = []
+
+    def finish_slow_check():
+        read_while_slow.append(len(read))
+        release.set()
+
+    releaser = threading.Timer(0.2, finish_slow_check)
+    releaser.start()
+    assert next(outcomes).email == 'slow@example.com'
+    # while the first check was slow, no more than the window was read
+    assert read_while_slow[0] < 2 * 4
+    assert len(list(outcomes)) == 1000
+    releaser.join()
@@ -0,0 +1,81 @@
+"""
+Tests coalescing of concurrent identical calls
+"""
+import threading
+import time
+
+import pytest
+import responses
+
+import neverbounce_sdk
+from neverbounce_sdk import urlfor
+from neverbounce_sdk.singleflight import SingleFlight
+
+
+def run_threads(target, count):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_calls_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'result': 'valid', 'flags': []}
+
+    run_threads(lambda: results.append(flight.do('key', fetch)), 5)
+
+    assert len(calls) == 1
+    assert len(results) == 5
+    assert all(r == {'result': 'valid', 'flags': []} for r in results)
+    # every caller has its own copy
+    assert len(set(id(r) for r in results)) == 5
+    assert len(flight) == 0
+
+
+def test_exceptions_are_shared():
+    flight = SingleFlight()
+    errors = []
+
+    def fetch():
+        time.sleep(0.2)
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flight.do('key', fetch)
+        except ValueError as exc:
+            errors.append(exc)
+
+    run_threads(call, 3)
+    assert len(errors) == 3
+
+
+def test_sequential_calls_are_not_shared():
+    flight = SingleFlight()
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.do('key', lambda: 2) == 2
+
+
+def _slow_check(request):
+    time.sleep(0.2)
+    return (200, {}, '{"status": "success", "result": "valid"}')
+
+
+@pytest.mark.parametrize('coalesce,expected_calls', [(True, 1), (False, 4)])
+@responses.activate
+def test_single_check_coalescing(coalesce, expected_calls):
+    responses.add_callback(responses.GET, urlfor('single', 'check'),
+                           callback=_slow_check,
+                           content_type='application/json')
+    client = neverbounce_sdk.client(api_key='key', coalesce=coalesce)
+
+    run_threads(lambda: client.single_check('test@example.com'), 4)
+    assert len(responses.calls) == expected_calls
@@ -0,0 +1,87 @@
+"""Tests the transports requests are sent through"""
+import io
+import socket
+
+import pytest
+import requests
+
+import neverbounce_sdk
+from neverbounce_sdk import AuthFailure, RequestsTransport
+from neverbounce_sdk.fakeserver import FakeNeverBounce
+
+pytest.importorskip('httpx')
+from neverbounce_sdk import HTTPXTransport  # noqa: E402
+
+
+@pytest.fixture
+def fake():
+    fake = FakeNeverBounce(api_key='key', job_size=50)
+    server = fake.serve(port=0, background=True)
+    fake.url = server.url
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def test_default_transport():
+    client = neverbounce_sdk.client(api_key='key', pool_size=3)
+    pool = client._get_pool()
+    assert isinstance(pool, RequestsTransport)
+    assert pool.get_adapter('https://x')._pool_maxsize == 3
+
+
+def test_httpx_transport(fake):
+    transport = HTTPXTransport(http2=False)
+    client = neverbounce_sdk.client(api_key='key', api_root=fake.url,
+                                    transport=transport)
+    assert client._get_pool() is transport
+    assert client.account_info()['status'] == 'success'
+    assert client.single_check('someone@example.com')['result'] == \
+        fake.result_for('someone@example.com')
+
+    # streamed uploads, result pages and downloads
+    rows = [{'email': 'user{}@example.com'.format(i)} for i in range(500)]
+    job_id = client.jobs_create(rows, auto_parse=True,
+                                auto_start=True)['job_id']
+    results = list(client.jobs_results(job_id, items_per_page=100))
+    assert [r['data'] for r in results] == rows
+    buffer = io.BytesIO()
+    client.jobs_download(job_id, buffer)
+    rows = list(client.jobs_download_rows(job_id))
+
+    # the same as through the default transport
+    default = neverbounce_sdk.client(api_key='key', api_root=fake.url)
+    expected = io.BytesIO()
+    default.jobs_download(job_id, expected)
+    assert buffer.getvalue() == expected.getvalue()
+    assert rows == list(default.jobs_download_rows(job_id))
+
+    # closing it drops the connections; they are made again when needed
+    client.close()
+    assert transport._client is None
+    assert client.account_info()['status'] == 'success'
+    with client:
+        assert client.session is transport
+        client.account_info()
+    assert client.session is None
+
+
+def test_httpx_transport_errors(fake):
+    client = neverbounce_sdk.client(api_key='wrong', api_root=fake.url,
+                                    transport=HTTPXTransport(http2=False))
+    with pytest.raises(AuthFailure):
+        client.account_info()
+
+    fake.error_rate = 1
+    client.api_key = 'key'
+    with pytest.raises(requests.HTTPError) as info:
+        client.account_info()
+    assert info.value.response.status_code == 503
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    closed = 'http://127.0.0.1:{}'.format(sock.getsockname()[1])
+    sock.close()
+    client.api_root = closed
+    with pytest.raises(requests.ConnectionError):
+        client.account_info()